@@ -1,13 +1,162 @@
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+_XXYY_BASE_URL = "https://www.xxyy.io"
+_IMPERSONATE = "chrome120"
+_REQUEST_TIMEOUT = 30
+DEFAULT_POOL_SIZE = 8
+DEFAULT_IDLE_TIMEOUT_SECONDS = 60.0
+
+
 def _requests():
     from curl_cffi import requests
 
     return requests
 
 
+def _default_transport():
+    return _requests().Session(impersonate=_IMPERSONATE)
+
+
+def _close_quietly(session):
+    try:
+        session.close()
+    except Exception:
+        pass
+
+
+class XXYYClient:
+    """线程安全的 XXYY HTTP 客户端，按 host 复用 keep-alive 会话。
+
+    每个 host 最多同时持有 ``pool_size`` 个会话；空闲超过 ``idle_timeout`` 秒的
+    会话在下次取用时关闭重建。``transport`` 是会话工厂，返回的对象需提供
+    ``request(method, url, **kwargs)`` 与 ``close()``，测试可注入本地桩。
+    """
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT_SECONDS,
+        transport: Optional[Callable[[], object]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if pool_size <= 0:
+            raise ValueError("pool_size must be > 0")
+        if idle_timeout <= 0:
+            raise ValueError("idle_timeout must be > 0")
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self._transport = transport or _default_transport
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._idle: Dict[str, List[Tuple[object, float]]] = {}
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._closed = False
+
+    def _host_slot(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            slot = self._slots.get(host)
+            if slot is None:
+                slot = self._slots[host] = threading.BoundedSemaphore(self.pool_size)
+            return slot
+
+    def _checkout(self, host: str):
+        now = self._clock()
+        session = None
+        expired = []
+        with self._lock:
+            idle = self._idle.get(host, [])
+            while idle:
+                candidate, last_used = idle.pop()
+                if now - last_used < self.idle_timeout:
+                    session = candidate
+                    break
+                expired.append(candidate)
+        for candidate in expired:
+            _close_quietly(candidate)
+        return session if session is not None else self._transport()
+
+    def _checkin(self, host: str, session):
+        with self._lock:
+            if not self._closed:
+                self._idle.setdefault(host, []).append((session, self._clock()))
+                return
+        _close_quietly(session)
+
+    def request(self, method: str, url: str, **kwargs):
+        host = urlsplit(url).netloc
+        kwargs.setdefault("timeout", _REQUEST_TIMEOUT)
+        slot = self._host_slot(host)
+        slot.acquire()
+        try:
+            session = self._checkout(host)
+            try:
+                resp = session.request(method, url, **kwargs)
+            except Exception:
+                # 传输层异常后连接状态未知，不放回池中
+                _close_quietly(session)
+                raise
+            self._checkin(host, session)
+            return resp
+        finally:
+            slot.release()
+
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def idle_sessions(self, host: str = "") -> int:
+        with self._lock:
+            if host:
+                return len(self._idle.get(host, []))
+            return sum(len(items) for items in self._idle.values())
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            sessions = [
+                session for items in self._idle.values() for session, _ in items
+            ]
+            self._idle.clear()
+        for session in sessions:
+            _close_quietly(session)
+
+
+_CLIENT: Optional[XXYYClient] = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_client() -> XXYYClient:
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            # 延迟读取配置：XXYYClient 本身不依赖 Bot 运行时环境
+            from config import XXYY_HTTP_IDLE_TIMEOUT_SECONDS, XXYY_HTTP_POOL_SIZE
+
+            _CLIENT = XXYYClient(
+                pool_size=XXYY_HTTP_POOL_SIZE,
+                idle_timeout=XXYY_HTTP_IDLE_TIMEOUT_SECONDS,
+            )
+        return _CLIENT
+
+
+def set_client(client: Optional[XXYYClient]) -> Optional[XXYYClient]:
+    """替换模块级客户端（测试注入桩 transport 用），返回旧客户端。"""
+    global _CLIENT
+    with _CLIENT_LOCK:
+        previous = _CLIENT
+        _CLIENT = client
+        return previous
+
+
 def _build_headers(chain: str = "sol", referer: str = "") -> dict:
     """构建统一的请求headers"""
     return {
-        "referer": referer or "https://www.xxyy.io",
+        "referer": referer or _XXYY_BASE_URL,
         "x-chain": chain,
     }
 
@@ -90,12 +239,10 @@ def fetch_trending(period: str = "1M", category: str = "", chain: str = "sol") -
             ]
         }
     """
-    resp = _requests().post(
-        "https://www.xxyy.io/api/data/list/trending",
+    resp = get_client().post(
+        f"{_XXYY_BASE_URL}/api/data/list/trending",
         headers=_build_headers(chain),
         json={"period": period, "category": category},
-        timeout=30,
-        impersonate="chrome120",
     )
     resp.raise_for_status()
     return resp.json()
@@ -141,7 +288,7 @@ def fetch_kol_holders(
             ]
         }
     """
-    headers = _build_headers(chain, f"https://www.xxyy.io/{chain}/{pair}")
+    headers = _build_headers(chain, f"{_XXYY_BASE_URL}/{chain}/{pair}")
 
     # 如果提供了认证信息则添加
     if authorization:
@@ -149,12 +296,10 @@ def fetch_kol_holders(
     if info_token:
         headers["x-info-token"] = info_token
 
-    resp = _requests().get(
-        "https://www.xxyy.io/api/data/holders/kol",
+    resp = get_client().get(
+        f"{_XXYY_BASE_URL}/api/data/holders/kol",
         params={"mint": mint, "pair": pair},
         headers=headers,
-        timeout=30,
-        impersonate="chrome120",
     )
     resp.raise_for_status()
     return resp.json()
@@ -0,0 +1,118 @@
+"""对比每次新建 SQLite 连接与线程内长连接的单轮扫描存储开销。"""
+
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="SQLite 连接池基准测试")
+    parser.add_argument("--contracts", type=int, default=50, help="每轮扫描的合约数")
+    parser.add_argument("--scans", type=int, default=20, help="扫描轮数")
+    parser.add_argument(
+        "--rounds", type=int, default=5, help="两种实现交替测量的次数，结果取中位数"
+    )
+    return parser.parse_args()
+
+
+def _configure_env(data_dir: str):
+    os.environ.update(
+        {
+            "BOT_CHECK_INTERVAL": "15",
+            "BOT_CHAINS": json.dumps(["sol"]),
+            "BOT_CHAIN": "sol",
+            "BOT_NOTIFY_COOLDOWN_HOURS": "24",
+            "BOT_MULTIPLIER_CONFIRMATIONS": "1",
+            "BOT_NOTIFICATION_TYPES": json.dumps(["trending", "anomaly"]),
+            "BOT_CHAIN_ALLOWLIST_JSON": json.dumps({"sol": {}}),
+            "BOT_DATA_DIR": data_dir,
+            "BOT_TELEGRAM_TOKEN": "123:benchmark",
+        }
+    )
+
+
+def _fresh_connect_factory(db_file: str):
+    """旧实现：每次调用新建连接并执行 PRAGMA，退出 with 时关闭。"""
+
+    class ClosingConnection(sqlite3.Connection):
+        def __exit__(self, exc_type, exc_value, traceback):
+            try:
+                return super().__exit__(exc_type, exc_value, traceback)
+            finally:
+                self.close()
+
+    def connect():
+        os.makedirs(os.path.dirname(db_file), exist_ok=True)
+        conn = sqlite3.connect(db_file, timeout=5, factory=ClosingConnection)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA busy_timeout = 5000")
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    return connect
+
+
+def _run_scans(storage, contracts: int, scans: int) -> float:
+    tokens = [f"TOKEN{index}" for index in range(contracts)]
+    info = {"name": "Bench", "symbol": "BENCH", "marketCapUSD": 1000}
+    for token in tokens:
+        if storage.is_new_contract(token):
+            storage.add_contract(token, 1.0, info)
+
+    started = time.perf_counter()
+    for _ in range(scans):
+        for token in tokens:
+            storage.is_new_contract(token)
+            storage.get_contract(token)
+            storage.get_pending_multiplier(token)
+            storage.update_pending_multiplier(token, 2, 1)
+            storage.update_last_notify_time(token)
+    return time.perf_counter() - started
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        _configure_env(tmp)
+        import db_storage
+        import storage as storage_module
+
+        # 关闭合约缓存，保证每次读取都真正走 SQLite 连接
+        contract_storage = storage_module.ContractStorage(
+            chain="sol", chat_id=1, cache_size=0
+        )
+        pooled_connect = db_storage.connect
+        fresh_connect = _fresh_connect_factory(db_storage.SQLITE_DB_FILE)
+        implementations = [("fresh", fresh_connect), ("pooled", pooled_connect)]
+
+        samples = {label: [] for label, _ in implementations}
+        for round_index in range(max(1, args.rounds)):
+            # 交替先后顺序，避免某一方固定承担预热开销
+            ordered = implementations if round_index % 2 == 0 else implementations[::-1]
+            for label, connect in ordered:
+                db_storage.connect = connect
+                storage_module.connect = connect
+                samples[label].append(
+                    _run_scans(contract_storage, args.contracts, args.scans)
+                )
+        db_storage.connect = pooled_connect
+        storage_module.connect = pooled_connect
+        db_storage.close_connections()
+
+    results = {label: statistics.median(values) for label, values in samples.items()}
+    for label, elapsed in results.items():
+        per_scan_ms = elapsed / args.scans * 1000
+        print(
+            f"{label:<7} median_total={elapsed:.3f}s per_scan={per_scan_ms:.2f}ms "
+            f"rounds={len(samples[label])}"
+        )
+    print(f"speedup x{results['fresh'] / results['pooled']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
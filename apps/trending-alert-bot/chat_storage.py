@@ -1,49 +1,122 @@
+from dataclasses import dataclass
 import threading
-from typing import Dict, List, Optional
-from db_storage import connect, ensure_schema
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+from config import SQLITE_DB_FILE
+from db_storage import connect, ensure_schema_ready, trend_stats_upsert_sql
+from storage import invalidate_contract_caches
 from timezone_utils import format_beijing_time
 
 VALID_NOTIFICATION_MODES = {"all", "trending", "anomaly"}
 DEFAULT_NOTIFICATION_MODE = "all"
 
 
+@dataclass(frozen=True)
+class ChatSnapshot:
+    """某一版本聊天表的只读快照，读取不访问 SQLite。"""
+
+    version: int
+    chats: Mapping[int, Mapping]
+    active_chat_ids: Tuple[int, ...]
+
+    def get_chat(self, chat_id: int) -> Optional[Mapping]:
+        return self.chats.get(chat_id)
+
+    def active_chats(self) -> List[Dict]:
+        return [dict(self.chats[chat_id]) for chat_id in self.active_chat_ids]
+
+    def notification_mode(self, chat_id: int) -> str:
+        chat = self.chats.get(chat_id)
+        if chat:
+            return chat.get("notification_mode", DEFAULT_NOTIFICATION_MODE)
+        return DEFAULT_NOTIFICATION_MODE
+
+
+class _ChatRegistry:
+    """进程内共享的 telegram_chats 镜像（按数据库路径区分）。
+
+    首次使用时整表加载一次；ChatStorage 的写操作在事务提交后就地更新，
+    每次变更递增 version。调用方需持有 ChatStorage._FILE_LOCK。
+    """
+
+    def __init__(self):
+        self.chats: Dict[int, Dict] = {}
+        self.loaded = False
+        self.version = 0
+        self._snapshot: Optional[ChatSnapshot] = None
+
+    def replace_all(self, chats: Dict[int, Dict]):
+        self.chats = chats
+        self.loaded = True
+        self._changed()
+
+    def put(self, chat: Dict):
+        self.chats[chat["chat_id"]] = chat
+        self._changed()
+
+    def pop(self, chat_id: int):
+        if self.chats.pop(chat_id, None) is not None:
+            self._changed()
+
+    def snapshot(self) -> ChatSnapshot:
+        if self._snapshot is None:
+            chats = {
+                chat_id: MappingProxyType(dict(chat))
+                for chat_id, chat in sorted(self.chats.items())
+            }
+            self._snapshot = ChatSnapshot(
+                version=self.version,
+                chats=MappingProxyType(chats),
+                active_chat_ids=tuple(
+                    chat_id for chat_id, chat in chats.items() if chat["active"]
+                ),
+            )
+        return self._snapshot
+
+    def _changed(self):
+        self.version += 1
+        self._snapshot = None
+
+
+_REGISTRIES: Dict[str, _ChatRegistry] = {}
+
+
 class ChatStorage:
     _FILE_LOCK = threading.RLock()
 
     def __init__(self):
-        ensure_schema()
-        self.data: Dict[str, Dict] = self._load()
+        ensure_schema_ready()
+        self._db_file = SQLITE_DB_FILE
+        # 注册表按进程共享：每轮新建 ChatStorage 不再整表读取
+        with self._FILE_LOCK:
+            self._registry_unlocked()
+
+    def _registry_unlocked(self) -> _ChatRegistry:
+        registry = _REGISTRIES.get(self._db_file)
+        if registry is None:
+            registry = _REGISTRIES[self._db_file] = _ChatRegistry()
+        if not registry.loaded:
+            registry.replace_all(self._load_unlocked())
+        return registry
 
-    def _load_unlocked(self) -> Dict[str, Dict]:
+    def _load_unlocked(self) -> Dict[int, Dict]:
         with connect() as conn:
             rows = conn.execute(
                 "SELECT * FROM telegram_chats ORDER BY chat_id"
             ).fetchall()
-        return {str(row["chat_id"]): self._row_to_chat(row) for row in rows}
+        return {row["chat_id"]: self._row_to_chat(row) for row in rows}
 
     def _get_chat_unlocked(self, chat_id: int) -> Optional[Dict]:
-        with connect() as conn:
-            row = conn.execute(
-                "SELECT * FROM telegram_chats WHERE chat_id = ?",
-                (chat_id,),
-            ).fetchone()
-        return self._row_to_chat(row) if row else None
-
-    def _save_unlocked(self):
-        try:
-            with connect() as conn:
-                for chat_data in self.data.values():
-                    self._upsert_chat(conn, chat_data)
-        except Exception as e:
-            print(f"❌ 保存聊天记录失败: {e}")
+        chat = self._registry_unlocked().chats.get(chat_id)
+        return dict(chat) if chat else None
 
-    def _load(self) -> Dict[str, Dict]:
-        with self._FILE_LOCK:
-            return self._load_unlocked()
+    def _cache_chat_unlocked(self, chat_data: Dict):
+        self._registry_unlocked().put(self._row_to_chat(self._normalize_chat(chat_data)))
 
-    def _save(self):
+    def snapshot(self) -> ChatSnapshot:
+        """当前聊天表的不可变快照；version 变化说明有聊天被增删改。"""
         with self._FILE_LOCK:
-            self._save_unlocked()
+            return self._registry_unlocked().snapshot()
 
     def _row_to_chat(self, row) -> Dict:
         chat = {
@@ -127,7 +200,6 @@ class ChatStorage:
     def add_chat(self, chat_id: int, chat_info: Dict):
         with self._FILE_LOCK:
             existing_chat = self._get_chat_unlocked(chat_id) or {}
-            chat_id_str = str(chat_id)
             chat_data = {
                 "chat_id": chat_id,
                 "type": chat_info.get("type", "unknown"),
@@ -143,15 +215,14 @@ class ChatStorage:
                     "notification_mode", DEFAULT_NOTIFICATION_MODE
                 ),
             }
-            self.data[chat_id_str] = chat_data
             with connect() as conn:
                 self._upsert_chat(conn, chat_data)
+            self._cache_chat_unlocked(chat_data)
 
         print(f"✅ 已添加聊天: {self._format_chat_name(chat_data)}")
 
     def remove_chat(self, chat_id: int):
         with self._FILE_LOCK:
-            chat_id_str = str(chat_id)
             chat_data = self._get_chat_unlocked(chat_id)
 
             if chat_data:
@@ -160,59 +231,55 @@ class ChatStorage:
                 chat_data["updated_at"] = format_beijing_time()
                 with connect() as conn:
                     self._upsert_chat(conn, chat_data)
-                self.data[chat_id_str] = chat_data
+                self._cache_chat_unlocked(chat_data)
                 print(f"🗑️  已移除聊天: {self._format_chat_name(chat_data)}")
             else:
                 print(f"⚠️  聊天不存在: {chat_id}")
 
     def get_active_chats(self) -> List[Dict]:
-        with self._FILE_LOCK:
-            with connect() as conn:
-                rows = conn.execute(
-                    "SELECT * FROM telegram_chats WHERE active = 1 ORDER BY chat_id"
-                ).fetchall()
-            chats = [self._row_to_chat(row) for row in rows]
-            self.data = {str(chat["chat_id"]): chat for chat in chats}
-            return chats
+        return self.snapshot().active_chats()
 
     def get_chat(self, chat_id: int) -> Optional[Dict]:
         with self._FILE_LOCK:
-            chat = self._get_chat_unlocked(chat_id)
-            if chat:
-                self.data[str(chat_id)] = chat
-            else:
-                self.data.pop(str(chat_id), None)
-            return chat
+            return self._get_chat_unlocked(chat_id)
 
     def increment_message_count(self, chat_id: int):
+        self.add_message_counts({chat_id: 1})
+
+    def add_message_counts(self, counts: Dict[int, int]):
+        """批量累加消息计数，所有聊天在同一个事务中更新。"""
+        counts = {chat_id: count for chat_id, count in counts.items() if count}
+        if not counts:
+            return
         with self._FILE_LOCK:
-            chat_id_str = str(chat_id)
+            updated_at = format_beijing_time()
+            updated = []
             with connect() as conn:
-                cursor = conn.execute(
-                    """
-                    UPDATE telegram_chats
-                    SET message_count = message_count + 1, updated_at = ?
-                    WHERE chat_id = ?
-                    """,
-                    (format_beijing_time(), chat_id),
-                )
-            if cursor.rowcount and chat_id_str in self.data:
-                self.data[chat_id_str]["message_count"] = (
-                    self.data[chat_id_str].get("message_count", 0) + 1
-                )
+                for chat_id, count in counts.items():
+                    cursor = conn.execute(
+                        """
+                        UPDATE telegram_chats
+                        SET message_count = message_count + ?, updated_at = ?
+                        WHERE chat_id = ?
+                        """,
+                        (count, updated_at, chat_id),
+                    )
+                    if cursor.rowcount:
+                        updated.append(chat_id)
+            for chat_id in updated:
+                chat = self._get_chat_unlocked(chat_id)
+                if chat:
+                    chat["message_count"] += counts[chat_id]
+                    chat["updated_at"] = updated_at
+                    self._registry_unlocked().put(chat)
 
     def get_notification_mode(self, chat_id: int) -> str:
-        with self._FILE_LOCK:
-            chat = self._get_chat_unlocked(chat_id)
-            if chat:
-                return chat.get("notification_mode", DEFAULT_NOTIFICATION_MODE)
-            return DEFAULT_NOTIFICATION_MODE
+        return self.snapshot().notification_mode(chat_id)
 
     def set_notification_mode(self, chat_id: int, mode: str) -> bool:
         if mode not in VALID_NOTIFICATION_MODES:
             return False
         with self._FILE_LOCK:
-            chat_id_str = str(chat_id)
             updated_at = format_beijing_time()
             with connect() as conn:
                 cursor = conn.execute(
@@ -225,9 +292,11 @@ class ChatStorage:
                 )
             if not cursor.rowcount:
                 return False
-            if chat_id_str in self.data:
-                self.data[chat_id_str]["notification_mode"] = mode
-                self.data[chat_id_str]["updated_at"] = updated_at
+            chat = self._get_chat_unlocked(chat_id)
+            if chat:
+                chat["notification_mode"] = mode
+                chat["updated_at"] = updated_at
+                self._registry_unlocked().put(chat)
             return True
 
     @staticmethod
@@ -306,6 +375,13 @@ class ChatStorage:
             "DELETE FROM contract_message_ids WHERE telegram_chat_id = ?",
             (old_chat_id,),
         )
+        # 两个群组可能追踪同一合约，合约合并时已去重，统计不能直接相加，
+        # 按合并后的合约重建新群组的统计
+        conn.execute(
+            "DELETE FROM daily_trend_stats WHERE chat_id IN (?, ?)",
+            (old_chat_id, new_chat_id),
+        )
+        conn.execute(trend_stats_upsert_sql("c.chat_id = ?"), (1, new_chat_id))
 
         for state_prefix in (
             "last_summary_report_marker:",
@@ -366,9 +442,10 @@ class ChatStorage:
                     (old_chat_id,),
                 )
                 conn.commit()
+            invalidate_contract_caches((old_chat_id, new_chat_id))
 
-            self.data.pop(str(old_chat_id), None)
-            self.data[str(new_chat_id)] = migrated_chat
+            self._registry_unlocked().pop(old_chat_id)
+            self._cache_chat_unlocked(migrated_chat)
             print("✅ 已迁移群组订阅到新的 supergroup")
             return True
 
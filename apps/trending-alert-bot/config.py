@@ -13,6 +13,27 @@ def _required_env(name: str) -> str:
     return value
 
 
+def _parse_number(name: str, raw, minimum, cast=int, exclusive: bool = False):
+    """把 raw 解析为 cast 类型并校验下限，失败时抛出带变量名的 RuntimeError。
+
+    exclusive 为 True 时要求严格大于 minimum。
+    """
+    try:
+        value = cast(raw)
+    except (TypeError, ValueError):
+        kind = "an integer" if cast is int else "a number"
+        raise RuntimeError(f"{name} must be {kind}, got {raw!r}") from None
+    if value < minimum or (exclusive and value == minimum):
+        raise RuntimeError(f"{name} must be {'>' if exclusive else '>='} {minimum}")
+    return value
+
+
+def _env_number(name: str, default: str, minimum, cast=int, exclusive: bool = False):
+    """读取数值型环境变量，未设置或为空时使用 default。"""
+    raw = os.getenv(name, "").strip() or default
+    return _parse_number(name, raw, minimum, cast=cast, exclusive=exclusive)
+
+
 # 基础设置
 CHECK_INTERVAL = int(_required_env("BOT_CHECK_INTERVAL"))
 _bot_chains_raw = os.getenv("BOT_CHAINS", "").strip()
@@ -33,6 +54,64 @@ else:
     CHAINS = [BOT_CHAIN]
 BOT_CHAIN = CHAINS[0]
 
+# 扫描并发：每条链同时处理的群组/KOL 查询上限
+SCAN_CONCURRENCY = _env_number("BOT_SCAN_CONCURRENCY", "4", 0, exclusive=True)
+
+# 扫描调度：按链覆盖扫描间隔、存在待确认倍数时的加速间隔、失败退避上限（秒）
+CHAIN_CHECK_INTERVALS = {}
+_bot_chain_intervals_raw = os.getenv("BOT_CHAIN_CHECK_INTERVALS_JSON", "").strip()
+if _bot_chain_intervals_raw:
+    try:
+        parsed_chain_intervals = json.loads(_bot_chain_intervals_raw)
+    except json.JSONDecodeError:
+        raise RuntimeError("BOT_CHAIN_CHECK_INTERVALS_JSON must be valid JSON") from None
+    if not isinstance(parsed_chain_intervals, dict):
+        raise RuntimeError("BOT_CHAIN_CHECK_INTERVALS_JSON must be a JSON object")
+    for chain, chain_interval in parsed_chain_intervals.items():
+        chain = str(chain).strip().lower()
+        if chain not in CHAINS:
+            continue
+        CHAIN_CHECK_INTERVALS[chain] = _parse_number(
+            f"BOT_CHAIN_CHECK_INTERVALS_JSON[{chain}]",
+            chain_interval,
+            0,
+            exclusive=True,
+        )
+PENDING_CHECK_INTERVAL = _env_number("BOT_PENDING_CHECK_INTERVAL", "5", 0)
+SCAN_MAX_BACKOFF_SECONDS = _env_number("BOT_SCAN_MAX_BACKOFF_SECONDS", "300", 0)
+
+# XXYY HTTP 连接池：每个 host 的会话上限与空闲回收秒数
+XXYY_HTTP_POOL_SIZE = _env_number("XXYY_HTTP_POOL_SIZE", "8", 0, exclusive=True)
+XXYY_HTTP_IDLE_TIMEOUT_SECONDS = _env_number(
+    "XXYY_HTTP_IDLE_TIMEOUT_SECONDS", "60", 0, cast=float, exclusive=True
+)
+
+# KOL 持仓缓存：同一合约在候选筛选与倍数检查间复用，0 表示不缓存
+KOL_CACHE_TTL_SECONDS = _env_number("BOT_KOL_CACHE_TTL_SECONDS", "30", 0, cast=float)
+KOL_CACHE_MAX_ENTRIES = _env_number(
+    "BOT_KOL_CACHE_MAX_ENTRIES", "1024", 0, exclusive=True
+)
+
+# 合约状态缓存：每个 chain + chat_id 最多缓存的合约数，0 表示关闭
+CONTRACT_CACHE_SIZE = _env_number("BOT_CONTRACT_CACHE_SIZE", "5000", 0)
+CONTRACT_CACHE_VERIFY = _as_bool(os.getenv("BOT_CONTRACT_CACHE_VERIFY", "0"))
+
+# 趋势榜快照：是否把上一轮榜单指纹持久化到 runtime_state
+TRENDING_SNAPSHOT_PERSIST = _as_bool(os.getenv("BOT_TRENDING_SNAPSHOT_PERSIST", "0"))
+
+# /report 渲染结果缓存秒数（按群组），0 表示不缓存
+REPORT_CACHE_TTL_SECONDS = _env_number(
+    "BOT_REPORT_CACHE_TTL_SECONDS", "60", 0, cast=float
+)
+
+# 汇总报告复用扫描快照的最大时效（秒），超过后重新请求趋势榜，0 表示总是请求
+REPORT_SNAPSHOT_MAX_AGE_SECONDS = _env_number(
+    "BOT_REPORT_SNAPSHOT_MAX_AGE_SECONDS", "120", 0, cast=float
+)
+
+# 图片 file_id 缓存：imageUrl -> Telegram file_id 的最多条数，0 表示关闭
+PHOTO_FILE_ID_CACHE_SIZE = _env_number("BOT_PHOTO_FILE_ID_CACHE_SIZE", "2000", 0)
+
 # 汇总报告配置
 SUMMARY_REPORT_HOURS = [0, 4, 8, 12, 16, 20]
 SUMMARY_TOP_N = 3
@@ -107,6 +186,12 @@ NARRATIVE_TIMEOUT_SECONDS = int(os.getenv("NARRATIVE_TIMEOUT_SECONDS", "20"))
 if NARRATIVE_TIMEOUT_SECONDS <= 0:
     raise RuntimeError("NARRATIVE_TIMEOUT_SECONDS must be > 0")
 
+# 进程内缓存的已解码叙事分析条数（有效期跟随 expires_at），0 表示每次读 SQLite
+NARRATIVE_MEMORY_CACHE_SIZE = _env_number("NARRATIVE_MEMORY_CACHE_SIZE", "512", 0)
+
+# 通知等待叙事分析的截止时间（从候选选出开始计时），超时先发基础通知，分析完成后回复补发
+NARRATIVE_WAIT_SECONDS = _env_number("NARRATIVE_WAIT_SECONDS", "8", 0, cast=float)
+
 XAI_API_KEY = os.getenv("XAI_API_KEY", "").strip()
 
 # Telegram
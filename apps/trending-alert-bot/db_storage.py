@@ -1,12 +1,14 @@
 import os
 import sqlite3
 import threading
+import weakref
 
 from config import SQLITE_DB_FILE
 from timezone_utils import format_beijing_time
 
 _SCHEMA_LOCK = threading.RLock()
-CONTRACT_SCHEMA_VERSION = 2
+_SCHEMA_READY_PATHS = set()
+CONTRACT_SCHEMA_VERSION = 4
 _CONTRACT_COLUMNS = {
     "chain",
     "chat_id",
@@ -23,30 +25,111 @@ _RELATION_TABLES = (
     "contract_notified_multipliers",
     "contract_pending_multipliers",
 )
+# daily_trend_stats 的统计列
+TREND_STATS_COLUMNS = (
+    "trend_count",
+    "multiplier_contracts",
+    "multiplier_2x",
+    "multiplier_5x",
+    "multiplier_10x_plus",
+)
+
+
+class _PooledConnection(sqlite3.Connection):
+    """线程内复用的长连接。
+
+    `with connect() as conn:` 可以嵌套：只有最外层退出时才提交或回滚，
+    连接本身不会关闭，PRAGMA 只在创建时执行一次。
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lease_depth = 0
+        self.closed = False
 
+    def close(self):
+        self.closed = True
+        super().close()
+
+    def __enter__(self):
+        self._lease_depth += 1
+        return self
 
-class _ClosingConnection(sqlite3.Connection):
     def __exit__(self, exc_type, exc_value, traceback):
+        self._lease_depth -= 1
+        if self._lease_depth > 0:
+            return False
+        return super().__exit__(exc_type, exc_value, traceback)
+
+
+def _release_thread_connections(connections: dict):
+    with _ALL_CONNECTIONS_LOCK:
+        for conn in connections.values():
+            _ALL_CONNECTIONS.discard(conn)
+    for conn in connections.values():
         try:
-            return super().__exit__(exc_type, exc_value, traceback)
-        finally:
-            self.close()
+            conn.close()
+        except sqlite3.Error:
+            pass
+    connections.clear()
 
 
-def connect() -> sqlite3.Connection:
-    os.makedirs(os.path.dirname(SQLITE_DB_FILE), exist_ok=True)
+class _ThreadConnections:
+    """单个线程持有的连接；线程退出、本对象被回收时关闭其中的连接。"""
+
+    def __init__(self):
+        self.by_path = {}
+        weakref.finalize(self, _release_thread_connections, self.by_path)
+
+
+_THREAD_CONNECTIONS = threading.local()
+# 只弱引用各线程的连接：线程退出后连接随 _ThreadConnections 一起关闭并移出；
+# 回收可能发生在持锁期间的任意线程里，因此用可重入锁
+_ALL_CONNECTIONS: "weakref.WeakSet[_PooledConnection]" = weakref.WeakSet()
+_ALL_CONNECTIONS_LOCK = threading.RLock()
+
+
+def _open_connection(db_file: str) -> _PooledConnection:
+    os.makedirs(os.path.dirname(db_file), exist_ok=True)
     conn = sqlite3.connect(
-        SQLITE_DB_FILE,
+        db_file,
         timeout=5,
-        factory=_ClosingConnection,
+        factory=_PooledConnection,
+        check_same_thread=False,
     )
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA journal_mode = WAL")
     conn.execute("PRAGMA busy_timeout = 5000")
     conn.execute("PRAGMA foreign_keys = ON")
+    with _ALL_CONNECTIONS_LOCK:
+        _ALL_CONNECTIONS.add(conn)
+    return conn
+
+
+def connect() -> sqlite3.Connection:
+    """返回当前线程对 SQLITE_DB_FILE 的长连接（按数据库路径区分）。"""
+    holder = getattr(_THREAD_CONNECTIONS, "holder", None)
+    if holder is None:
+        holder = _THREAD_CONNECTIONS.holder = _ThreadConnections()
+    connections = holder.by_path
+    conn = connections.get(SQLITE_DB_FILE)
+    if conn is None or conn.closed:
+        conn = connections[SQLITE_DB_FILE] = _open_connection(SQLITE_DB_FILE)
     return conn
 
 
+def close_connections():
+    """关闭所有线程的池化连接，仅用于进程退出前释放文件句柄。"""
+    with _ALL_CONNECTIONS_LOCK:
+        connections = list(_ALL_CONNECTIONS)
+        _ALL_CONNECTIONS.clear()
+    for conn in connections:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+
 def _table_columns(conn: sqlite3.Connection, table_name: str) -> set:
     rows = conn.execute(f"PRAGMA table_info({table_name})").fetchall()
     return {row["name"] for row in rows}
@@ -69,6 +152,14 @@ def _create_contracts_table(conn: sqlite3.Connection, table_name: str = "contrac
         """)
 
 
+def _create_contract_indexes(conn: sqlite3.Connection):
+    # push_time 统一为 'YYYY-MM-DD HH:MM:SS'，字符串顺序即时间顺序
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_contracts_push_time
+        ON contracts (chain, chat_id, push_time)
+        """)
+
+
 def _create_contract_relation_tables(conn: sqlite3.Connection):
     conn.execute("""
         CREATE TABLE IF NOT EXISTS contract_message_ids (
@@ -111,6 +202,74 @@ def _create_contract_relation_tables(conn: sqlite3.Connection):
         """)
 
 
+def _create_trend_stats_table(conn: sqlite3.Connection):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS daily_trend_stats (
+            chain TEXT NOT NULL,
+            chat_id INTEGER NOT NULL,
+            day TEXT NOT NULL,
+            trend_count INTEGER NOT NULL DEFAULT 0,
+            multiplier_contracts INTEGER NOT NULL DEFAULT 0,
+            multiplier_2x INTEGER NOT NULL DEFAULT 0,
+            multiplier_5x INTEGER NOT NULL DEFAULT 0,
+            multiplier_10x_plus INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (chain, chat_id, day)
+        )
+        """)
+
+
+def trend_stats_upsert_sql(contract_filter: str) -> str:
+    """把 contract_filter 选中的合约按 ±1 计入其推送日的统计。
+
+    与汇总报告口径一致：只统计已成功推送（存在 message_id != -1）的合约，
+    倍数档位取最大已通知倍数的整数部分。第一个参数为符号（1 或 -1）。
+    """
+    return f"""
+        INSERT INTO daily_trend_stats (
+            chain, chat_id, day, trend_count, multiplier_contracts,
+            multiplier_2x, multiplier_5x, multiplier_10x_plus
+        )
+        SELECT
+            chain, chat_id, day,
+            sign * COUNT(*),
+            sign * COUNT(top_int),
+            sign * SUM(IFNULL(top_int, 0) BETWEEN 2 AND 4),
+            sign * SUM(IFNULL(top_int, 0) BETWEEN 5 AND 9),
+            sign * SUM(IFNULL(top_int, 0) >= 10)
+        FROM (
+            SELECT
+                ? AS sign,
+                c.chain,
+                c.chat_id,
+                substr(c.push_time, 1, 10) AS day,
+                (
+                    SELECT CAST(MAX(n.multiplier) AS INTEGER)
+                    FROM contract_notified_multipliers AS n
+                    WHERE n.chain = c.chain
+                      AND n.chat_id = c.chat_id
+                      AND n.token_address = c.token_address
+                ) AS top_int
+            FROM contracts AS c
+            WHERE {contract_filter}
+              AND c.push_time != ''
+              AND EXISTS (
+                  SELECT 1 FROM contract_message_ids AS m
+                  WHERE m.chain = c.chain
+                    AND m.chat_id = c.chat_id
+                    AND m.token_address = c.token_address
+                    AND m.message_id != -1
+              )
+        )
+        GROUP BY chain, chat_id, day
+        ON CONFLICT(chain, chat_id, day) DO UPDATE SET
+            trend_count = trend_count + excluded.trend_count,
+            multiplier_contracts = multiplier_contracts + excluded.multiplier_contracts,
+            multiplier_2x = multiplier_2x + excluded.multiplier_2x,
+            multiplier_5x = multiplier_5x + excluded.multiplier_5x,
+            multiplier_10x_plus = multiplier_10x_plus + excluded.multiplier_10x_plus
+        """
+
+
 def _table_exists(conn: sqlite3.Connection, table_name: str) -> bool:
     return (
         conn.execute(
@@ -121,26 +280,73 @@ def _table_exists(conn: sqlite3.Connection, table_name: str) -> bool:
     )
 
 
+def _contract_schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
 def _contract_schema_is_current(conn: sqlite3.Connection) -> bool:
-    if conn.execute("PRAGMA user_version").fetchone()[0] != CONTRACT_SCHEMA_VERSION:
+    if _contract_schema_version(conn) != CONTRACT_SCHEMA_VERSION:
         return False
     if not _table_exists(conn, "contracts"):
         return False
     return _table_columns(conn, "contracts") == _CONTRACT_COLUMNS
 
 
+def _upgrade_contract_schema_v2(conn: sqlite3.Connection):
+    """v2 → v3：清理无法解析的 push_time 并建立 (chain, chat_id, push_time) 索引。"""
+    conn.execute("""
+        UPDATE contracts
+        SET push_time = ''
+        WHERE push_time != '' AND datetime(push_time) IS NOT push_time
+        """)
+    _create_contract_indexes(conn)
+
+
+def _upgrade_contract_schema_v3(conn: sqlite3.Connection):
+    """v3 → v4：建立按日汇总统计表，并用现有合约回填。"""
+    conn.execute("DROP TABLE IF EXISTS daily_trend_stats")
+    _create_trend_stats_table(conn)
+    conn.execute(trend_stats_upsert_sql("1"), (1,))
+
+
+# key: 起始版本；升级函数只负责把 schema 从该版本迁到下一版本
+_CONTRACT_SCHEMA_UPGRADES = {
+    2: _upgrade_contract_schema_v2,
+    3: _upgrade_contract_schema_v3,
+}
+
+
+def _contract_schema_is_upgradable(conn: sqlite3.Connection) -> bool:
+    if _contract_schema_version(conn) not in _CONTRACT_SCHEMA_UPGRADES:
+        return False
+    if not _table_exists(conn, "contracts"):
+        return False
+    return _table_columns(conn, "contracts") == _CONTRACT_COLUMNS
+
+
+def _upgrade_tracking_schema(conn: sqlite3.Connection):
+    version = _contract_schema_version(conn)
+    while version < CONTRACT_SCHEMA_VERSION:
+        _CONTRACT_SCHEMA_UPGRADES[version](conn)
+        version += 1
+        conn.execute(f"PRAGMA user_version = {version}")
+
+
 def _drop_tracking_tables(conn: sqlite3.Connection):
     for table_name in _RELATION_TABLES:
         conn.execute(f"DROP TABLE IF EXISTS {table_name}")
     conn.execute("DROP TABLE IF EXISTS narrative_analysis")
+    conn.execute("DROP TABLE IF EXISTS daily_trend_stats")
     conn.execute("DROP TABLE IF EXISTS contracts")
 
 
 def _recreate_tracking_schema(conn: sqlite3.Connection):
     _drop_tracking_tables(conn)
     _create_contracts_table(conn)
+    _create_contract_indexes(conn)
     _create_contract_relation_tables(conn)
     _create_narrative_analysis_table(conn)
+    _create_trend_stats_table(conn)
     conn.execute(f"PRAGMA user_version = {CONTRACT_SCHEMA_VERSION}")
 
 
@@ -165,54 +371,93 @@ def _create_narrative_analysis_table(conn: sqlite3.Connection):
         """)
 
 
-def ensure_schema():
-    with _SCHEMA_LOCK:
-        with connect() as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS telegram_chats (
-                    chat_id INTEGER PRIMARY KEY,
-                    type TEXT NOT NULL DEFAULT 'unknown',
-                    title TEXT NOT NULL DEFAULT '',
-                    username TEXT NOT NULL DEFAULT '',
-                    first_name TEXT NOT NULL DEFAULT '',
-                    last_name TEXT NOT NULL DEFAULT '',
-                    added_at TEXT NOT NULL DEFAULT '',
-                    updated_at TEXT NOT NULL DEFAULT '',
-                    removed_at TEXT NOT NULL DEFAULT '',
-                    active INTEGER NOT NULL DEFAULT 1,
-                    message_count INTEGER NOT NULL DEFAULT 0,
-                    notification_mode TEXT NOT NULL DEFAULT 'all'
-                )
-                """)
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS runtime_state (
-                    key TEXT PRIMARY KEY,
-                    value TEXT NOT NULL DEFAULT '',
-                    updated_at TEXT NOT NULL DEFAULT ''
-                )
-                """)
+def _create_photo_cache_table(conn: sqlite3.Connection):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS telegram_photo_cache (
+            image_url TEXT PRIMARY KEY,
+            file_id TEXT NOT NULL,
+            last_used_at REAL NOT NULL
+        )
+        """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_telegram_photo_cache_last_used
+        ON telegram_photo_cache (last_used_at)
+        """)
+
+
+def _migrate_schema():
+    with connect() as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS telegram_chats (
+                chat_id INTEGER PRIMARY KEY,
+                type TEXT NOT NULL DEFAULT 'unknown',
+                title TEXT NOT NULL DEFAULT '',
+                username TEXT NOT NULL DEFAULT '',
+                first_name TEXT NOT NULL DEFAULT '',
+                last_name TEXT NOT NULL DEFAULT '',
+                added_at TEXT NOT NULL DEFAULT '',
+                updated_at TEXT NOT NULL DEFAULT '',
+                removed_at TEXT NOT NULL DEFAULT '',
+                active INTEGER NOT NULL DEFAULT 1,
+                message_count INTEGER NOT NULL DEFAULT 0,
+                notification_mode TEXT NOT NULL DEFAULT 'all'
+            )
+            """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS runtime_state (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL DEFAULT '',
+                updated_at TEXT NOT NULL DEFAULT ''
+            )
+            """)
+        _create_photo_cache_table(conn)
+        if _contract_schema_is_current(conn):
+            _create_contracts_table(conn)
+            _create_contract_indexes(conn)
+            _create_contract_relation_tables(conn)
+            _create_narrative_analysis_table(conn)
+            _create_trend_stats_table(conn)
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
             if _contract_schema_is_current(conn):
                 _create_contracts_table(conn)
+                _create_contract_indexes(conn)
                 _create_contract_relation_tables(conn)
                 _create_narrative_analysis_table(conn)
-                return
-
-            conn.execute("BEGIN IMMEDIATE")
-            try:
-                if _contract_schema_is_current(conn):
-                    _create_contracts_table(conn)
-                    _create_contract_relation_tables(conn)
-                    _create_narrative_analysis_table(conn)
-                else:
-                    _recreate_tracking_schema(conn)
-                conn.commit()
-            except Exception:
-                conn.rollback()
-                raise
+                _create_trend_stats_table(conn)
+            elif _contract_schema_is_upgradable(conn):
+                _create_contract_relation_tables(conn)
+                _upgrade_tracking_schema(conn)
+                _create_narrative_analysis_table(conn)
+            else:
+                _recreate_tracking_schema(conn)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+
+def ensure_schema():
+    """完整检查并迁移 schema；结果按数据库路径记入进程内缓存。"""
+    with _SCHEMA_LOCK:
+        _migrate_schema()
+        _SCHEMA_READY_PATHS.add(SQLITE_DB_FILE)
+
+
+def ensure_schema_ready():
+    """热路径使用：同一数据库路径在进程内只执行一次 ensure_schema。"""
+    if SQLITE_DB_FILE in _SCHEMA_READY_PATHS:
+        return
+    with _SCHEMA_LOCK:
+        if SQLITE_DB_FILE in _SCHEMA_READY_PATHS:
+            return
+        ensure_schema()
 
 
 def get_runtime_state(key: str, default: str = "") -> str:
-    ensure_schema()
+    ensure_schema_ready()
     with connect() as conn:
         row = conn.execute(
             "SELECT value FROM runtime_state WHERE key = ?",
@@ -222,7 +467,7 @@ def get_runtime_state(key: str, default: str = "") -> str:
 
 
 def set_runtime_state(key: str, value: str):
-    ensure_schema()
+    ensure_schema_ready()
     with connect() as conn:
         conn.execute(
             """
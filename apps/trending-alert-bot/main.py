@@ -13,6 +13,7 @@ _RUNTIME_MODULE_NAMES = (
     "telegram_bot",
     "storage",
     "chat_storage",
+    "photo_cache",
     "db_storage",
     "narrative_service",
     "narrative_storage",
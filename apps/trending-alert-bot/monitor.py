@@ -1,5 +1,6 @@
 """监控调度与启动入口。"""
 
+import asyncio
 import os
 import time
 from typing import List, Optional
@@ -7,29 +8,42 @@ from typing import List, Optional
 from chat_storage import ChatStorage
 from config import (
     CHAINS,
+    CHAIN_CHECK_INTERVALS,
     CHECK_INTERVAL,
     DRY_RUN,
     ENABLE_TELEGRAM,
     NOTIFICATION_TYPES,
+    PENDING_CHECK_INTERVAL,
+    SCAN_MAX_BACKOFF_SECONDS,
     SILENT_INIT,
     STORAGE_DIR,
     SUMMARY_REPORT_HOURS,
 )
+from db_storage import close_connections
 from monitor_flow import (
+    _run_blocking,
+    chain_has_pending_multipliers,
     ensure_chat_storage,
     initialize_storage,
     make_storage_key,
     due_summary_report_hour,
     load_last_summary_marker,
-    scan_once,
+    log_kol_cache_stats,
+    log_narrative_cache_stats,
+    scan_once_async,
     save_last_summary_marker,
     send_summary_report,
     summary_report_marker,
 )
+from scan_scheduler import ScanScheduler
 from telegram_bot import notifier
 from timezone_utils import beijing_now
 
 
+# 健康检查与汇总报告的执行间隔；汇总报告窗口以小时计，无需跟随扫描节拍
+_MAINTENANCE_INTERVAL_SECONDS = CHECK_INTERVAL
+
+
 def normalize_clear_targets(raw_value: Optional[str]) -> List[str]:
     """将用户输入的链名称解析为受支持的链列表。"""
     if not raw_value:
@@ -100,23 +114,189 @@ def _active_chats(chat_storage: ChatStorage) -> List[dict]:
     return active_chats
 
 
+async def _scan_chain(
+    chain: str,
+    active_chats: List[dict],
+    storages: dict,
+    chat_storage: ChatStorage,
+    scheduler: Optional[ScanScheduler] = None,
+) -> bool:
+    print(f"🔎 扫描链: {chain.upper()}")
+    try:
+        found = await scan_once_async(chain, active_chats, storages, chat_storage)
+    except Exception as e:
+        print(f"⚠️  [{chain.upper()}] 本轮扫描失败，跳过该链: {e}")
+        if scheduler:
+            delay = scheduler.record_failure(chain)
+            print(f"⏳ [{chain.upper()}] {delay:.0f}s 后重试")
+        return False
+    if scheduler:
+        has_pending = await _run_blocking(
+            chain_has_pending_multipliers, storages, chain
+        )
+        scheduler.record_success(chain, has_pending=has_pending)
+    return found
+
+
+async def _scan_chains_async(
+    chains: List[str],
+    active_chats: List[dict],
+    storages: dict,
+    chat_storage: ChatStorage,
+    scheduler: Optional[ScanScheduler] = None,
+) -> List[bool]:
+    return await asyncio.gather(
+        *(
+            _scan_chain(chain, active_chats, storages, chat_storage, scheduler)
+            for chain in chains
+        )
+    )
+
+
 def scan_chains_once(
     chains: List[str],
     active_chats: List[dict],
     storages: dict,
     chat_storage: ChatStorage,
+    scheduler: Optional[ScanScheduler] = None,
 ) -> bool:
-    found_any_anomaly = False
-    for chain in chains:
-        print(f"🔎 扫描链: {chain.upper()}")
+    """所有链并发扫描一轮（Dry-run 使用）；单链失败不影响其他链。
+    传入 scheduler 时记录每条链的结果。"""
+    results = asyncio.run(
+        _scan_chains_async(chains, active_chats, storages, chat_storage, scheduler)
+    )
+    log_kol_cache_stats()
+    log_narrative_cache_stats()
+    return any(results)
+
+
+def _cleanup_due(now, last_cleanup_day: int) -> bool:
+    return now.day != last_cleanup_day and now.hour == 0 and now.minute >= 5
+
+
+def _cleanup_chain_storages(chain: str, storages: dict) -> int:
+    total_deleted = 0
+    for storage in list(storages.values()):
+        if storage.chain == chain:
+            total_deleted += storage.cleanup_old_data(days_to_keep=7)
+    return total_deleted
+
+
+async def _chain_scan_loop(chain: str, storages: dict, scheduler: ScanScheduler):
+    """单条链的常驻扫描任务：按 scheduler 给出的截止时间循环扫描。
+
+    每条链各自等待、各自扫描，一条链的慢请求或超时只推迟它自己的下一轮。
+    旧数据清理也在这里按链执行，与该链的扫描串行，不和扫描争用同一批存储。
+    """
+    label = chain.upper()
+    last_cleanup_day = beijing_now().day
+    while True:
+        wait_seconds = scheduler.seconds_until(chain)
+        if wait_seconds > 0:
+            await asyncio.sleep(wait_seconds)
+
         try:
-            found_any_anomaly = (
-                scan_once(chain, active_chats, storages, chat_storage)
-                or found_any_anomaly
+            current_time = beijing_now()
+            if _cleanup_due(current_time, last_cleanup_day):
+                print(f"\n🧹 [{label}] 开始清理旧数据...")
+                deleted = await _run_blocking(_cleanup_chain_storages, chain, storages)
+                if deleted > 0:
+                    print(f"✅ [{label}] 清理完成，共删除 {deleted} 个合约\n")
+                else:
+                    print(f"✅ [{label}] 无需清理\n")
+                last_cleanup_day = current_time.day
+
+            chat_storage = ChatStorage()
+            active_chats = _active_chats(chat_storage)
+            if not active_chats:
+                print(f"⚠️  [{label}] 当前没有活跃聊天，跳过本轮")
+                scheduler.record_success(chain)
+                continue
+
+            scan_time = current_time.strftime("%H:%M:%S")
+            print(f"\n🔍 [{scan_time}] 扫描趋势榜: {label}")
+            found = await _scan_chain(
+                chain, active_chats, storages, chat_storage, scheduler
             )
+            log_kol_cache_stats()
+            log_narrative_cache_stats()
+            if not found:
+                print(f"ℹ️ [{label}] 本轮未找到异动数据")
         except Exception as e:
-            print(f"⚠️  [{chain.upper()}] 本轮扫描失败，跳过该链: {e}")
-    return found_any_anomaly
+            print(f"❌ [{label}] 发生错误: {e}")
+            delay = scheduler.record_failure(chain)
+            print(f"⏳ [{label}] {delay:.0f}s 后重试")
+
+
+async def _run_maintenance(storages: dict, last_summary_marker: str) -> str:
+    """Telegram 健康检查与整点汇总报告；返回最新的报告标记。
+
+    Telegram worker 无法恢复时抛出 TelegramRuntimeError，由调用方终止监控。
+    """
+    if ENABLE_TELEGRAM:
+        await _run_blocking(notifier.ensure_healthy)
+
+    try:
+        report_time_hour = due_summary_report_hour(last_summary_marker)
+        if report_time_hour != -1:
+            print(f"\n📊 发送 {report_time_hour}:00 汇总报告...")
+            if await _run_blocking(send_summary_report, storages, report_time_hour):
+                await _run_blocking(save_last_summary_marker, report_time_hour)
+                last_summary_marker = summary_report_marker(report_time_hour)
+    except Exception as e:
+        print(f"❌ 发生错误: {e}")
+    return last_summary_marker
+
+
+async def _maintenance_loop(storages: dict, last_summary_marker: str):
+    while True:
+        await asyncio.sleep(_MAINTENANCE_INTERVAL_SECONDS)
+        last_summary_marker = await _run_maintenance(storages, last_summary_marker)
+
+
+async def _monitor_async(
+    chains: List[str],
+    storages: dict,
+    scheduler: ScanScheduler,
+    last_summary_marker: str,
+):
+    """每条链一个常驻扫描任务，另有一个维护任务；任一任务异常退出即停止全部。"""
+    last_summary_marker = await _run_maintenance(storages, last_summary_marker)
+    tasks = [
+        asyncio.create_task(
+            _chain_scan_loop(chain, storages, scheduler), name=f"scan-{chain}"
+        )
+        for chain in chains
+    ]
+    tasks.append(
+        asyncio.create_task(
+            _maintenance_loop(storages, last_summary_marker), name="maintenance"
+        )
+    )
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in done:
+            task.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _dry_run_scan(chains: List[str], storages: dict, scheduler: ScanScheduler):
+    try:
+        chat_storage = ChatStorage()
+        active_chats = _active_chats(chat_storage)
+        found_any_anomaly = scan_chains_once(
+            chains, active_chats, storages, chat_storage, scheduler
+        )
+    except Exception as e:
+        print(f"❌ 发生错误: {e}")
+        print("🧪 Dry-run 失败，退出")
+        raise
+    if not found_any_anomaly:
+        print("ℹ️ 本轮未找到异动数据")
+    print("🧪 Dry-run 完成，退出")
 
 
 def monitor_trending(clear_storage: Optional[List[str]] = None):
@@ -130,8 +310,19 @@ def monitor_trending(clear_storage: Optional[List[str]] = None):
     chat_storage = ChatStorage()
     storages = {}
 
+    scheduler = ScanScheduler(
+        chains,
+        CHECK_INTERVAL,
+        chain_intervals=CHAIN_CHECK_INTERVALS,
+        fast_interval=PENDING_CHECK_INTERVAL,
+        max_backoff=SCAN_MAX_BACKOFF_SECONDS,
+    )
+    interval_desc = ", ".join(
+        f"{chain.upper()} {scheduler.interval(chain):.0f}s" for chain in chains
+    )
+
     print(
-        f"🤖 Bot 启动 | 链: {', '.join([c.upper() for c in chains])} | 间隔: {CHECK_INTERVAL}s"
+        f"🤖 Bot 启动 | 链: {', '.join([c.upper() for c in chains])} | 间隔: {interval_desc}"
     )
     print(f"🧩 Runtime | data_dir: {STORAGE_DIR}")
     print(f"📊 策略: {', '.join(NOTIFICATION_TYPES)} + 整数倍通知(所有符合条件)")
@@ -152,89 +343,23 @@ def monitor_trending(clear_storage: Optional[List[str]] = None):
     for chain in chains:
         _bootstrap_storages(chain, clear_targets, storages, active_chats)
 
-    if SILENT_INIT and not DRY_RUN:
+    if DRY_RUN:
+        _dry_run_scan(chains, storages, scheduler)
+        close_connections()
+        return
+
+    if SILENT_INIT:
         print(f"\n⏳ 等待 {CHECK_INTERVAL} 秒后开始监控...\n")
         time.sleep(CHECK_INTERVAL)
 
-    last_summary_marker = (
-        "" if DRY_RUN else load_last_summary_marker() or _initial_report_marker()
-    )
-    last_cleanup_day = beijing_now().day
-
-    while True:
-        try:
-            if ENABLE_TELEGRAM and not DRY_RUN:
-                notifier.ensure_healthy()
-        except KeyboardInterrupt:
-            print("\n\n👋 机器人已停止")
+    last_summary_marker = load_last_summary_marker() or _initial_report_marker()
+    try:
+        asyncio.run(
+            _monitor_async(chains, storages, scheduler, last_summary_marker)
+        )
+    except KeyboardInterrupt:
+        print("\n\n👋 机器人已停止")
+        if ENABLE_TELEGRAM:
             notifier.stop_bot()
-            break
-
-        try:
-            scan_time = beijing_now().strftime("%H:%M:%S")
-            print(f"\n🔍 [{scan_time}] 扫描趋势榜...")
-
-            chat_storage = ChatStorage()
-            active_chats = _active_chats(chat_storage)
-            if not active_chats:
-                print("⚠️  当前没有活跃聊天，跳过本轮")
-                time.sleep(CHECK_INTERVAL)
-                continue
-
-            current_time = beijing_now()
-            if (
-                current_time.day != last_cleanup_day
-                and current_time.hour == 0
-                and current_time.minute >= 5
-            ):
-                print("\n🧹 开始清理旧数据...")
-                total_deleted = 0
-                for storage_key, storage in storages.items():
-                    deleted = storage.cleanup_old_data(days_to_keep=7)
-                    if deleted > 0:
-                        chain = (
-                            storage_key.split(":", 1)[0]
-                            if ":" in storage_key
-                            else (chains[0] if chains else "unknown")
-                        )
-                        print(f"  • {chain.upper()}: 清理 {deleted} 个合约")
-                        total_deleted += deleted
-                if total_deleted > 0:
-                    print(f"✅ 清理完成，共删除 {total_deleted} 个合约\n")
-                else:
-                    print("✅ 无需清理\n")
-                last_cleanup_day = current_time.day
-
-            if not DRY_RUN:
-                report_time_hour = due_summary_report_hour(last_summary_marker)
-                if report_time_hour != -1:
-                    print(f"\n📊 发送 {report_time_hour}:00 汇总报告...")
-                    if send_summary_report(storages, report_time_hour):
-                        save_last_summary_marker(report_time_hour)
-                        last_summary_marker = summary_report_marker(report_time_hour)
-
-            found_any_anomaly = scan_chains_once(
-                chains, active_chats, storages, chat_storage
-            )
-
-            if DRY_RUN:
-                print("🧪 Dry-run 完成，退出")
-                break
-            print(f"⏳ 等待 {CHECK_INTERVAL}s...")
-            time.sleep(CHECK_INTERVAL)
-
-            if not found_any_anomaly:
-                print("ℹ️ 本轮未找到异动数据")
-
-        except KeyboardInterrupt:
-            print("\n\n👋 机器人已停止")
-            if ENABLE_TELEGRAM:
-                notifier.stop_bot()
-            break
-        except Exception as e:
-            print(f"❌ 发生错误: {e}")
-            if DRY_RUN:
-                print("🧪 Dry-run 失败，退出")
-                raise
-            print(f"⏳ {CHECK_INTERVAL} 秒后重试...\n")
-            time.sleep(CHECK_INTERVAL)
+    finally:
+        close_connections()
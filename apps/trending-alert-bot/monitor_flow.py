@@ -1,9 +1,16 @@
 """监控业务流程与通知编排。"""
 
-from concurrent.futures import ThreadPoolExecutor
+import asyncio
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from functools import partial
 import json
-from typing import Dict, List, Optional, Tuple
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple, Union
+import weakref
 
 from api import fetch_trending, fetch_kol_holders
 from chat_storage import ChatStorage
@@ -12,26 +19,156 @@ from config import (
     CHAIN_ALLOWLISTS,
     DRY_RUN,
     ENABLE_TELEGRAM,
+    KOL_CACHE_MAX_ENTRIES,
+    KOL_CACHE_TTL_SECONDS,
     MULTIPLIER_CONFIRMATIONS,
+    NARRATIVE_ENABLED,
+    NARRATIVE_WAIT_SECONDS,
     NOTIFICATION_TYPES,
     NOTIFY_COOLDOWN_HOURS,
+    REPORT_CACHE_TTL_SECONDS,
+    REPORT_SNAPSHOT_MAX_AGE_SECONDS,
+    SCAN_CONCURRENCY,
     SUMMARY_REPORT_HOURS,
     SUMMARY_TOP_N,
+    TRENDING_SNAPSHOT_PERSIST,
 )
 from db_storage import get_runtime_state, set_runtime_state
-from narrative_service import analyze_contract_narrative
+from narrative_service import analyze_contract_narrative, narrative_cache_stats
 from notifier import (
     format_initial_notification,
     format_multiplier_notification,
+    format_narrative_followup,
     format_summary_report,
 )
 from storage import ContractStorage
-from telegram_bot import notifier
-from timezone_utils import beijing_now, beijing_today_start, parse_time_to_beijing
+from telegram_bot import TelegramRuntimeError, notifier
+from timezone_utils import (
+    BEIJING_TZ,
+    beijing_now,
+    beijing_today_start,
+    parse_time_to_beijing,
+)
+from trending_snapshot import TrendingSnapshotStore
+from ttl_cache import TTLCache
 
 _REPORT_FETCH_EXECUTOR = ThreadPoolExecutor(
     max_workers=5, thread_name_prefix="report-fetch"
 )
+# 每条链的抓取 + 每个群组的处理都在此线程池运行，容量覆盖全部链的并发上限
+_SCAN_EXECUTOR = ThreadPoolExecutor(
+    max_workers=len(CHAINS) * (SCAN_CONCURRENCY + 1),
+    thread_name_prefix="scan",
+)
+
+# 候选 KOL 探测与扫描线程池分离，避免扫描线程等待自身线程池而死锁
+_KOL_PROBE_EXECUTOR = ThreadPoolExecutor(
+    max_workers=len(CHAINS) * SCAN_CONCURRENCY,
+    thread_name_prefix="kol-probe",
+)
+
+# 叙事分析（xAI 调用最长 NARRATIVE_TIMEOUT_SECONDS）独立线程池，每条链的趋势与异动候选并行
+_NARRATIVE_EXECUTOR = ThreadPoolExecutor(
+    max_workers=len(CHAINS) * 2,
+    thread_name_prefix="narrative",
+)
+
+# KOL 持仓缓存，key 为 (chain, tokenAddress, pairAddress)
+_KOL_CACHE = TTLCache(KOL_CACHE_TTL_SECONDS, max_entries=KOL_CACHE_MAX_ENTRIES)
+
+# /report 渲染后的报告文本，key 为 chat_id；群成员连续触发时直接复用
+_REPORT_CACHE = TTLCache(REPORT_CACHE_TTL_SECONDS, max_entries=256)
+
+# 按链保存上一轮趋势榜，用于增量处理
+_TRENDING_SNAPSHOTS = (
+    TrendingSnapshotStore(get_runtime_state, set_runtime_state)
+    if TRENDING_SNAPSHOT_PERSIST
+    else TrendingSnapshotStore()
+)
+# 已完成过一次全量倍数检查的存储；此后只检查榜单变化或仍可能触发的合约
+_FULLY_SCANNED_STORAGES: "weakref.WeakSet[ContractStorage]" = weakref.WeakSet()
+
+# 已入队的 Telegram 投递，key 为 (chain, chat_id, token_address)，value 为 (future, 入队时间)。
+# 发送中的合约跳过检查，避免下一轮扫描在消息 ID 落盘前重复通知
+_DELIVERIES: Dict[Tuple[str, int, str], Tuple[Future, float]] = {}
+_DELIVERIES_LOCK = threading.Lock()
+_DELIVERY_RECORD_TTL_SECONDS = 600
+
+
+def _analyze_narrative(
+    contract: dict, chain: str, kol_with_positions: List[dict]
+) -> Optional[dict]:
+    token_address = contract.get("tokenAddress")
+    try:
+        narrative_analysis = analyze_contract_narrative(
+            contract,
+            chain,
+            kol_with_positions,
+        )
+        if narrative_analysis:
+            return narrative_analysis.to_display_dict()
+    except Exception as e:
+        print(
+            f"⚠️ [{chain.upper() or 'N/A'}] {contract.get('symbol', 'N/A')} "
+            f"叙事分析失败，继续发送基础通知: {token_address} | {e}"
+        )
+    return None
+
+
+class _NarrativeTasks:
+    """单轮扫描内跨群组共享的叙事分析任务，同一合约只提交一次。
+
+    截止时间从任务提交时开始计算，后处理的群组不会重新等待完整时长。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tasks: Dict[Tuple[str, str], Tuple[Future, float]] = {}
+
+    def start(
+        self, contract: dict, chain: str, kol_with_positions: List[dict]
+    ) -> Tuple[Future, float]:
+        key = (chain, contract.get("tokenAddress"))
+        with self._lock:
+            task = self._tasks.get(key)
+            if task is None:
+                task = self._tasks[key] = (
+                    _NARRATIVE_EXECUTOR.submit(
+                        _analyze_narrative, contract, chain, kol_with_positions
+                    ),
+                    time.monotonic() + NARRATIVE_WAIT_SECONDS,
+                )
+            return task
+
+
+async def _run_blocking(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_SCAN_EXECUTOR, partial(fn, *args, **kwargs))
+
+
+def _track_delivery(storage: ContractStorage, token_address: str, future: Future):
+    now = time.monotonic()
+    with _DELIVERIES_LOCK:
+        expired = [
+            key
+            for key, (delivery, queued_at) in _DELIVERIES.items()
+            if delivery.done() and now - queued_at > _DELIVERY_RECORD_TTL_SECONDS
+        ]
+        for key in expired:
+            del _DELIVERIES[key]
+        _DELIVERIES[(storage.chain, storage.chat_id, token_address)] = (future, now)
+
+
+def _pop_delivery(storage: ContractStorage, token_address: str) -> Optional[Future]:
+    """返回该合约最近一次入队的投递；已完成的记录随之清除。"""
+    key = (storage.chain, storage.chat_id, token_address)
+    with _DELIVERIES_LOCK:
+        entry = _DELIVERIES.get(key)
+        if entry is None:
+            return None
+        if entry[0].done():
+            del _DELIVERIES[key]
+        return entry[0]
 
 
 def make_storage_key(chat_id: int, chain: str = "") -> str:
@@ -58,6 +195,102 @@ def _is_honeypot_contract(contract: dict) -> bool:
     return bool(_safe_dict(security.get("honeyPot")).get("value", False))
 
 
+def _parse_create_time(create_time) -> Optional[datetime]:
+    """createTime 为毫秒时间戳，转为北京时间（naive）；缺失或非法时返回 None"""
+    if not create_time:
+        return None
+    try:
+        return datetime.fromtimestamp(int(create_time) / 1000, tz=BEIJING_TZ).replace(
+            tzinfo=None
+        )
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
+
+
+@dataclass(frozen=True, slots=True)
+class TrendingContract:
+    """趋势榜合约的预解析记录，每次 API 响应只解析一次，由所有群组共享。
+
+    raw 保留接口返回的原始 dict，供格式化、叙事分析与存储使用。
+    """
+
+    raw: dict
+    token_address: str
+    pair_address: str
+    symbol: str
+    price: float
+    market_cap: float
+    create_time: Optional[datetime]
+    is_honeypot: bool
+    launch_from: str
+    dex_name: str
+    # 创建时间早于北京时间当天 00:00 或不可用
+    is_anomaly: bool
+
+
+def parse_trending_contract(
+    contract: dict, today_start: Optional[datetime] = None
+) -> TrendingContract:
+    if today_start is None:
+        today_start = beijing_today_start().replace(tzinfo=None)
+    create_time = _parse_create_time(contract.get("createTime"))
+    return TrendingContract(
+        raw=contract,
+        token_address=contract.get("tokenAddress") or "",
+        pair_address=contract.get("pairAddress") or "",
+        symbol=contract.get("symbol", "N/A"),
+        price=_safe_float(contract.get("priceUSD")),
+        market_cap=_safe_float(contract.get("marketCapUSD")),
+        create_time=create_time,
+        is_honeypot=_is_honeypot_contract(contract),
+        launch_from=contract.get("launchFrom") or "",
+        dex_name=contract.get("dexName") or "",
+        is_anomaly=create_time is None or create_time < today_start,
+    )
+
+
+def parse_trending_contracts(
+    contracts: List[Union[dict, TrendingContract]],
+) -> List[TrendingContract]:
+    """解析一次 API 响应；「今天 00:00」对整页只计算一次，已解析的记录原样保留。"""
+    today_start = beijing_today_start().replace(tzinfo=None)
+    return [
+        contract
+        if isinstance(contract, TrendingContract)
+        else parse_trending_contract(contract, today_start)
+        for contract in contracts
+        if isinstance(contract, (dict, TrendingContract))
+    ]
+
+
+def _as_trending_contract(contract: Union[dict, TrendingContract]) -> TrendingContract:
+    if isinstance(contract, TrendingContract):
+        return contract
+    return parse_trending_contract(contract)
+
+
+def prepare_scan_contracts(
+    contracts: List[Union[dict, TrendingContract]], chain: str
+) -> List[TrendingContract]:
+    """解析合约并应用价格与白名单过滤，每轮扫描每个合约只做一次。
+
+    传入的 TrendingContract 视为已经过本函数处理，原样保留。
+    """
+    today_start = beijing_today_start().replace(tzinfo=None)
+    prepared = []
+    for contract in contracts:
+        if isinstance(contract, TrendingContract):
+            prepared.append(contract)
+            continue
+        trending_contract = parse_trending_contract(contract, today_start)
+        if not trending_contract.token_address or trending_contract.price <= 0:
+            continue
+        if should_filter_contract(trending_contract, chain):
+            continue
+        prepared.append(trending_contract)
+    return prepared
+
+
 def split_kol_positions(
     kol_list: Optional[List[dict]],
 ) -> Tuple[List[dict], List[dict]]:
@@ -88,24 +321,68 @@ def _has_kol_trade_activity(kol_list: Optional[List[dict]]) -> bool:
     return False
 
 
-def fetch_kol_list(contract: dict, chain: str, context: str = "") -> List[dict]:
+def _load_kol_list(contract: dict, chain: str) -> List[dict]:
+    """经 KOL 缓存读取持仓；请求失败时抛出异常，失败结果不会写入缓存。"""
     token_address = contract.get("tokenAddress")
     pair_address = contract.get("pairAddress", "")
 
     if not token_address:
         return []
 
-    try:
+    def load() -> List[dict]:
         kol_response = fetch_kol_holders(token_address, pair_address, chain)
         return kol_response.get("data", []) or []
+
+    kol_list = _KOL_CACHE.get_or_load((chain, token_address, pair_address), load)
+    return list(kol_list)
+
+
+def _log_kol_fetch_error(contract: dict, chain: str, context: str, error: Exception):
+    prefix = f"[{chain.upper()}] " if chain else ""
+    context_text = f"{context} " if context else ""
+    symbol = contract.get("symbol", "N/A")
+    print(f"⚠️ {prefix}{symbol} {context_text}获取 KOL 数据失败: {error}")
+
+
+def fetch_kol_list(contract: dict, chain: str, context: str = "") -> List[dict]:
+    try:
+        return _load_kol_list(contract, chain)
     except Exception as e:
-        prefix = f"[{chain.upper()}] " if chain else ""
-        context_text = f"{context} " if context else ""
-        symbol = contract.get("symbol", "N/A")
-        print(f"⚠️ {prefix}{symbol} {context_text}获取 KOL 数据失败: {e}")
+        _log_kol_fetch_error(contract, chain, context, e)
         return []
 
 
+def _probe_kol_list(contract: dict, chain: str) -> Optional[List[dict]]:
+    """候选探测用：请求失败返回 None，调用方据此不记录探测结果，下一轮重新探测。"""
+    try:
+        return _load_kol_list(contract, chain)
+    except Exception as e:
+        _log_kol_fetch_error(contract, chain, "筛选KOL", e)
+        return None
+
+
+def log_kol_cache_stats():
+    stats = _KOL_CACHE.stats()
+    lookups = stats["hits"] + stats["misses"]
+    hit_rate = stats["hits"] / lookups * 100 if lookups else 0.0
+    print(
+        f"📦 KOL 缓存: 命中 {stats['hits']} / 未命中 {stats['misses']}"
+        f" ({hit_rate:.0f}%)，条目 {stats['size']}"
+    )
+
+
+def log_narrative_cache_stats():
+    if not NARRATIVE_ENABLED:
+        return
+    stats = narrative_cache_stats()
+    lookups = stats["hits"] + stats["misses"]
+    hit_rate = stats["hits"] / lookups * 100 if lookups else 0.0
+    print(
+        f"🧠 叙事缓存: 命中 {stats['hits']} / 未命中 {stats['misses']}"
+        f" ({hit_rate:.0f}%)，条目 {stats['size']}，分析中 {stats['in_flight']}"
+    )
+
+
 def load_kol_status(
     contract: dict, chain: str, context: str = ""
 ) -> Tuple[List[dict], List[dict]]:
@@ -113,20 +390,9 @@ def load_kol_status(
     return split_kol_positions(kol_list)
 
 
-def is_anomaly_contract(contract: dict) -> bool:
+def is_anomaly_contract(contract: Union[dict, TrendingContract]) -> bool:
     """判断是否为异动：合约创建时间早于北京时间当天 00:00 或不可用"""
-    create_time = contract.get("createTime")
-    if not create_time:
-        return True
-    try:
-        create_dt = datetime.fromtimestamp(
-            int(create_time) / 1000, tz=beijing_now().tzinfo
-        )
-        return create_dt.replace(tzinfo=None) < beijing_today_start().replace(
-            tzinfo=None
-        )
-    except (TypeError, ValueError):
-        return True
+    return _as_trending_contract(contract).is_anomaly
 
 
 def check_multipliers(
@@ -134,19 +400,32 @@ def check_multipliers(
     storage: ContractStorage,
     chain: str = "",
     chat_id: Optional[int] = None,
+    scan_contract: Optional[TrendingContract] = None,
+    stored_contract: Optional[dict] = None,
 ):
-    token_address = contract.get("tokenAddress")
+    """scan_contract 为本轮预解析的记录；stored_contract 为 load_many 预加载的状态，
+    未提供时分别即时解析、按 token 查询存储。"""
+    scan_contract = scan_contract or _as_trending_contract(contract)
+    contract = scan_contract.raw
+    token_address = scan_contract.token_address
     if not token_address:
         return
-    if _is_honeypot_contract(contract):
+    delivery = _pop_delivery(storage, token_address)
+    if delivery is not None:
+        if not delivery.done():
+            return
+        # 投递刚完成，预加载的状态可能早于回调写入
+        stored_contract = None
+    if scan_contract.is_honeypot:
         storage.clear_pending_multiplier(token_address)
         return
 
-    current_price = _safe_float(contract.get("priceUSD"))
+    current_price = scan_contract.price
     if current_price <= 0:
         return
 
-    stored_contract = storage.get_contract(token_address)
+    if stored_contract is None:
+        stored_contract = storage.get_contract(token_address)
     if not stored_contract:
         return
 
@@ -168,12 +447,13 @@ def check_multipliers(
         storage.clear_pending_multiplier(token_address)
         return
 
-    max_notified_integer = storage.get_max_notified_integer_multiplier(token_address)
+    notified_multipliers = stored_contract.get("notified_multipliers") or []
+    max_notified_integer = int(max(notified_multipliers)) if notified_multipliers else 0
     if current_integer_multiplier <= max_notified_integer:
         storage.clear_pending_multiplier(token_address)
         return
 
-    pending = storage.get_pending_multiplier(token_address) or {}
+    pending = stored_contract.get("pending_multiplier") or {}
     pending_int = pending.get("multiplier_int")
     pending_count = pending.get("count", 0)
 
@@ -209,6 +489,33 @@ def check_multipliers(
 
     if DRY_RUN:
         return
+    # 发送前落盘缓冲写入，群组迁移等发送副作用基于最新状态
+    storage.flush()
+    if ENABLE_TELEGRAM and chat_id is not None and notifier.queue_available():
+
+        def record_sent(message_ids: dict):
+            if chat_id not in message_ids:
+                return
+            storage.clear_pending_multiplier(token_address)
+            storage.update_notified_multiplier(token_address, multiplier)
+
+        try:
+            delivery = notifier.enqueue_notification(
+                msg,
+                chat_id,
+                reply_to_message_id=storage.get_telegram_message_id(
+                    token_address, chat_id
+                ),
+                token_address=token_address,
+                chain=chain,
+                on_complete=record_sent,
+            )
+        except TelegramRuntimeError as e:
+            print(f"⚠️ [{chain.upper()}] 倍数通知入队失败，下轮重试: {token_address} | {e}")
+            return
+        _track_delivery(storage, token_address, delivery)
+        return
+
     if ENABLE_TELEGRAM and not notifier.send_with_reply_sync(
         msg,
         token_address,
@@ -220,6 +527,7 @@ def check_multipliers(
 
     storage.clear_pending_multiplier(token_address)
     storage.update_notified_multiplier(token_address, multiplier)
+    storage.flush()
 
 
 def is_on_cooldown(
@@ -236,7 +544,9 @@ def is_on_cooldown(
         return False
 
 
-def should_filter_contract(contract: dict, chain: str) -> bool:
+def should_filter_contract(
+    contract: Union[dict, TrendingContract], chain: str
+) -> bool:
     chain_allow = CHAIN_ALLOWLISTS.get(chain, {})
     allow_launch_from = [f for f in chain_allow.get("launchFrom", []) if f]
     allow_dex = [f for f in chain_allow.get("dexName", []) if f]
@@ -244,8 +554,12 @@ def should_filter_contract(contract: dict, chain: str) -> bool:
     if not allow_launch_from and not allow_dex:
         return False
 
-    launch_from = contract.get("launchFrom") or ""
-    dex_name = contract.get("dexName") or ""
+    if isinstance(contract, TrendingContract):
+        launch_from = contract.launch_from
+        dex_name = contract.dex_name
+    else:
+        launch_from = contract.get("launchFrom") or ""
+        dex_name = contract.get("dexName") or ""
 
     if allow_launch_from and launch_from in allow_launch_from:
         return False
@@ -261,19 +575,12 @@ def initialize_storage(storage: ContractStorage, chain: str):
 
     loaded_count = 0
 
-    for contract in contracts:
-        token_address = contract.get("tokenAddress")
-        current_price = _safe_float(contract.get("priceUSD"))
-
-        if not token_address or current_price <= 0:
-            continue
-        if should_filter_contract(contract, chain):
-            continue
-
+    for contract in prepare_scan_contracts(contracts, chain):
+        token_address = contract.token_address
         is_new = storage.is_new_contract(token_address)
 
         if is_new:
-            storage.add_contract(token_address, current_price, contract)
+            storage.add_contract(token_address, contract.price, contract.raw)
             loaded_count += 1
 
         stored_contract = storage.get_contract(token_address)
@@ -291,60 +598,92 @@ def initialize_storage(storage: ContractStorage, chain: str):
         print(f"⚠️  [{chain.upper()}] 未找到新的符合条件的合约")
 
 
-def _passes_base_filters(contract: dict, chain: str = "") -> bool:
-    launch_from = contract.get("launchFrom") or ""
-    if not launch_from and chain not in {"eth", "robin"}:
+def _passes_base_filters(
+    contract: Union[dict, TrendingContract], chain: str = ""
+) -> bool:
+    contract = _as_trending_contract(contract)
+    if not contract.launch_from and chain not in {"eth", "robin"}:
         return False
-    if _is_honeypot_contract(contract):
+    if contract.is_honeypot:
         return False
     return True
 
 
 def _pick_trend_and_anomaly_contract(
-    contracts: List[dict],
+    contracts: List[Union[dict, TrendingContract]],
     chain: str,
+    probe_window: int = SCAN_CONCURRENCY,
+    probe_memo: Optional[Dict[str, bool]] = None,
 ) -> Tuple[
-    Optional[Tuple[dict, List[dict], List[dict]]],
-    Optional[Tuple[dict, List[dict], List[dict]]],
+    Optional[Tuple[TrendingContract, List[dict], List[dict]]],
+    Optional[Tuple[TrendingContract, List[dict], List[dict]]],
 ]:
-    enable_trending = "trending" in NOTIFICATION_TYPES
-    enable_anomaly = "anomaly" in NOTIFICATION_TYPES
-    trend_contract = None
-    anomaly_contract = None
-
-    for contract in contracts:
-        token_address = contract.get("tokenAddress")
-        current_price = _safe_float(contract.get("priceUSD"))
-        if not token_address or current_price <= 0:
-            continue
-        if should_filter_contract(contract, chain):
-            continue
+    """按榜单顺序选出首个有 KOL 交易的趋势/异动合约。
+
+    同时预取后续 probe_window 个候选的 KOL 数据，但严格按榜单顺序消费结果，
+    因此选中的合约与逐个查询一致；两个槽位都填满后取消尚未开始的预取。
+    probe_memo 记录每个 token 的探测结果，已确认无 KOL 交易的 token 不再探测，
+    由调用方在 token 价格变化时清除对应记录。
+    """
+    # key: is_anomaly
+    open_slots = {
+        False: "trending" in NOTIFICATION_TYPES,
+        True: "anomaly" in NOTIFICATION_TYPES,
+    }
+    picked = {False: None, True: None}
 
-        is_anomaly = is_anomaly_contract(contract)
-        if is_anomaly:
-            if not enable_anomaly or anomaly_contract is not None:
+    def eligible_contracts():
+        for contract in parse_trending_contracts(contracts):
+            token_address = contract.token_address
+            if not token_address or contract.price <= 0:
                 continue
-        else:
-            if not enable_trending or trend_contract is not None:
+            if should_filter_contract(contract, chain):
                 continue
+            if probe_memo is not None and probe_memo.get(token_address) is False:
+                continue
+            if open_slots[contract.is_anomaly]:
+                yield contract, contract.is_anomaly
+
+    candidates = eligible_contracts()
+    probes = deque()
+
+    def fill_probe_window():
+        while len(probes) < max(1, probe_window):
+            for contract, is_anomaly in candidates:
+                if open_slots[is_anomaly]:
+                    future = _KOL_PROBE_EXECUTOR.submit(
+                        _probe_kol_list, contract.raw, chain
+                    )
+                    probes.append((contract, is_anomaly, future))
+                    break
+            else:
+                return
 
-        if trend_contract is not None and anomaly_contract is not None:
-            continue
-
-        kol_list = fetch_kol_list(contract, chain, context="筛选KOL")
-        if not _has_kol_trade_activity(kol_list):
-            continue
-
-        candidate = (contract, *split_kol_positions(kol_list))
-        if is_anomaly:
-            anomaly_contract = candidate
-        else:
-            trend_contract = candidate
-
-        if trend_contract and anomaly_contract:
-            break
-
-    return trend_contract, anomaly_contract
+    try:
+        fill_probe_window()
+        while probes and (open_slots[False] or open_slots[True]):
+            contract, is_anomaly, future = probes.popleft()
+            if not open_slots[is_anomaly]:
+                future.cancel()
+                continue
+            kol_list = future.result()
+            has_activity = _has_kol_trade_activity(kol_list or [])
+            # 请求失败（None）不代表没有 KOL 交易，不写入探测记录，下一轮重新探测
+            if probe_memo is not None and kol_list is not None:
+                probe_memo[contract.token_address] = has_activity
+            if has_activity:
+                picked[is_anomaly] = (contract, *split_kol_positions(kol_list))
+                open_slots[is_anomaly] = False
+                for _, probe_is_anomaly, probe in probes:
+                    if probe_is_anomaly == is_anomaly:
+                        probe.cancel()
+            if open_slots[False] or open_slots[True]:
+                fill_probe_window()
+    finally:
+        for _, _, probe in probes:
+            probe.cancel()
+
+    return picked[False], picked[True]
 
 
 def ensure_chat_storage(
@@ -354,24 +693,42 @@ def ensure_chat_storage(
 ) -> ContractStorage:
     storage_key = make_storage_key(chat_id, chain)
     if storage_key not in storages:
-        storages[storage_key] = ContractStorage(chain=chain, chat_id=chat_id)
+        storage = ContractStorage(chain=chain, chat_id=chat_id)
+        storage.warm_cache()
+        storages[storage_key] = storage
     return storages[storage_key]
 
 
+def chain_has_pending_multipliers(
+    storages: Dict[str, ContractStorage], chain: str
+) -> bool:
+    return any(
+        storage.has_pending_multipliers()
+        for storage in list(storages.values())
+        if storage.chain == chain
+    )
+
+
 def _send_candidate_notification(
     storage: ContractStorage,
     chat_id: int,
     chain: str,
-    contract: dict,
+    contract: Union[dict, TrendingContract],
     kol_with_positions: List[dict],
     kol_without_positions: List[dict],
     is_anomaly: bool,
-    narrative_results: Optional[Dict[Tuple[str, str], Optional[dict]]] = None,
+    narrative_tasks: Optional[_NarrativeTasks] = None,
 ) -> int:
-    token_address = contract.get("tokenAddress")
-    current_price = _safe_float(contract.get("priceUSD"))
+    trending_contract = _as_trending_contract(contract)
+    contract = trending_contract.raw
+    token_address = trending_contract.token_address
+    current_price = trending_contract.price
+    symbol = trending_contract.symbol
     if not token_address or current_price <= 0:
         return 0
+    delivery = _pop_delivery(storage, token_address)
+    if delivery is not None and not delivery.done():
+        return 0
 
     is_new = storage.is_new_contract(token_address)
     if is_new:
@@ -387,29 +744,26 @@ def _send_candidate_notification(
         return 0
 
     if not is_new:
-        current_market_cap = _safe_float(contract.get("marketCapUSD"))
-        storage.update_initial_price(token_address, current_price, current_market_cap)
+        storage.update_initial_price(
+            token_address, current_price, trending_contract.market_cap
+        )
 
-    narrative_key = (chain, token_address)
-    if narrative_results is not None and narrative_key in narrative_results:
-        narrative = narrative_results[narrative_key]
-    else:
-        narrative = None
+    narrative = None
+    late_narrative = None
+    if NARRATIVE_ENABLED:
+        narrative_future, narrative_deadline = (
+            narrative_tasks or _NarrativeTasks()
+        ).start(contract, chain, kol_with_positions)
         try:
-            narrative_analysis = analyze_contract_narrative(
-                contract,
-                chain,
-                kol_with_positions,
+            narrative = narrative_future.result(
+                timeout=max(0.0, narrative_deadline - time.monotonic())
             )
-            if narrative_analysis:
-                narrative = narrative_analysis.to_display_dict()
-        except Exception as e:
+        except FutureTimeoutError:
             print(
-                f"⚠️ [{chain.upper() or 'N/A'}] {contract.get('symbol', 'N/A')} "
-                f"叙事分析失败，继续发送基础通知: {token_address} | {e}"
+                f"⏳ [{chain.upper()}] 叙事分析未在截止时间内完成，先发送基础通知: "
+                f"{symbol} | {token_address}"
             )
-        if narrative_results is not None:
-            narrative_results[narrative_key] = narrative
+            late_narrative = narrative_future
 
     msg = format_initial_notification(
         contract,
@@ -423,12 +777,43 @@ def _send_candidate_notification(
     print("\n" + "=" * 60 + "\n")
 
     if ENABLE_TELEGRAM and not DRY_RUN:
+        storage.flush()
+
+        def record_sent(message_ids: dict):
+            for _, msg_id in message_ids.items():
+                storage.update_telegram_message_id(token_address, chat_id, msg_id)
+            if message_ids:
+                storage.update_last_notify_time(token_address)
+            storage.flush()
+
         image_url = contract.get("imageUrl")
         if image_url:
             print(
-                f"🖼️ [{chain.upper()}] 发送图片: {contract.get('symbol', 'N/A')} | "
+                f"🖼️ [{chain.upper()}] 发送图片: {symbol} | "
                 f"{token_address} | url={image_url}"
             )
+        if notifier.queue_available():
+            # 入队后立即返回，消息 ID 在发送完成的回调中落盘
+            try:
+                delivery = notifier.enqueue_notification(
+                    msg,
+                    chat_id,
+                    token_address=token_address,
+                    chain=chain,
+                    photo_url=image_url or None,
+                    on_complete=record_sent,
+                )
+            except TelegramRuntimeError as e:
+                print(f"⚠️ [{chain.upper()}] 通知入队失败，下轮重试: {token_address} | {e}")
+            else:
+                _track_delivery(storage, token_address, delivery)
+                if late_narrative is not None:
+                    _follow_up_narrative(
+                        storage, chat_id, chain, contract, late_narrative, delivery
+                    )
+            return 1 if is_new else 0
+
+        if image_url:
             message_ids = notifier.send_photo_sync(
                 image_url,
                 msg,
@@ -439,7 +824,7 @@ def _send_candidate_notification(
             if not message_ids:
                 print(
                     f"↪️ [{chain.upper()}] 图片发送失败，降级为文本: "
-                    f"{contract.get('symbol', 'N/A')} | {token_address}"
+                    f"{symbol} | {token_address}"
                 )
                 message_ids = notifier.send_sync(
                     msg,
@@ -454,27 +839,79 @@ def _send_candidate_notification(
                 token_address=token_address,
                 chain=chain,
             )
-
-        for _, msg_id in message_ids.items():
-            storage.update_telegram_message_id(token_address, chat_id, msg_id)
-        if message_ids:
-            storage.update_last_notify_time(token_address)
+        record_sent(message_ids)
+        if late_narrative is not None and message_ids:
+            _follow_up_narrative(storage, chat_id, chain, contract, late_narrative)
 
     return 1 if is_new else 0
 
 
+def _follow_up_narrative(
+    storage: ContractStorage,
+    chat_id: int,
+    chain: str,
+    contract: dict,
+    narrative_future: Future,
+    delivery: Optional[Future] = None,
+):
+    """基础通知发出且叙事分析完成后，以回复形式补发叙事分析。"""
+    token_address = contract.get("tokenAddress")
+
+    def post():
+        narrative = narrative_future.result()
+        if not narrative:
+            return
+        reply_to_id = storage.get_telegram_message_id(token_address, chat_id)
+        if not reply_to_id or reply_to_id == -1:
+            return
+        msg = format_narrative_followup(contract, chain, narrative)
+        try:
+            if notifier.queue_available():
+                notifier.enqueue_notification(
+                    msg,
+                    chat_id,
+                    reply_to_message_id=reply_to_id,
+                    token_address=token_address,
+                    chain=chain,
+                )
+            else:
+                notifier.send_sync(
+                    msg,
+                    chat_id=chat_id,
+                    reply_to_message_id=reply_to_id,
+                    token_address=token_address,
+                    chain=chain,
+                )
+        except Exception as e:
+            print(f"⚠️ [{chain.upper()}] 叙事补发失败: {token_address} | {e}")
+
+    def schedule(_):
+        # 回调可能运行在 bot 事件循环线程，补发放到叙事线程池执行
+        narrative_future.add_done_callback(lambda _: _NARRATIVE_EXECUTOR.submit(post))
+
+    if delivery is None:
+        schedule(None)
+    else:
+        delivery.add_done_callback(schedule)
+
+
 def _process_chat_contracts(
     storage: ContractStorage,
     chat_id: int,
     chain: str,
-    contracts: List[dict],
-    trend_contract: Optional[Tuple[dict, List[dict], List[dict]]],
-    anomaly_contract: Optional[Tuple[dict, List[dict], List[dict]]],
+    contracts: List[Union[dict, TrendingContract]],
+    trend_contract: Optional[Tuple[TrendingContract, List[dict], List[dict]]],
+    anomaly_contract: Optional[Tuple[TrendingContract, List[dict], List[dict]]],
     notification_mode: str = "all",
-    narrative_results: Optional[Dict[Tuple[str, str], Optional[dict]]] = None,
+    narrative_tasks: Optional[_NarrativeTasks] = None,
+    changed_tokens: Optional[Set[str]] = None,
 ):
+    """changed_tokens 为本轮榜单新增/价格变化的 token；为 None 时检查全部合约。"""
     new_contracts_count = 0
     tracked_contracts_count = 0
+    skipped_contracts_count = 0
+    if storage not in _FULLY_SCANNED_STORAGES:
+        changed_tokens = None
 
     send_trending = notification_mode in ("all", "trending")
     send_anomaly = notification_mode in ("all", "anomaly")
@@ -489,7 +926,7 @@ def _process_chat_contracts(
             kol_with_positions,
             kol_without_positions,
             False,
-            narrative_results,
+            narrative_tasks,
         )
     if anomaly_contract and send_anomaly:
         contract, kol_with_positions, kol_without_positions = anomaly_contract
@@ -501,26 +938,61 @@ def _process_chat_contracts(
             kol_with_positions,
             kol_without_positions,
             True,
-            narrative_results,
+            narrative_tasks,
         )
 
-    for contract in contracts:
-        token_address = contract.get("tokenAddress")
-        current_price = _safe_float(contract.get("priceUSD"))
-        if not token_address or current_price <= 0:
+    # scan_once 传入的是预解析结果；直接调用时在此解析一次
+    scan_contracts = prepare_scan_contracts(contracts, chain)
+    stored_contracts = storage.load_many(
+        scan_contract.token_address for scan_contract in scan_contracts
+    )
+    for scan_contract in scan_contracts:
+        # 预加载快照只对每个 token 使用一次，榜单重复项不再重复检查
+        stored_contract = stored_contracts.pop(scan_contract.token_address, None)
+        if stored_contract is None:
             continue
-        if should_filter_contract(contract, chain):
+        tracked_contracts_count += 1
+        if (
+            changed_tokens is not None
+            and scan_contract.token_address not in changed_tokens
+            and not _multiplier_may_advance(scan_contract, stored_contract)
+        ):
+            skipped_contracts_count += 1
             continue
-        if not storage.is_new_contract(token_address):
-            check_multipliers(contract, storage, chain, chat_id=chat_id)
-            tracked_contracts_count += 1
+        check_multipliers(
+            scan_contract.raw,
+            storage,
+            chain,
+            chat_id=chat_id,
+            scan_contract=scan_contract,
+            stored_contract=stored_contract,
+        )
+    _FULLY_SCANNED_STORAGES.add(storage)
 
     if new_contracts_count > 0 or tracked_contracts_count > 0:
         print(
             f"📊 [{chain.upper()}] 新合约: {new_contracts_count} | 追踪中: {tracked_contracts_count}"
+            f" | 未变跳过: {skipped_contracts_count}"
         )
 
 
+def _multiplier_may_advance(
+    scan_contract: TrendingContract, stored_contract: dict
+) -> bool:
+    """价格未变时倍数检查是否仍可能产生状态变化（待确认计数或发送重试）。"""
+    if stored_contract.get("pending_multiplier"):
+        return True
+    initial_price = _safe_float(stored_contract.get("initial_price"))
+    if initial_price <= 0:
+        return False
+    current_integer_multiplier = int(scan_contract.price / initial_price)
+    if current_integer_multiplier < 2:
+        return False
+    notified_multipliers = stored_contract.get("notified_multipliers") or []
+    max_notified_integer = int(max(notified_multipliers)) if notified_multipliers else 0
+    return current_integer_multiplier > max_notified_integer
+
+
 def _next_report_time_str(now: datetime) -> str:
     current_hour = now.hour
     current_minute = now.minute
@@ -618,27 +1090,39 @@ def save_last_summary_marker(report_hour: int):
     set_runtime_state(_SUMMARY_REPORT_STATE_KEY, summary_report_marker(report_hour))
 
 
+def _contract_map(contracts: List[dict]) -> Dict[str, dict]:
+    return {c.get("tokenAddress"): c for c in contracts if c.get("tokenAddress")}
+
+
 def _load_latest_contract_map(chain: str) -> Dict[str, dict]:
     try:
-        latest_contracts = fetch_trending(chain=chain).get("data", [])
-        return {
-            c.get("tokenAddress"): c for c in latest_contracts if c.get("tokenAddress")
-        }
+        return _contract_map(fetch_trending(chain=chain).get("data", []))
     except Exception as e:
         print(f"❌ 获取 {chain} 链合约数据失败: {e}")
         return {}
 
 
 def _load_latest_contract_maps(chains) -> Dict[str, Dict[str, dict]]:
+    """优先复用扫描快照中的榜单，只对快照过期的链重新请求。"""
     distinct_chains = list(dict.fromkeys(chains))
-    if not distinct_chains:
-        return {}
-    if len(distinct_chains) == 1:
-        chain = distinct_chains[0]
-        return {chain: _load_latest_contract_map(chain)}
+    latest_maps: Dict[str, Dict[str, dict]] = {}
+    stale_chains = []
+    for chain in distinct_chains:
+        contracts = _TRENDING_SNAPSHOTS.recent_contracts(
+            chain, REPORT_SNAPSHOT_MAX_AGE_SECONDS
+        )
+        if contracts is None:
+            stale_chains.append(chain)
+        else:
+            latest_maps[chain] = _contract_map(contracts)
 
-    loaded_maps = _REPORT_FETCH_EXECUTOR.map(_load_latest_contract_map, distinct_chains)
-    return dict(zip(distinct_chains, loaded_maps))
+    if len(stale_chains) == 1:
+        chain = stale_chains[0]
+        latest_maps[chain] = _load_latest_contract_map(chain)
+    elif stale_chains:
+        loaded_maps = _REPORT_FETCH_EXECUTOR.map(_load_latest_contract_map, stale_chains)
+        latest_maps.update(zip(stale_chains, loaded_maps))
+    return {chain: latest_maps[chain] for chain in distinct_chains}
 
 
 def _fallback_contract_data(token_address: str, stored_data: dict) -> dict:
@@ -655,20 +1139,18 @@ _GAIN_THRESHOLDS = [("20%", 1.2), ("30%", 1.3), ("50%", 1.5), ("80%", 1.8)]
 
 
 def _best_multiplier(
-    token_address: str, stored_data: dict, latest_contract_map: Dict[str, dict]
+    contract_data: Optional[dict], initial_price: float, notified_max: float
 ) -> float:
-    """返回合约当前最佳可知涨幅倍数（优先用实时价格，回退用已通知倍数）"""
-    contract_data = latest_contract_map.get(token_address)
+    """返回合约当前最佳可知涨幅倍数（优先用实时价格，回退用已通知的最大倍数）"""
     if contract_data:
         try:
             current_price = float(contract_data.get("priceUSD", 0))
-            initial_price = float(stored_data.get("initial_price", 0))
+            initial_price = float(initial_price)
             if initial_price > 0 and current_price > 0:
                 return current_price / initial_price
         except (TypeError, ValueError):
             pass
-    notified = stored_data.get("notified_multipliers", [])
-    return max(notified) if notified else 0.0
+    return notified_max
 
 
 def _build_chain_stats(
@@ -676,80 +1158,117 @@ def _build_chain_stats(
     chain: str,
     latest_contract_map: Dict[str, dict],
 ) -> Dict[str, dict]:
-    today_contracts = storage.get_today_trend_contracts()
+    """基于 daily_trend_stats 的增量统计生成报告数据。
+
+    倍数分布直接读取统计表，前 N 名由 SQL 排序取出；涨幅分布以"有已通知倍数"
+    （均 >= 2x，覆盖所有涨幅档位）为基数，只有当前榜单上的今日合约在 Python
+    中按实时价格修正。
+    """
+    daily = storage.get_today_trend_stats()
     stats = {
-        "trend_count": len(today_contracts),
-        "total_multiplier_contracts": 0,
-        "win_count": 0,
+        "trend_count": daily["trend_count"],
+        "total_multiplier_contracts": daily["multiplier_contracts"],
+        "win_count": daily["multiplier_10x_plus"],
         "top_contracts": [],
-        "multiplier_distribution": {"2x": 0, "5x": 0, "10x_plus": 0},
-        "gain_distribution": {label: 0 for label, _ in _GAIN_THRESHOLDS},
+        "multiplier_distribution": {
+            "2x": daily["multiplier_2x"],
+            "5x": daily["multiplier_5x"],
+            "10x_plus": daily["multiplier_10x_plus"],
+        },
+        "gain_distribution": {
+            label: daily["multiplier_contracts"] for label, _ in _GAIN_THRESHOLDS
+        },
     }
 
-    for item in today_contracts:
-        token_address = item["token_address"]
-        stored_data = item["data"]
-        notified_multipliers = stored_data.get("notified_multipliers", [])
-
-        best = _best_multiplier(token_address, stored_data, latest_contract_map)
-        for label, threshold in _GAIN_THRESHOLDS:
-            if best >= threshold:
-                stats["gain_distribution"][label] += 1
+    if daily["trend_count"] and latest_contract_map:
+        page_multipliers = storage.get_today_max_multipliers(latest_contract_map)
+        for token_address, stored in page_multipliers.items():
+            fallback = stored["max_multiplier"]
+            best = _best_multiplier(
+                latest_contract_map[token_address], stored["initial_price"], fallback
+            )
+            for label, threshold in _GAIN_THRESHOLDS:
+                stats["gain_distribution"][label] += (best >= threshold) - (
+                    fallback >= threshold
+                )
 
-        if not notified_multipliers:
-            continue
+    if daily["multiplier_contracts"]:
+        for item in storage.get_today_top_multiplier_contracts(SUMMARY_TOP_N):
+            token_address = item["token_address"]
+            stored_data = item["data"]
+            contract_data = latest_contract_map.get(token_address)
+            if not contract_data:
+                contract_data = _fallback_contract_data(token_address, stored_data)
+            stats["top_contracts"].append(
+                {
+                    "contract": contract_data,
+                    "stored_data": stored_data,
+                    "multiplier": item["multiplier"],
+                    "chain": chain,
+                }
+            )
+    return {chain: stats}
 
-        max_multiplier = max(notified_multipliers)
-        stats["total_multiplier_contracts"] += 1
-        max_int_multiplier = int(max_multiplier)
-        if max_int_multiplier >= 10:
-            stats["multiplier_distribution"]["10x_plus"] += 1
-            stats["win_count"] += 1
-        elif max_int_multiplier >= 5:
-            stats["multiplier_distribution"]["5x"] += 1
-        elif max_int_multiplier >= 2:
-            stats["multiplier_distribution"]["2x"] += 1
-
-        contract_data = latest_contract_map.get(token_address)
-        if not contract_data:
-            contract_data = _fallback_contract_data(token_address, stored_data)
-
-        stats["top_contracts"].append(
-            {
-                "contract": contract_data,
-                "stored_data": stored_data,
-                "multiplier": max_multiplier,
-                "chain": chain,
-            }
-        )
 
-    stats["top_contracts"].sort(key=lambda x: x["multiplier"], reverse=True)
-    stats["top_contracts"] = stats["top_contracts"][:SUMMARY_TOP_N]
-    return {chain: stats}
+def _may_notify_candidate(storage: ContractStorage, token_address: str) -> bool:
+    stored_contract = storage.get_contract(token_address)
+    if stored_contract is None:
+        return True
+    if stored_contract.get("telegram_message_ids"):
+        return False
+    return not is_on_cooldown(storage, token_address)
 
 
-def scan_once(
+def _prefetch_candidate_narratives(
     chain: str,
     active_chats: List[dict],
     storages: Dict[str, ContractStorage],
-    chat_storage: ChatStorage = None,
-) -> bool:
-    response = fetch_trending(chain=chain)
-    contracts = response.get("data", [])
-    filtered_contracts = [
-        contract for contract in contracts if _passes_base_filters(contract, chain)
-    ]
-    trend_contract, anomaly_contract = _pick_trend_and_anomaly_contract(
-        filtered_contracts, chain
-    )
-    narrative_results: Dict[Tuple[str, str], Optional[dict]] = {}
-
-    for chat in active_chats:
-        chat_id = chat["chat_id"]
-        storage = ensure_chat_storage(storages, chat_id, chain)
-        notification_mode = "all"
-        if chat_storage:
-            notification_mode = chat_storage.get_notification_mode(chat_id)
+    chat_storage: Optional[ChatStorage],
+    trend_contract: Optional[Tuple[TrendingContract, List[dict], List[dict]]],
+    anomaly_contract: Optional[Tuple[TrendingContract, List[dict], List[dict]]],
+    narrative_tasks: _NarrativeTasks,
+):
+    """候选选出后立即提交叙事分析，趋势与异动并行执行。
+
+    只有至少一个群组会收到该候选的首次通知时才提交，避免对已通知合约重复调用。
+    """
+    if not NARRATIVE_ENABLED:
+        return
+    for candidate, mode in ((trend_contract, "trending"), (anomaly_contract, "anomaly")):
+        if not candidate:
+            continue
+        contract, kol_with_positions, _ = candidate
+        trending_contract = _as_trending_contract(contract)
+        for chat in active_chats:
+            chat_id = chat["chat_id"]
+            if chat_storage and chat_storage.get_notification_mode(chat_id) not in (
+                "all",
+                mode,
+            ):
+                continue
+            storage = ensure_chat_storage(storages, chat_id, chain)
+            if _may_notify_candidate(storage, trending_contract.token_address):
+                narrative_tasks.start(trending_contract.raw, chain, kol_with_positions)
+                break
+
+
+def _scan_chat(
+    chain: str,
+    chat: dict,
+    storages: Dict[str, ContractStorage],
+    chat_storage: Optional[ChatStorage],
+    contracts: List[TrendingContract],
+    trend_contract: Optional[Tuple[TrendingContract, List[dict], List[dict]]],
+    anomaly_contract: Optional[Tuple[TrendingContract, List[dict], List[dict]]],
+    narrative_tasks: _NarrativeTasks,
+    changed_tokens: Optional[Set[str]] = None,
+):
+    chat_id = chat["chat_id"]
+    storage = ensure_chat_storage(storages, chat_id, chain)
+    notification_mode = "all"
+    if chat_storage:
+        notification_mode = chat_storage.get_notification_mode(chat_id)
+    with storage.batch():
         _process_chat_contracts(
             storage,
             chat_id,
@@ -758,12 +1277,91 @@ def scan_once(
             trend_contract,
             anomaly_contract,
             notification_mode,
-            narrative_results,
+            narrative_tasks,
+            changed_tokens,
         )
 
+
+async def scan_once_async(
+    chain: str,
+    active_chats: List[dict],
+    storages: Dict[str, ContractStorage],
+    chat_storage: ChatStorage = None,
+) -> bool:
+    """扫描单条链；阻塞的 HTTP/SQLite/Telegram 调用在扫描线程池中执行，
+    各群组按 SCAN_CONCURRENCY 并发处理。"""
+    response = await _run_blocking(fetch_trending, chain=chain)
+    contracts = response.get("data", [])
+    diff = _TRENDING_SNAPSHOTS.update(chain, contracts)
+    changed_tokens = None if diff.initial else diff.touched
+    # 整页只解析一次，之后候选筛选与各群组处理共享同一份记录
+    scan_contracts = prepare_scan_contracts(contracts, chain)
+    filtered_contracts = [
+        contract
+        for contract in scan_contracts
+        if _passes_base_filters(contract, chain)
+    ]
+    probe_memo = _TRENDING_SNAPSHOTS.probe_results(chain)
+    skipped_probes = sum(
+        1
+        for contract in filtered_contracts
+        if probe_memo.get(contract.token_address) is False
+    )
+    print(f"📈 [{chain.upper()}] 榜单变化: {diff.summary()} | 跳过探测: {skipped_probes}")
+    trend_contract, anomaly_contract = await _run_blocking(
+        _pick_trend_and_anomaly_contract,
+        filtered_contracts,
+        chain,
+        probe_memo=probe_memo,
+    )
+    narrative_tasks = _NarrativeTasks()
+    await _run_blocking(
+        _prefetch_candidate_narratives,
+        chain,
+        active_chats,
+        storages,
+        chat_storage,
+        trend_contract,
+        anomaly_contract,
+        narrative_tasks,
+    )
+    semaphore = asyncio.Semaphore(SCAN_CONCURRENCY)
+
+    async def scan_chat(chat: dict):
+        async with semaphore:
+            await _run_blocking(
+                _scan_chat,
+                chain,
+                chat,
+                storages,
+                chat_storage,
+                scan_contracts,
+                trend_contract,
+                anomaly_contract,
+                narrative_tasks,
+                changed_tokens,
+            )
+
+    results = await asyncio.gather(
+        *(scan_chat(chat) for chat in active_chats), return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
     return anomaly_contract is not None
 
 
+def scan_once(
+    chain: str,
+    active_chats: List[dict],
+    storages: Dict[str, ContractStorage],
+    chat_storage: ChatStorage = None,
+) -> bool:
+    """scan_once_async 的同步包装，供测试与单链调用使用。"""
+    return asyncio.run(scan_once_async(chain, active_chats, storages, chat_storage))
+
+
 def send_summary_report(
     storages: dict,
     report_hour: Optional[int] = None,
@@ -781,7 +1379,8 @@ def send_summary_report(
     all_succeeded = True
     storage_rows = []
 
-    for storage_key, storage in storages.items():
+    # 扫描任务会在其他线程向 storages 插入新群组，遍历快照避免迭代中变更
+    for storage_key, storage in list(storages.items()):
         if ":" in storage_key:
             chain, chat_id_raw = storage_key.split(":", 1)
             chat_id = int(chat_id_raw)
@@ -840,13 +1439,20 @@ def send_summary_report(
 
 
 def get_summary_report_for_chat(chat_id: int, storages: dict) -> str:
-    """按 chat_id 生成当日汇总报告文本（用于 /report 指令）"""
+    """按 chat_id 生成当日汇总报告文本（用于 /report 指令），
+    结果缓存 REPORT_CACHE_TTL_SECONDS 秒。"""
+    return _REPORT_CACHE.get_or_load(
+        chat_id, partial(_render_summary_report_for_chat, chat_id, storages)
+    )
+
+
+def _render_summary_report_for_chat(chat_id: int, storages: dict) -> str:
     now = beijing_now()
     next_report_time_str = _next_report_time_str(now)
     chain_stats: Dict[str, dict] = {}
     storage_rows = []
 
-    for storage_key, storage in storages.items():
+    for storage_key, storage in list(storages.items()):
         if ":" in storage_key:
             chain, chat_id_raw = storage_key.split(":", 1)
             if int(chat_id_raw) != chat_id:
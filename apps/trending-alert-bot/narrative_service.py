@@ -1,4 +1,5 @@
-from typing import List, Optional
+from functools import partial
+from typing import Dict, List, Optional
 
 from config import (
     NARRATIVE_CACHE_TTL_HOURS,
@@ -10,11 +11,16 @@ from config import (
 )
 from narrative_provider import NarrativeProviderError, build_provider
 from narrative_scoring import compute_narrative_score
-from narrative_storage import load_cached_analysis, save_analysis
+from narrative_storage import cache_stats, load_cached_analysis, save_analysis
 from narrative_types import NarrativeAnalysis, NarrativeInput
+from ttl_cache import SingleFlight
 
 NARRATIVE_EVIDENCE_POLICY_VERSION = 3
 
+# Concurrent cache misses for the same (chain, token, provider) share one
+# provider call; results are cached by narrative_storage, not here.
+_PROVIDER_FLIGHTS = SingleFlight()
+
 
 def _safe_float(value) -> float:
     try:
@@ -71,6 +77,19 @@ def analyze_contract_narrative(
 
     # Cache lookup happens before provider construction; save uses provider.provider_name.
     provider_key = NARRATIVE_PROVIDER
+    cached = _load_usable_cache(contract, chain, token_address, provider_key)
+    if cached:
+        return cached
+
+    return _PROVIDER_FLIGHTS.do(
+        (chain, token_address, provider_key),
+        partial(_reload_or_analyze, contract, chain, kol_holders, provider_key),
+    )
+
+
+def _load_usable_cache(
+    contract: dict, chain: str, token_address: str, provider_key: str
+) -> Optional[NarrativeAnalysis]:
     try:
         cached = load_cached_analysis(chain, token_address, provider_key)
         if cached and _cache_meets_evidence_policy(cached):
@@ -80,7 +99,25 @@ def analyze_contract_narrative(
             f"⚠️ [{chain.upper()}] narrative cache load failed: "
             f"{contract.get('symbol', 'N/A')} | {token_address} | {e}"
         )
+    return None
+
+
+def _reload_or_analyze(
+    contract: dict, chain: str, kol_holders: List[dict], provider_key: str
+) -> Optional[NarrativeAnalysis]:
+    # A caller that missed the cache just as the previous flight finished would
+    # otherwise start a second paid provider call for the same key.
+    token_address = str(contract.get("tokenAddress") or "")
+    cached = _load_usable_cache(contract, chain, token_address, provider_key)
+    if cached:
+        return cached
+    return _analyze_with_provider(contract, chain, kol_holders)
 
+
+def _analyze_with_provider(
+    contract: dict, chain: str, kol_holders: List[dict]
+) -> Optional[NarrativeAnalysis]:
+    token_address = str(contract.get("tokenAddress") or "")
     narrative_input = build_narrative_input(contract, chain, kol_holders)
     try:
         provider = _get_provider()
@@ -124,3 +161,10 @@ def analyze_contract_narrative(
             f"{contract.get('symbol', 'N/A')} | {token_address} | {e}"
         )
     return analysis
+
+
+def narrative_cache_stats() -> Dict[str, int]:
+    """Hit/miss/size of the decoded-analysis cache plus provider calls in flight."""
+    stats = cache_stats()
+    stats["in_flight"] = _PROVIDER_FLIGHTS.stats()["in_flight"]
+    return stats
@@ -1,9 +1,17 @@
 import json
 from datetime import timedelta
+from typing import Dict
 
-from db_storage import connect, ensure_schema
+from config import NARRATIVE_CACHE_TTL_HOURS, NARRATIVE_MEMORY_CACHE_SIZE
+from db_storage import connect, ensure_schema_ready
 from narrative_types import InfluencerHit, NarrativeAnalysis
 from timezone_utils import beijing_now, format_beijing_time, parse_time_to_beijing
+from ttl_cache import TTLCache
+
+# 已解码的分析结果，key 为 (chain, token_address, provider)，条目有效期跟随 expires_at
+_ANALYSIS_CACHE = TTLCache(
+    NARRATIVE_CACHE_TTL_HOURS * 3600, max_entries=NARRATIVE_MEMORY_CACHE_SIZE
+)
 
 
 def _json_list(value) -> str:
@@ -15,7 +23,7 @@ def _json_dict(value) -> str:
 
 
 def ensure_narrative_storage():
-    ensure_schema()
+    ensure_schema_ready()
 
 
 def _row_to_analysis(row) -> NarrativeAnalysis:
@@ -44,7 +52,7 @@ def _row_to_analysis(row) -> NarrativeAnalysis:
 
 
 def save_analysis(chain: str, token_address: str, analysis: NarrativeAnalysis, ttl_hours: int):
-    ensure_schema()
+    ensure_schema_ready()
     now = beijing_now().replace(tzinfo=None)
     expires_at = now + timedelta(hours=ttl_hours)
     with connect() as conn:
@@ -83,10 +91,18 @@ def save_analysis(chain: str, token_address: str, analysis: NarrativeAnalysis, t
                 expires_at.strftime("%Y-%m-%d %H:%M:%S"),
             ),
         )
+    _ANALYSIS_CACHE.set(
+        (chain, token_address, analysis.provider), analysis, ttl=ttl_hours * 3600
+    )
 
 
 def load_cached_analysis(chain: str, token_address: str, provider: str):
-    ensure_schema()
+    """先查进程内缓存，未命中再读 SQLite 并解码，未过期的结果回填缓存。"""
+    key = (chain, token_address, provider)
+    cached = _ANALYSIS_CACHE.get(key)
+    if cached is not None:
+        return cached
+    ensure_schema_ready()
     with connect() as conn:
         row = conn.execute(
             """
@@ -102,6 +118,13 @@ def load_cached_analysis(chain: str, token_address: str, provider: str):
         expires_at = parse_time_to_beijing(row["expires_at"]).replace(tzinfo=None)
     except Exception:
         return None
-    if expires_at <= beijing_now().replace(tzinfo=None):
+    remaining = expires_at - beijing_now().replace(tzinfo=None)
+    if remaining <= timedelta(0):
         return None
-    return _row_to_analysis(row)
+    analysis = _row_to_analysis(row)
+    _ANALYSIS_CACHE.set(key, analysis, ttl=remaining.total_seconds())
+    return analysis
+
+
+def cache_stats() -> Dict[str, int]:
+    return _ANALYSIS_CACHE.stats()
@@ -106,6 +106,19 @@ def _format_narrative_section(narrative=None) -> str:
 ⚠️ 风险: {risk_text}"""
 
 
+def format_narrative_followup(contract: Dict, chain: str = "", narrative=None) -> str:
+    """叙事分析晚于基础通知完成时，作为回复补发的消息。"""
+    symbol = _html_escape(contract.get("symbol", "N/A"))
+    token_address = str(contract.get("tokenAddress") or "N/A")
+    chain_prefix = f"[{chain.upper()}] " if chain else ""
+    msg = f"""{chain_prefix}🧠 叙事分析
+
+💎 {symbol}
+📝 CA: {_html_code(token_address)}"""
+    msg += _format_narrative_section(narrative)
+    return msg.strip()
+
+
 def format_initial_notification(
     contract: Dict,
     chain: str = "",
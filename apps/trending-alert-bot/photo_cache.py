@@ -0,0 +1,67 @@
+"""图片 URL -> Telegram file_id 缓存，按最近使用时间做 LRU 淘汰"""
+
+import time
+from typing import Optional
+
+from config import PHOTO_FILE_ID_CACHE_SIZE
+from db_storage import connect, ensure_schema_ready
+
+
+def get_photo_file_id(image_url: str) -> Optional[str]:
+    """返回已上传图片的 file_id，命中时刷新最近使用时间。"""
+    if PHOTO_FILE_ID_CACHE_SIZE <= 0 or not image_url:
+        return None
+    ensure_schema_ready()
+    with connect() as conn:
+        row = conn.execute(
+            "SELECT file_id FROM telegram_photo_cache WHERE image_url = ?",
+            (image_url,),
+        ).fetchone()
+        if not row:
+            return None
+        conn.execute(
+            "UPDATE telegram_photo_cache SET last_used_at = ? WHERE image_url = ?",
+            (time.time(), image_url),
+        )
+    return row["file_id"]
+
+
+def save_photo_file_id(image_url: str, file_id: str):
+    """记录首次发送成功后 Telegram 返回的 file_id，超出上限时淘汰最久未用的。"""
+    if PHOTO_FILE_ID_CACHE_SIZE <= 0 or not image_url or not file_id:
+        return
+    ensure_schema_ready()
+    with connect() as conn:
+        conn.execute(
+            """
+            INSERT INTO telegram_photo_cache (image_url, file_id, last_used_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT(image_url) DO UPDATE SET
+                file_id=excluded.file_id,
+                last_used_at=excluded.last_used_at
+            """,
+            (image_url, file_id, time.time()),
+        )
+        conn.execute(
+            """
+            DELETE FROM telegram_photo_cache
+            WHERE image_url IN (
+                SELECT image_url FROM telegram_photo_cache
+                ORDER BY last_used_at DESC
+                LIMIT -1 OFFSET ?
+            )
+            """,
+            (PHOTO_FILE_ID_CACHE_SIZE,),
+        )
+
+
+def forget_photo_file_id(image_url: str):
+    """file_id 被 Telegram 拒绝时删除，下次重新按 URL 上传。"""
+    if not image_url:
+        return
+    ensure_schema_ready()
+    with connect() as conn:
+        conn.execute(
+            "DELETE FROM telegram_photo_cache WHERE image_url = ?",
+            (image_url,),
+        )
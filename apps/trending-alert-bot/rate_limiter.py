@@ -0,0 +1,128 @@
+"""Token-bucket pacing for Telegram Bot API sends.
+
+Limits follow the Bot API guidance: about 30 messages per second overall,
+one message per second to the same chat, and 20 messages per minute to the
+same group. Buckets are asyncio-only and must be used from a single loop.
+"""
+
+import asyncio
+import time
+from typing import Callable, Dict, List
+
+GLOBAL_RATE_PER_SECOND = 30.0
+CHAT_RATE_PER_SECOND = 1.0
+GROUP_RATE_PER_MINUTE = 20.0
+# Small burst so a scan's trend + anomaly + multiplier messages are not spread
+# over a minute, while staying close to the per-minute group limit.
+GROUP_BURST = 5
+# Refill arithmetic can leave 0.9999... tokens; treat that as a full token.
+_TOKEN_EPSILON = 1e-9
+
+
+class TokenBucket:
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._blocked_until = 0.0
+
+    def _refill(self, now: float):
+        if now > self._updated:
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+
+    def delay(self) -> float:
+        """Seconds until one token can be taken (0 when available now)."""
+        now = self._clock()
+        self._refill(now)
+        wait = max(0.0, self._blocked_until - now)
+        if self._tokens < 1 - _TOKEN_EPSILON:
+            wait = max(wait, (1 - self._tokens) / self.rate)
+        return wait
+
+    def take(self):
+        self._refill(self._clock())
+        self._tokens -= 1
+
+    def block(self, seconds: float):
+        """Empty the bucket and refuse tokens for the server-requested wait."""
+        now = self._clock()
+        self._refill(now)
+        self._tokens = 0.0
+        self._updated = now
+        self._blocked_until = max(self._blocked_until, now + seconds)
+
+
+class TelegramRateLimiter:
+    """Global + per-chat (+ per-group) buckets; acquire() waits for all of them.
+
+    Waiters for the same chat are served in FIFO order so queued messages keep
+    their order; different chats proceed in parallel up to the global rate.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = GLOBAL_RATE_PER_SECOND,
+        chat_rate: float = CHAT_RATE_PER_SECOND,
+        group_rate_per_minute: float = GROUP_RATE_PER_MINUTE,
+        group_burst: int = GROUP_BURST,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], "asyncio.Future"] = asyncio.sleep,
+    ):
+        self._clock = clock
+        self._sleep = sleep
+        self._chat_rate = chat_rate
+        self._group_rate = group_rate_per_minute / 60.0
+        self._group_burst = group_burst
+        self._global = TokenBucket(global_rate, global_rate, clock)
+        self._chats: Dict[int, TokenBucket] = {}
+        self._groups: Dict[int, TokenBucket] = {}
+        self._chat_locks: Dict[int, asyncio.Lock] = {}
+
+    @staticmethod
+    def _is_group(chat_id: int) -> bool:
+        # Groups and channels have negative ids; private chats are positive.
+        return chat_id < 0
+
+    def _buckets(self, chat_id: int) -> List[TokenBucket]:
+        buckets = [self._global]
+        chat_bucket = self._chats.get(chat_id)
+        if chat_bucket is None:
+            chat_bucket = self._chats[chat_id] = TokenBucket(
+                self._chat_rate, 1, self._clock
+            )
+        buckets.append(chat_bucket)
+        if self._is_group(chat_id):
+            group_bucket = self._groups.get(chat_id)
+            if group_bucket is None:
+                group_bucket = self._groups[chat_id] = TokenBucket(
+                    self._group_rate, self._group_burst, self._clock
+                )
+            buckets.append(group_bucket)
+        return buckets
+
+    async def acquire(self, chat_id: int):
+        lock = self._chat_locks.setdefault(chat_id, asyncio.Lock())
+        async with lock:
+            buckets = self._buckets(chat_id)
+            while True:
+                wait = max(bucket.delay() for bucket in buckets)
+                if wait <= 0:
+                    for bucket in buckets:
+                        bucket.take()
+                    return
+                await self._sleep(wait)
+
+    def retry_after(self, chat_id: int, seconds: float):
+        """Apply a RetryAfter from Telegram to this chat's buckets."""
+        for bucket in self._buckets(chat_id)[1:]:
+            bucket.block(seconds)
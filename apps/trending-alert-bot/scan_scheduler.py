@@ -0,0 +1,91 @@
+"""按链调度扫描：固定节拍的截止时间、失败退避与待确认加速"""
+
+from dataclasses import dataclass
+import time
+from typing import Callable, Dict, List, Optional
+
+# 未设置退避上限时限制指数，避免长时间故障后数值溢出
+_MAX_BACKOFF_EXPONENT = 16
+
+
+@dataclass
+class _ChainSchedule:
+    interval: float
+    next_due: float
+    failures: int = 0
+    fast: bool = False
+
+
+class ScanScheduler:
+    """每条链独立维护下一次扫描的截止时间。
+
+    正常情况下截止时间按 interval 累加，节拍不受扫描耗时影响；扫描超时错过的
+    节拍直接跳过。扫描失败按 interval * 2^(n-1) 退避（上限 max_backoff），
+    链存在待确认倍数时改用 fast_interval，让 MULTIPLIER_CONFIRMATIONS 更快确认。
+    """
+
+    def __init__(
+        self,
+        chains: List[str],
+        interval: float,
+        chain_intervals: Optional[Dict[str, float]] = None,
+        fast_interval: float = 0,
+        max_backoff: float = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._clock = clock
+        self._fast_interval = fast_interval
+        self._max_backoff = max_backoff
+        now = clock()
+        self._chains: Dict[str, _ChainSchedule] = {
+            chain: _ChainSchedule(
+                interval=float((chain_intervals or {}).get(chain, interval)),
+                next_due=now,
+            )
+            for chain in chains
+        }
+
+    def interval(self, chain: str) -> float:
+        return self._chains[chain].interval
+
+    def next_due(self, chain: str) -> float:
+        return self._chains[chain].next_due
+
+    def seconds_until(self, chain: str) -> float:
+        return max(0.0, self._chains[chain].next_due - self._clock())
+
+    def record_success(self, chain: str, has_pending: bool = False):
+        schedule = self._chains[chain]
+        schedule.failures = 0
+        now = self._clock()
+        if has_pending and 0 < self._fast_interval < schedule.interval:
+            schedule.fast = True
+            schedule.next_due = now + self._fast_interval
+            return
+        if schedule.fast:
+            # 加速结束后从当前时刻重新开始常规节拍
+            schedule.fast = False
+            schedule.next_due = now + schedule.interval
+            return
+        schedule.next_due = self._next_tick(schedule.next_due, schedule.interval, now)
+
+    def record_failure(self, chain: str) -> float:
+        """记录一次失败并返回退避秒数。"""
+        schedule = self._chains[chain]
+        schedule.failures += 1
+        schedule.fast = False
+        delay = schedule.interval * 2 ** min(schedule.failures - 1, _MAX_BACKOFF_EXPONENT)
+        if self._max_backoff > 0:
+            delay = min(delay, max(self._max_backoff, schedule.interval))
+        schedule.next_due = self._clock() + delay
+        return delay
+
+    @staticmethod
+    def _next_tick(previous_due: float, interval: float, now: float) -> float:
+        if interval <= 0:
+            return now
+        next_due = previous_due + interval
+        if next_due <= now:
+            missed = int((now - previous_due) // interval)
+            next_due = previous_due + (missed + 1) * interval
+        return next_due
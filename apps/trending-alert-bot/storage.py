@@ -1,9 +1,31 @@
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-
-from db_storage import connect, ensure_schema
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import timedelta
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+import weakref
+
+from config import CONTRACT_CACHE_SIZE, CONTRACT_CACHE_VERIFY
+from db_storage import (
+    TREND_STATS_COLUMNS,
+    connect,
+    ensure_schema_ready,
+    trend_stats_upsert_sql,
+)
 from timezone_utils import beijing_now, beijing_today_start, format_beijing_time
 
+_PUSH_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+_STATS_DAY_FORMAT = "%Y-%m-%d"
+# 低于 SQLite 默认的绑定参数上限，留出 chain/chat_id 的位置
+_IN_QUERY_BATCH_SIZE = 500
+_CONTRACT_EXISTS = """EXISTS (
+                    SELECT 1 FROM contracts
+                    WHERE chain = ? AND chat_id = ? AND token_address = ?
+                )"""
+_TREND_STATS_TOKEN_SQL = trend_stats_upsert_sql(
+    "c.chain = ? AND c.chat_id = ? AND c.token_address = ?"
+)
+
 
 def _safe_float(value) -> float:
     try:
@@ -23,11 +45,159 @@ def _safe_text(value) -> str:
     return "" if value is None else str(value)
 
 
+def _copy_contract(data: Optional[Dict]) -> Optional[Dict]:
+    if data is None:
+        return None
+    copied = dict(data)
+    copied["notified_multipliers"] = list(data.get("notified_multipliers", []))
+    copied["telegram_message_ids"] = dict(data.get("telegram_message_ids", {}))
+    if "pending_multiplier" in data:
+        copied["pending_multiplier"] = dict(data["pending_multiplier"])
+    return copied
+
+
+class _ContractCache:
+    """单个 (chain, chat_id) 的合约状态 LRU 缓存，值为合约 dict 或 None（不存在）。
+
+    complete 为 True 时缓存覆盖该群组全部合约，未命中即可判定为不存在。
+    """
+
+    _MISSING = object()
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.complete = False
+        self._entries: "OrderedDict[str, Optional[Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def lookup(self, token_address: str) -> Tuple[bool, Optional[Dict]]:
+        with self._lock:
+            data = self._entries.get(token_address, self._MISSING)
+            if data is self._MISSING:
+                return self.complete, None
+            self._entries.move_to_end(token_address)
+            return True, _copy_contract(data)
+
+    def store(self, token_address: str, data: Optional[Dict]):
+        with self._lock:
+            self._store_unlocked(token_address, _copy_contract(data))
+
+    def replace_all(self, contracts: Dict[str, Dict], complete: bool):
+        with self._lock:
+            self._entries.clear()
+            self.complete = complete
+            for token_address, data in contracts.items():
+                self._store_unlocked(token_address, data)
+
+    def update(self, token_address: str, mutate):
+        """对已缓存且存在的合约应用 mutate；未缓存的条目保持未缓存。"""
+        with self._lock:
+            data = self._entries.get(token_address)
+            if data is not None:
+                mutate(data)
+
+    def upsert(self, token_address: str, base_fields: Dict):
+        with self._lock:
+            data = self._entries.get(token_address, self._MISSING)
+            if data is self._MISSING and not self.complete:
+                return
+            if data is None or data is self._MISSING:
+                data = {
+                    "notified_multipliers": [],
+                    "telegram_message_ids": {},
+                }
+                self._store_unlocked(token_address, data)
+            data.update(base_fields)
+            if not data.get("last_notify_time"):
+                data.pop("last_notify_time", None)
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self.complete = False
+
+    def _store_unlocked(self, token_address: str, data: Optional[Dict]):
+        self._entries[token_address] = data
+        self._entries.move_to_end(token_address)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.complete = False
+
+
+_CACHED_STORAGES = weakref.WeakSet()
+
+
+def invalidate_contract_caches(chat_ids: Iterable[int]):
+    """外部直接改写合约表后（如群组迁移）丢弃相关群组的缓存。"""
+    targets = {_safe_int(chat_id) for chat_id in chat_ids}
+    for storage in list(_CACHED_STORAGES):
+        if storage.chat_id in targets:
+            storage.invalidate_cache()
+
+
 class ContractStorage:
-    def __init__(self, chain: str, chat_id: int):
+    def __init__(
+        self,
+        chain: str,
+        chat_id: int,
+        cache_size: Optional[int] = None,
+        verify_cache: Optional[bool] = None,
+    ):
         self.chain = (chain or "").strip().lower()
         self.chat_id = _safe_int(chat_id)
-        ensure_schema()
+        self._batch_state = threading.local()
+        cache_size = CONTRACT_CACHE_SIZE if cache_size is None else cache_size
+        self._cache = _ContractCache(cache_size) if cache_size > 0 else None
+        self.verify_cache = (
+            CONTRACT_CACHE_VERIFY if verify_cache is None else verify_cache
+        )
+        if self._cache is not None:
+            _CACHED_STORAGES.add(self)
+        ensure_schema_ready()
+
+    def warm_cache(self) -> int:
+        """从 SQLite 预热缓存（最近推送的合约优先），返回加载的合约数。"""
+        if self._cache is None:
+            return 0
+        self.flush()
+        limit = self._cache.max_entries
+        with connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT * FROM contracts
+                WHERE chain = ? AND chat_id = ?
+                ORDER BY push_time DESC
+                LIMIT ?
+                """,
+                (self.chain, self.chat_id, limit + 1),
+            ).fetchall()
+            relations = self._load_chat_relations(conn) if rows else None
+            contracts = {
+                row["token_address"]: self._row_to_contract(conn, row, relations)
+                for row in rows[:limit]
+            }
+        self._cache.replace_all(contracts, complete=len(rows) <= limit)
+        return len(contracts)
+
+    @property
+    def cache_size(self) -> int:
+        return len(self._cache) if self._cache is not None else 0
+
+    def invalidate_cache(self):
+        if self._cache is not None:
+            self._cache.invalidate()
+
+    def _verify_cached(self, token_address: str, cached: Optional[Dict]):
+        stored = self._load_contract(token_address)
+        if stored != cached:
+            raise AssertionError(
+                f"contract cache mismatch for {self.chain}:{self.chat_id}:"
+                f"{token_address}: cached={cached!r} stored={stored!r}"
+            )
 
     def _load_message_ids(self, conn, token_address: str) -> Dict[str, int]:
         rows = conn.execute(
@@ -69,18 +239,102 @@ class ContractStorage:
             "count": _safe_int(row["count"]),
         }
 
-    def _row_to_contract(self, conn, row) -> Dict:
+    def _load_chat_relations(
+        self,
+        conn,
+        pushed_since: Optional[str] = None,
+        token_addresses: Optional[List[str]] = None,
+    ) -> Dict[str, Dict]:
+        """按群组一次性读取三个关联表，避免逐合约查询（N+1）。
+
+        pushed_since 非空时只读取 push_time 不早于该时间的合约的关联数据；
+        token_addresses 非空时只读取这些合约的关联数据。
+        """
+        scope = ""
+        params = (self.chain, self.chat_id)
+        if token_addresses is not None:
+            placeholders = ", ".join("?" for _ in token_addresses)
+            scope = f" AND token_address IN ({placeholders})"
+            params += tuple(token_addresses)
+        elif pushed_since is not None:
+            scope = (
+                " AND token_address IN ("
+                "SELECT token_address FROM contracts"
+                " WHERE chain = ? AND chat_id = ? AND push_time >= ?)"
+            )
+            params += (self.chain, self.chat_id, pushed_since)
+        multipliers: Dict[str, List[float]] = {}
+        for row in conn.execute(
+            f"""
+            SELECT token_address, multiplier
+            FROM contract_notified_multipliers
+            WHERE chain = ? AND chat_id = ?{scope}
+            ORDER BY token_address, multiplier
+            """,
+            params,
+        ):
+            multipliers.setdefault(row["token_address"], []).append(
+                _safe_float(row["multiplier"])
+            )
+
+        message_ids: Dict[str, Dict[str, int]] = {}
+        for row in conn.execute(
+            f"""
+            SELECT token_address, telegram_chat_id, message_id
+            FROM contract_message_ids
+            WHERE chain = ? AND chat_id = ?{scope}
+            ORDER BY token_address, telegram_chat_id
+            """,
+            params,
+        ):
+            message_ids.setdefault(row["token_address"], {})[
+                str(row["telegram_chat_id"])
+            ] = row["message_id"]
+
+        pending: Dict[str, Dict] = {}
+        for row in conn.execute(
+            f"""
+            SELECT token_address, multiplier_int, count
+            FROM contract_pending_multipliers
+            WHERE chain = ? AND chat_id = ?{scope}
+            """,
+            params,
+        ):
+            pending[row["token_address"]] = {
+                "multiplier_int": _safe_int(row["multiplier_int"]),
+                "count": _safe_int(row["count"]),
+            }
+
+        return {
+            "notified_multipliers": multipliers,
+            "telegram_message_ids": message_ids,
+            "pending_multiplier": pending,
+        }
+
+    def _row_to_contract(self, conn, row, relations: Optional[Dict] = None) -> Dict:
         token_address = row["token_address"]
+        if relations is None:
+            notified_multipliers = self._load_notified_multipliers(conn, token_address)
+            telegram_message_ids = self._load_message_ids(conn, token_address)
+            pending = self._load_pending_multiplier(conn, token_address)
+        else:
+            notified_multipliers = list(
+                relations["notified_multipliers"].get(token_address, [])
+            )
+            telegram_message_ids = dict(
+                relations["telegram_message_ids"].get(token_address, {})
+            )
+            pending = relations["pending_multiplier"].get(token_address)
+            pending = dict(pending) if pending else None
         data = {
             "initial_price": _safe_float(row["initial_price"]),
             "initial_market_cap": _safe_float(row["initial_market_cap"]),
             "push_time": row["push_time"],
-            "notified_multipliers": self._load_notified_multipliers(conn, token_address),
+            "notified_multipliers": notified_multipliers,
             "name": row["name"],
             "symbol": row["symbol"],
-            "telegram_message_ids": self._load_message_ids(conn, token_address),
+            "telegram_message_ids": telegram_message_ids,
         }
-        pending = self._load_pending_multiplier(conn, token_address)
         if pending:
             data["pending_multiplier"] = pending
         if row["last_notify_time"]:
@@ -88,6 +342,7 @@ class ContractStorage:
         return data
 
     def _load_contract(self, token_address: str) -> Optional[Dict]:
+        self._flush_for(token_address)
         with connect() as conn:
             row = conn.execute(
                 """
@@ -98,8 +353,81 @@ class ContractStorage:
             ).fetchone()
             return self._row_to_contract(conn, row) if row else None
 
-    def _upsert_contract(self, conn, token_address: str, contract_data: Dict):
-        conn.execute(
+    @contextmanager
+    def batch(self):
+        """扫描级写缓冲：块内的写操作在退出时合并为一个事务提交。
+
+        读取某个 token 前会先提交缓冲中的写入，保证读到自己的写；
+        需要提前落盘时（如 Telegram 发送前后）调用 flush()。缓冲按线程隔离。
+        """
+        state = self._batch_state
+        state.depth = getattr(state, "depth", 0) + 1
+        if state.depth == 1:
+            state.writes = []
+            state.tokens = set()
+        try:
+            yield self
+        finally:
+            if state.depth == 1:
+                try:
+                    self.flush()
+                finally:
+                    state.depth = 0
+            else:
+                state.depth -= 1
+
+    def flush(self):
+        state = self._batch_state
+        writes = getattr(state, "writes", None)
+        if not writes:
+            return
+        state.writes = []
+        state.tokens = set()
+        try:
+            with connect() as conn:
+                for statement, params in writes:
+                    conn.execute(statement, params)
+        except Exception:
+            # 事务已回滚，缓存中的写穿透结果不再可信
+            self.invalidate_cache()
+            raise
+
+    def _flush_for(self, token_address: str):
+        tokens = getattr(self._batch_state, "tokens", None)
+        if tokens and token_address in tokens:
+            self.flush()
+
+    def _write(self, token_address: str, *statements):
+        state = self._batch_state
+        if getattr(state, "depth", 0) > 0:
+            state.writes.extend(statements)
+            state.tokens.add(token_address)
+            return
+        try:
+            with connect() as conn:
+                for statement, params in statements:
+                    conn.execute(statement, params)
+        except Exception:
+            self.invalidate_cache()
+            raise
+
+    def _trend_stats_statement(self, token_address: str, sign: int):
+        return (
+            _TREND_STATS_TOKEN_SQL,
+            (sign, self.chain, self.chat_id, token_address),
+        )
+
+    def _write_tracked(self, token_address: str, *statements):
+        """写入会影响汇总统计的变更：同一事务内先减去合约旧贡献，写入后再加上新贡献。"""
+        self._write(
+            token_address,
+            self._trend_stats_statement(token_address, -1),
+            *statements,
+            self._trend_stats_statement(token_address, 1),
+        )
+
+    def _upsert_statement(self, token_address: str, contract_data: Dict):
+        return (
             """
             INSERT INTO contracts (
                 chain, chat_id, token_address, initial_price, initial_market_cap,
@@ -138,26 +466,129 @@ class ContractStorage:
             "symbol": contract_info.get("symbol", ""),
             "last_notify_time": "",
         }
+        self._write_tracked(token_address, self._upsert_statement(token_address, data))
+        if self._cache is not None:
+            self._cache.upsert(
+                token_address,
+                {
+                    "initial_price": _safe_float(data["initial_price"]),
+                    "initial_market_cap": data["initial_market_cap"],
+                    "push_time": data["push_time"],
+                    "name": _safe_text(data["name"]),
+                    "symbol": _safe_text(data["symbol"]),
+                    "last_notify_time": "",
+                },
+            )
+
+    def load_many(self, token_addresses: Iterable[str]) -> Dict[str, Dict]:
+        """批量读取合约状态，返回 {token_address: get_contract 结构}，不存在的合约不在结果中。
+
+        缓存命中的合约不访问 SQLite，其余合约按批次用 IN 查询一次性加载。
+        """
+        result: Dict[str, Dict] = {}
+        missing: List[str] = []
+        for token_address in dict.fromkeys(token_addresses):
+            if not token_address:
+                continue
+            if self._cache is not None:
+                hit, data = self._cache.lookup(token_address)
+                if hit:
+                    if self.verify_cache:
+                        self._verify_cached(token_address, data)
+                    if data is not None:
+                        result[token_address] = data
+                    continue
+            missing.append(token_address)
+        if not missing:
+            return result
+
+        buffered = getattr(self._batch_state, "tokens", None)
+        if buffered and not buffered.isdisjoint(missing):
+            self.flush()
         with connect() as conn:
-            self._upsert_contract(conn, token_address, data)
+            for start in range(0, len(missing), _IN_QUERY_BATCH_SIZE):
+                chunk = missing[start : start + _IN_QUERY_BATCH_SIZE]
+                placeholders = ", ".join("?" for _ in chunk)
+                rows = conn.execute(
+                    f"""
+                    SELECT * FROM contracts
+                    WHERE chain = ? AND chat_id = ? AND token_address IN ({placeholders})
+                    """,
+                    (self.chain, self.chat_id, *chunk),
+                ).fetchall()
+                relations = (
+                    self._load_chat_relations(
+                        conn, token_addresses=[row["token_address"] for row in rows]
+                    )
+                    if rows
+                    else None
+                )
+                loaded = {
+                    row["token_address"]: self._row_to_contract(conn, row, relations)
+                    for row in rows
+                }
+                for token_address in chunk:
+                    data = loaded.get(token_address)
+                    if self._cache is not None:
+                        self._cache.store(token_address, data)
+                    if data is not None:
+                        result[token_address] = data
+        return result
 
     def get_contract(self, token_address: str) -> Optional[Dict]:
-        return self._load_contract(token_address)
+        if self._cache is None:
+            return self._load_contract(token_address)
+        hit, data = self._cache.lookup(token_address)
+        if hit:
+            if self.verify_cache:
+                self._verify_cached(token_address, data)
+            return data
+        data = self._load_contract(token_address)
+        self._cache.store(token_address, data)
+        return data
 
     def update_notified_multiplier(self, token_address: str, multiplier: float):
-        if not self.get_contract(token_address):
-            return
-        with connect() as conn:
-            conn.execute(
-                """
+        multiplier = _safe_float(multiplier)
+        self._write_tracked(
+            token_address,
+            (
+                f"""
                 INSERT OR IGNORE INTO contract_notified_multipliers (
                     chain, chat_id, token_address, multiplier, notified_at
-                ) VALUES (?, ?, ?, ?, ?)
+                )
+                SELECT ?, ?, ?, ?, ?
+                WHERE {_CONTRACT_EXISTS}
                 """,
-                (self.chain, self.chat_id, token_address, multiplier, format_beijing_time()),
-            )
+                (
+                    self.chain,
+                    self.chat_id,
+                    token_address,
+                    multiplier,
+                    format_beijing_time(),
+                    self.chain,
+                    self.chat_id,
+                    token_address,
+                ),
+            ),
+        )
+
+        def add_multiplier(data: Dict):
+            if multiplier not in data["notified_multipliers"]:
+                data["notified_multipliers"] = sorted(
+                    data["notified_multipliers"] + [multiplier]
+                )
+
+        self._update_cache(token_address, add_multiplier)
+
+    def _update_cache(self, token_address: str, mutate):
+        if self._cache is not None:
+            self._cache.update(token_address, mutate)
 
     def get_notified_multipliers(self, token_address: str) -> List[float]:
+        if self._cache is not None:
+            data = self.get_contract(token_address)
+            return data["notified_multipliers"] if data else []
+        self._flush_for(token_address)
         with connect() as conn:
             return self._load_notified_multipliers(conn, token_address)
 
@@ -168,51 +599,117 @@ class ContractStorage:
         return 0
 
     def get_pending_multiplier(self, token_address: str) -> Optional[Dict]:
+        if self._cache is not None:
+            data = self.get_contract(token_address)
+            return data.get("pending_multiplier") if data else None
+        self._flush_for(token_address)
         with connect() as conn:
             return self._load_pending_multiplier(conn, token_address)
 
     def update_pending_multiplier(self, token_address: str, multiplier_int: int, count: int):
-        if not self.get_contract(token_address):
-            return
-        with connect() as conn:
-            conn.execute(
-                """
+        self._write(
+            token_address,
+            (
+                f"""
                 INSERT INTO contract_pending_multipliers (
                     chain, chat_id, token_address, multiplier_int, count
-                ) VALUES (?, ?, ?, ?, ?)
+                )
+                SELECT ?, ?, ?, ?, ?
+                WHERE {_CONTRACT_EXISTS}
                 ON CONFLICT(chain, chat_id, token_address) DO UPDATE SET
                     multiplier_int=excluded.multiplier_int,
                     count=excluded.count
                 """,
-                (self.chain, self.chat_id, token_address, multiplier_int, count),
-            )
+                (
+                    self.chain,
+                    self.chat_id,
+                    token_address,
+                    multiplier_int,
+                    count,
+                    self.chain,
+                    self.chat_id,
+                    token_address,
+                ),
+            ),
+        )
+
+        def set_pending(data: Dict):
+            data["pending_multiplier"] = {
+                "multiplier_int": _safe_int(multiplier_int),
+                "count": _safe_int(count),
+            }
+
+        self._update_cache(token_address, set_pending)
 
     def clear_pending_multiplier(self, token_address: str):
-        with connect() as conn:
-            conn.execute(
+        self._write(
+            token_address,
+            (
                 """
                 DELETE FROM contract_pending_multipliers
                 WHERE chain = ? AND chat_id = ? AND token_address = ?
                 """,
                 (self.chain, self.chat_id, token_address),
-            )
+            ),
+        )
+        self._update_cache(
+            token_address, lambda data: data.pop("pending_multiplier", None)
+        )
 
-    def update_telegram_message_id(self, token_address: str, chat_id: int, message_id: int):
-        if not self.get_contract(token_address):
-            return
+    def has_pending_multipliers(self) -> bool:
+        """当前 chain + chat_id 是否有等待确认的倍数通知。"""
+        self.flush()
         with connect() as conn:
-            conn.execute(
+            row = conn.execute(
                 """
+                SELECT 1 FROM contract_pending_multipliers
+                WHERE chain = ? AND chat_id = ?
+                LIMIT 1
+                """,
+                (self.chain, self.chat_id),
+            ).fetchone()
+        return row is not None
+
+    def update_telegram_message_id(self, token_address: str, chat_id: int, message_id: int):
+        self._write_tracked(
+            token_address,
+            (
+                f"""
                 INSERT INTO contract_message_ids (
                     chain, chat_id, token_address, telegram_chat_id, message_id
-                ) VALUES (?, ?, ?, ?, ?)
+                )
+                SELECT ?, ?, ?, ?, ?
+                WHERE {_CONTRACT_EXISTS}
                 ON CONFLICT(chain, chat_id, token_address, telegram_chat_id)
                 DO UPDATE SET message_id=excluded.message_id
                 """,
-                (self.chain, self.chat_id, token_address, chat_id, message_id),
+                (
+                    self.chain,
+                    self.chat_id,
+                    token_address,
+                    chat_id,
+                    message_id,
+                    self.chain,
+                    self.chat_id,
+                    token_address,
+                ),
+            ),
+        )
+
+        def set_message_id(data: Dict):
+            data["telegram_message_ids"][str(_safe_int(chat_id))] = _safe_int(
+                message_id
             )
 
+        self._update_cache(token_address, set_message_id)
+
     def get_telegram_message_id(self, token_address: str, chat_id: int) -> Optional[int]:
+        if self._cache is not None:
+            data = self.get_contract(token_address)
+            if not data:
+                return None
+            return data["telegram_message_ids"].get(str(_safe_int(chat_id)))
+        self._flush_for(token_address)
         with connect() as conn:
             row = conn.execute(
                 """
@@ -228,111 +725,243 @@ class ContractStorage:
         return row["message_id"] if row else None
 
     def update_initial_price(self, token_address: str, new_price: float, new_market_cap: float):
-        data = self.get_contract(token_address)
-        if not data:
-            return
-        data["initial_price"] = new_price
-        data["initial_market_cap"] = new_market_cap
-        data["push_time"] = format_beijing_time()
-        with connect() as conn:
-            self._upsert_contract(conn, token_address, data)
-            conn.execute(
+        push_time = format_beijing_time()
+        self._write_tracked(
+            token_address,
+            (
+                """
+                UPDATE contracts
+                SET initial_price = ?, initial_market_cap = ?, push_time = ?
+                WHERE chain = ? AND chat_id = ? AND token_address = ?
+                """,
+                (
+                    _safe_float(new_price),
+                    _safe_float(new_market_cap),
+                    push_time,
+                    self.chain,
+                    self.chat_id,
+                    token_address,
+                ),
+            ),
+            (
                 """
                 DELETE FROM contract_notified_multipliers
                 WHERE chain = ? AND chat_id = ? AND token_address = ?
                 """,
                 (self.chain, self.chat_id, token_address),
-            )
+            ),
+        )
+        self._update_cache(
+            token_address,
+            lambda data: data.update(
+                initial_price=_safe_float(new_price),
+                initial_market_cap=_safe_float(new_market_cap),
+                push_time=push_time,
+                notified_multipliers=[],
+            ),
+        )
 
     def update_last_notify_time(self, token_address: str):
-        data = self.get_contract(token_address)
-        if not data:
-            return
-        data["last_notify_time"] = format_beijing_time()
-        with connect() as conn:
-            self._upsert_contract(conn, token_address, data)
+        notify_time = format_beijing_time()
+        self._write(
+            token_address,
+            (
+                """
+                UPDATE contracts SET last_notify_time = ?
+                WHERE chain = ? AND chat_id = ? AND token_address = ?
+                """,
+                (notify_time, self.chain, self.chat_id, token_address),
+            ),
+        )
+        self._update_cache(
+            token_address, lambda data: data.update(last_notify_time=notify_time)
+        )
 
     def get_last_notify_time(self, token_address: str) -> Optional[str]:
         data = self.get_contract(token_address)
         return data.get("last_notify_time") if data else None
 
     def get_today_trend_contracts(self) -> List[Dict]:
-        today_start = beijing_today_start().replace(tzinfo=None)
-        contracts = []
+        self.flush()
+        today_start = beijing_today_start().strftime(_PUSH_TIME_FORMAT)
 
         with connect() as conn:
             rows = conn.execute(
                 """
-                SELECT * FROM contracts
-                WHERE chain = ? AND chat_id = ?
+                SELECT c.* FROM contracts AS c
+                WHERE c.chain = ? AND c.chat_id = ? AND c.push_time >= ?
+                  AND EXISTS (
+                      SELECT 1 FROM contract_message_ids AS m
+                      WHERE m.chain = c.chain
+                        AND m.chat_id = c.chat_id
+                        AND m.token_address = c.token_address
+                        AND m.message_id != -1
+                  )
+                ORDER BY c.rowid
                 """,
-                (self.chain, self.chat_id),
+                (self.chain, self.chat_id, today_start),
             ).fetchall()
-
-            for row in rows:
-                data = self._row_to_contract(conn, row)
-                telegram_message_ids = data.get("telegram_message_ids", {})
-                if not telegram_message_ids:
-                    continue
-
-                has_real_notification = any(
-                    msg_id != -1 for msg_id in telegram_message_ids.values()
+            if not rows:
+                return []
+            relations = self._load_chat_relations(conn, pushed_since=today_start)
+
+            return [
+                {
+                    "token_address": row["token_address"],
+                    "data": self._row_to_contract(conn, row, relations),
+                }
+                for row in rows
+            ]
+
+    def get_today_trend_stats(self) -> Dict[str, int]:
+        """当日按推送日累计的统计（trend_count 与倍数档位），单次主键读取。"""
+        self.flush()
+        with connect() as conn:
+            row = conn.execute(
+                """
+                SELECT * FROM daily_trend_stats
+                WHERE chain = ? AND chat_id = ? AND day = ?
+                """,
+                (
+                    self.chain,
+                    self.chat_id,
+                    beijing_today_start().strftime(_STATS_DAY_FORMAT),
+                ),
+            ).fetchone()
+        return {column: row[column] if row else 0 for column in TREND_STATS_COLUMNS}
+
+    def get_today_max_multipliers(
+        self, token_addresses: Iterable[str]
+    ) -> Dict[str, Dict[str, float]]:
+        """返回给定合约中当日已推送者的 {initial_price, max_multiplier}（无倍数为 0）。
+
+        最大倍数由 SQL 聚合得出，不加载完整的合约与关联表。
+        """
+        self.flush()
+        tokens = [token for token in dict.fromkeys(token_addresses) if token]
+        today_start = beijing_today_start().strftime(_PUSH_TIME_FORMAT)
+        result: Dict[str, Dict[str, float]] = {}
+        with connect() as conn:
+            for start in range(0, len(tokens), _IN_QUERY_BATCH_SIZE):
+                chunk = tokens[start : start + _IN_QUERY_BATCH_SIZE]
+                placeholders = ", ".join("?" for _ in chunk)
+                rows = conn.execute(
+                    f"""
+                    SELECT
+                        c.token_address,
+                        c.initial_price,
+                        (
+                            SELECT MAX(n.multiplier)
+                            FROM contract_notified_multipliers AS n
+                            WHERE n.chain = c.chain
+                              AND n.chat_id = c.chat_id
+                              AND n.token_address = c.token_address
+                        ) AS max_multiplier
+                    FROM contracts AS c
+                    WHERE c.chain = ? AND c.chat_id = ?
+                      AND c.token_address IN ({placeholders})
+                      AND c.push_time >= ?
+                      AND EXISTS (
+                          SELECT 1 FROM contract_message_ids AS m
+                          WHERE m.chain = c.chain
+                            AND m.chat_id = c.chat_id
+                            AND m.token_address = c.token_address
+                            AND m.message_id != -1
+                      )
+                    """,
+                    (self.chain, self.chat_id, *chunk, today_start),
+                ).fetchall()
+                for row in rows:
+                    result[row["token_address"]] = {
+                        "initial_price": _safe_float(row["initial_price"]),
+                        "max_multiplier": _safe_float(row["max_multiplier"]),
+                    }
+        return result
+
+    def get_today_top_multiplier_contracts(self, limit: int) -> List[Dict]:
+        """当日已推送合约中按最大已通知倍数排序的前 limit 个。"""
+        self.flush()
+        today_start = beijing_today_start().strftime(_PUSH_TIME_FORMAT)
+        with connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT * FROM (
+                    SELECT
+                        c.*,
+                        c.rowid AS contract_rowid,
+                        (
+                            SELECT MAX(n.multiplier)
+                            FROM contract_notified_multipliers AS n
+                            WHERE n.chain = c.chain
+                              AND n.chat_id = c.chat_id
+                              AND n.token_address = c.token_address
+                        ) AS max_multiplier
+                    FROM contracts AS c
+                    WHERE c.chain = ? AND c.chat_id = ? AND c.push_time >= ?
+                      AND EXISTS (
+                          SELECT 1 FROM contract_message_ids AS m
+                          WHERE m.chain = c.chain
+                            AND m.chat_id = c.chat_id
+                            AND m.token_address = c.token_address
+                            AND m.message_id != -1
+                      )
                 )
-                if not has_real_notification:
-                    continue
-
-                push_time_str = data.get("push_time")
-                if push_time_str:
-                    try:
-                        push_time = datetime.strptime(push_time_str, "%Y-%m-%d %H:%M:%S")
-                        if push_time >= today_start:
-                            contracts.append({
-                                "token_address": row["token_address"],
-                                "data": data,
-                            })
-                    except ValueError:
-                        pass
-
-        return contracts
+                WHERE max_multiplier IS NOT NULL
+                ORDER BY max_multiplier DESC, contract_rowid
+                LIMIT ?
+                """,
+                (self.chain, self.chat_id, today_start, limit),
+            ).fetchall()
+        return [
+            {
+                "token_address": row["token_address"],
+                "multiplier": _safe_float(row["max_multiplier"]),
+                "data": {
+                    "initial_price": _safe_float(row["initial_price"]),
+                    "initial_market_cap": _safe_float(row["initial_market_cap"]),
+                    "push_time": row["push_time"],
+                    "name": row["name"],
+                    "symbol": row["symbol"],
+                },
+            }
+            for row in rows
+        ]
 
     def cleanup_old_data(self, days_to_keep: int = 7) -> int:
-        cutoff_date = beijing_now().replace(tzinfo=None) - timedelta(days=days_to_keep)
+        self.flush()
+        cutoff_date = beijing_now() - timedelta(days=days_to_keep)
 
         with connect() as conn:
-            rows = conn.execute(
+            cursor = conn.execute(
                 """
-                SELECT token_address, push_time FROM contracts
+                DELETE FROM contracts
                 WHERE chain = ? AND chat_id = ?
+                  AND push_time != '' AND push_time < ?
                 """,
-                (self.chain, self.chat_id),
-            ).fetchall()
-
-            to_delete = []
-            for row in rows:
-                push_time_str = row["push_time"]
-                if not push_time_str:
-                    continue
-                try:
-                    push_time = datetime.strptime(push_time_str, "%Y-%m-%d %H:%M:%S")
-                except ValueError:
-                    continue
-                if push_time < cutoff_date:
-                    to_delete.append(row["token_address"])
-
-            for token_address in to_delete:
-                conn.execute(
-                    """
-                    DELETE FROM contracts
-                    WHERE chain = ? AND chat_id = ? AND token_address = ?
-                    """,
-                    (self.chain, self.chat_id, token_address),
-                )
+                (self.chain, self.chat_id, cutoff_date.strftime(_PUSH_TIME_FORMAT)),
+            )
+            conn.execute(
+                """
+                DELETE FROM daily_trend_stats
+                WHERE chain = ? AND chat_id = ? AND day < ?
+                """,
+                (self.chain, self.chat_id, cutoff_date.strftime(_STATS_DAY_FORMAT)),
+            )
 
-        return len(to_delete)
+        if cursor.rowcount and self._cache is not None:
+            self.warm_cache()
+        return cursor.rowcount
 
     def clear_all(self):
+        self.flush()
         with connect() as conn:
             conn.execute(
                 "DELETE FROM contracts WHERE chain = ? AND chat_id = ?",
                 (self.chain, self.chat_id),
             )
+            conn.execute(
+                "DELETE FROM daily_trend_stats WHERE chain = ? AND chat_id = ?",
+                (self.chain, self.chat_id),
+            )
+        if self._cache is not None:
+            self._cache.replace_all({}, complete=True)
@@ -105,6 +105,8 @@ def clear_all_notification_data(
             _backup_database(conn, backup_path)
             with conn:
                 conn.execute("DELETE FROM contracts")
+                if _table_exists(conn, "daily_trend_stats"):
+                    conn.execute("DELETE FROM daily_trend_stats")
 
         results.append(
             NotificationDataClearResult(
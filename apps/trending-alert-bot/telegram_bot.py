@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import asyncio
+import concurrent.futures
+import functools
 import threading
 import time
-from typing import Optional, List, Dict
+from typing import Callable, Optional, List, Dict
 
 try:
     from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
@@ -14,7 +16,13 @@ try:
         ContextTypes,
         TypeHandler,
     )
-    from telegram.error import BadRequest, ChatMigrated, Forbidden, TelegramError
+    from telegram.error import (
+        BadRequest,
+        ChatMigrated,
+        Forbidden,
+        RetryAfter,
+        TelegramError,
+    )
 except ModuleNotFoundError:
     Update = None
     InlineKeyboardButton = None
@@ -38,6 +46,10 @@ except ModuleNotFoundError:
         def __init__(self, new_chat_id: int):
             self.new_chat_id = new_chat_id
 
+    class RetryAfter(TelegramError):
+        def __init__(self, retry_after: float):
+            self.retry_after = retry_after
+
 
 from config import (
     TELEGRAM_BOT_TOKEN,
@@ -46,6 +58,8 @@ from config import (
     NOTIFICATION_TYPES,
 )
 from chat_storage import ChatStorage, VALID_NOTIFICATION_MODES
+from photo_cache import forget_photo_file_id, get_photo_file_id, save_photo_file_id
+from rate_limiter import TelegramRateLimiter
 
 # Long-poll must stay under HTTP read timeout; leave headroom for Socks proxies.
 _GET_UPDATES_TIMEOUT = 20
@@ -57,6 +71,14 @@ _HTTP_POOL_TIMEOUT = 10.0
 _BACKLOG_GRACE_SECONDS = 45.0
 _BACKLOG_STALE_SECONDS = 90.0
 _WORKER_START_TIMEOUT = 45.0
+# Outbound queue: concurrent sends on the bot loop, ordered per chat.
+_OUTBOUND_CONCURRENCY = 8
+_OUTBOUND_DRAIN_TIMEOUT = 15.0
+# RetryAfter: wait and resend up to this many times; longer waits give up.
+_RETRY_AFTER_ATTEMPTS = 3
+_RETRY_AFTER_MAX_SECONDS = 60.0
+# Sent-message counters are buffered and written to SQLite in one batch.
+_MESSAGE_COUNT_FLUSH_INTERVAL = 5.0
 
 
 def _require_telegram_sdk():
@@ -68,6 +90,13 @@ class TelegramRuntimeError(RuntimeError):
     """Raised when the Telegram worker cannot accept notifications."""
 
 
+def _retry_after_seconds(error: RetryAfter) -> float:
+    retry_after = error.retry_after
+    if hasattr(retry_after, "total_seconds"):
+        return float(retry_after.total_seconds())
+    return float(retry_after)
+
+
 class TelegramNotifier:
     def __init__(self):
         self.enabled = ENABLE_TELEGRAM
@@ -82,6 +111,11 @@ class TelegramNotifier:
         self._started_at = 0.0
         self._last_update_at = 0.0
         self._restart_lock = threading.Lock()
+        self._outbound: set = set()
+        self._outbound_lock = threading.Lock()
+        self._outbound_limits = None
+        self._message_count_lock = threading.Lock()
+        self._message_counts: Dict[int, int] = {}
 
     def set_report_generator(self, fn):
         self._report_generator = fn
@@ -420,16 +454,78 @@ class TelegramNotifier:
             )
         )
 
+    async def _send_paced(self, send_fn, chat_id: int, **kwargs):
+        """Send once the rate limiter allows; resend after RetryAfter."""
+        _, _, rate_limiter, _ = self._loop_outbound_limits()
+        for attempt in range(1, _RETRY_AFTER_ATTEMPTS + 1):
+            await rate_limiter.acquire(chat_id)
+            try:
+                return await send_fn(chat_id=chat_id, **kwargs)
+            except RetryAfter as error:
+                retry_after = _retry_after_seconds(error)
+                rate_limiter.retry_after(chat_id, retry_after)
+                if (
+                    attempt == _RETRY_AFTER_ATTEMPTS
+                    or retry_after > _RETRY_AFTER_MAX_SECONDS
+                ):
+                    raise
+                print(f"⏳ 频率限制，{retry_after:.0f}s 后重发到 {chat_id}")
+
+    async def _send_photo_cached(self, send_photo, photo_url: str, chat_id: int, **kwargs):
+        """Send a photo by its cached Telegram file_id, uploading from the URL once.
+
+        While one send looks up or uploads a URL, other sends of the same URL
+        wait for it and then reuse the file_id instead of making Telegram fetch
+        the image again.
+        """
+        _, _, _, uploads = self._loop_outbound_limits()
+        upload = uploads.get(photo_url)
+        owner = upload is None
+        if owner:
+            upload = uploads[photo_url] = asyncio.get_running_loop().create_future()
+        else:
+            await asyncio.shield(upload)
+
+        def release():
+            if owner and not upload.done():
+                uploads.pop(photo_url, None)
+                upload.set_result(None)
+
+        try:
+            file_id = await asyncio.to_thread(get_photo_file_id, photo_url)
+            if file_id:
+                release()
+                try:
+                    return await send_photo(chat_id=chat_id, photo=file_id, **kwargs)
+                except BadRequest as error:
+                    print(f"↪️ 缓存的图片 file_id 无效，改用 URL 重新上传: {error}")
+                    await asyncio.to_thread(forget_photo_file_id, photo_url)
+            sent_msg = await send_photo(chat_id=chat_id, photo=photo_url, **kwargs)
+            photo_sizes = getattr(sent_msg, "photo", None)
+            if photo_sizes:
+                # The last PhotoSize is the largest rendition.
+                await asyncio.to_thread(
+                    save_photo_file_id, photo_url, photo_sizes[-1].file_id
+                )
+            return sent_msg
+        finally:
+            release()
+
     async def _send_to_chat(self, send_fn, chat_id: int, **kwargs):
         try:
-            return await send_fn(chat_id=chat_id, **kwargs), chat_id
+            return await self._send_paced(send_fn, chat_id, **kwargs), chat_id
         except ChatMigrated as error:
             new_chat_id = error.new_chat_id
+            # Buffered counts for the old id must land before its row moves.
+            await asyncio.to_thread(self.flush_message_counts)
             await asyncio.to_thread(
                 self.chat_storage.migrate_chat, chat_id, new_chat_id
             )
             try:
-                return await send_fn(chat_id=new_chat_id, **kwargs), new_chat_id
+                return (
+                    await self._send_paced(send_fn, new_chat_id, **kwargs),
+                    new_chat_id,
+                )
             except TelegramError as retry_error:
                 if self._is_permanent_destination_error(retry_error):
                     await asyncio.to_thread(self.chat_storage.remove_chat, new_chat_id)
@@ -439,6 +535,39 @@ class TelegramNotifier:
                 await asyncio.to_thread(self.chat_storage.remove_chat, chat_id)
             raise
 
+    async def _broadcast(self, send_fn, kind: str = "", detail: str = "", **kwargs):
+        """Send to every active chat in parallel, paced by the rate limiter."""
+        active_chats = await asyncio.to_thread(self.chat_storage.get_active_chats)
+
+        if not active_chats:
+            print("⚠️  没有活跃的聊天，消息未发送")
+            return {}
+
+        async def send_one(chat_id: int) -> int:
+            sent_msg, actual_chat_id = await self._send_to_chat(
+                send_fn, chat_id, **kwargs
+            )
+            self._count_sent(actual_chat_id)
+            return sent_msg.message_id
+
+        chat_ids = [chat["chat_id"] for chat in active_chats]
+        results = await asyncio.gather(
+            *(send_one(chat_id) for chat_id in chat_ids), return_exceptions=True
+        )
+        message_ids = {}
+        for chat_id, result in zip(chat_ids, results):
+            if isinstance(result, RetryAfter) or (
+                isinstance(result, TelegramError) and "Flood control" in str(result)
+            ):
+                print(f"⚠️  频率限制，跳过发送{kind}到 {chat_id}")
+            elif isinstance(result, TelegramError):
+                print(f"❌ 发送{kind}到 {chat_id} 失败: {result}{detail}")
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                message_ids[chat_id] = result
+        return message_ids
+
     async def send_message(
         self,
         message: str,
@@ -466,47 +595,18 @@ class TelegramNotifier:
                     parse_mode="HTML",
                     reply_markup=reply_markup,
                 )
-                await asyncio.to_thread(
-                    self.chat_storage.increment_message_count, actual_chat_id
-                )
+                self._count_sent(actual_chat_id)
                 message_ids[chat_id] = sent_msg.message_id
                 return message_ids
 
-            active_chats = await asyncio.to_thread(self.chat_storage.get_active_chats)
-
-            if not active_chats:
-                print("⚠️  没有活跃的聊天，消息未发送")
-                return {}
-
-            success_count = 0
-            for i, chat in enumerate(active_chats):
-                try:
-                    # 每条消息间隔0.5秒，避免频率限制
-                    if i > 0:
-                        await asyncio.sleep(0.5)
-
-                    sent_msg, actual_chat_id = await self._send_to_chat(
-                        bot.send_message,
-                        chat["chat_id"],
-                        text=message,
-                        disable_web_page_preview=True,
-                        reply_to_message_id=reply_to_message_id,
-                        parse_mode="HTML",
-                        reply_markup=reply_markup,
-                    )
-                    await asyncio.to_thread(
-                        self.chat_storage.increment_message_count,
-                        actual_chat_id,
-                    )
-                    message_ids[chat["chat_id"]] = sent_msg.message_id
-                    success_count += 1
-                except TelegramError as e:
-                    if "Flood control" in str(e):
-                        print(f"⚠️  频率限制，跳过发送到 {chat['chat_id']}")
-                    else:
-                        print(f"❌ 发送到 {chat['chat_id']} 失败: {e}")
-
-            return message_ids
+            return await self._broadcast(
+                bot.send_message,
+                text=message,
+                disable_web_page_preview=True,
+                reply_to_message_id=reply_to_message_id,
+                parse_mode="HTML",
+                reply_markup=reply_markup,
+            )
 
         except Exception as e:
             print(f"❌ 发送消息时发生错误: {e}")
@@ -529,57 +629,30 @@ class TelegramNotifier:
             message_ids = {}
             reply_markup = self._build_inline_keyboard(token_address, chain)
 
+            send_fn = functools.partial(
+                self._send_photo_cached, bot.send_photo, photo_url
+            )
+
             if chat_id is not None:
                 sent_msg, actual_chat_id = await self._send_to_chat(
-                    bot.send_photo,
+                    send_fn,
                     chat_id,
-                    photo=photo_url,
                     caption=caption,
                     parse_mode="HTML",
                     reply_markup=reply_markup,
                 )
-                await asyncio.to_thread(
-                    self.chat_storage.increment_message_count, actual_chat_id
-                )
+                self._count_sent(actual_chat_id)
                 message_ids[chat_id] = sent_msg.message_id
                 return message_ids
 
-            active_chats = await asyncio.to_thread(self.chat_storage.get_active_chats)
-
-            if not active_chats:
-                print("⚠️  没有活跃的聊天，消息未发送")
-                return {}
-
-            success_count = 0
-            for i, chat in enumerate(active_chats):
-                try:
-                    # 每条消息间隔0.5秒，避免频率限制
-                    if i > 0:
-                        await asyncio.sleep(0.5)
-
-                    sent_msg, actual_chat_id = await self._send_to_chat(
-                        bot.send_photo,
-                        chat["chat_id"],
-                        photo=photo_url,
-                        caption=caption,
-                        parse_mode="HTML",
-                        reply_markup=reply_markup,
-                    )
-                    await asyncio.to_thread(
-                        self.chat_storage.increment_message_count,
-                        actual_chat_id,
-                    )
-                    message_ids[chat["chat_id"]] = sent_msg.message_id
-                    success_count += 1
-                except TelegramError as e:
-                    if "Flood control" in str(e):
-                        print(f"⚠️  频率限制，跳过发送图片到 {chat['chat_id']}")
-                    else:
-                        print(
-                            f"❌ 发送图片到 {chat['chat_id']} 失败: {e} | url={photo_url}"
-                        )
-
-            return message_ids
+            return await self._broadcast(
+                send_fn,
+                kind="图片",
+                detail=f" | url={photo_url}",
+                caption=caption,
+                parse_mode="HTML",
+                reply_markup=reply_markup,
+            )
 
         except Exception as e:
             print(f"❌ 发送图片消息时发生错误: {e} | url={photo_url}")
@@ -674,6 +747,167 @@ class TelegramNotifier:
             print(f"❌ 同步发送（带引用）失败: {e}")
             return False
 
+    def queue_available(self) -> bool:
+        """Whether enqueue_notification can hand messages to a running bot loop."""
+        loop = self.bot_loop
+        return bool(self.enabled and loop is not None and loop.is_running())
+
+    def _outbound_state(self):
+        # Instances built via __new__ (tests) skip __init__; create lazily.
+        if getattr(self, "_outbound_lock", None) is None:
+            self._outbound_lock = threading.Lock()
+            self._outbound = set()
+            self._outbound_limits = None
+        return self._outbound_lock, self._outbound
+
+    def _loop_outbound_limits(self):
+        """Queue semaphore, per-chat order locks, rate limiter and photo uploads.
+
+        asyncio primitives bind to a loop, so a restarted worker gets new ones.
+        """
+        loop = asyncio.get_running_loop()
+        limits = getattr(self, "_outbound_limits", None)
+        if limits is None or limits[0] is not loop:
+            limits = (
+                loop,
+                asyncio.Semaphore(_OUTBOUND_CONCURRENCY),
+                {},
+                TelegramRateLimiter(),
+                {},
+            )
+            self._outbound_limits = limits
+        return limits[1:]
+
+    async def _deliver_notification(
+        self,
+        message: str,
+        chat_id: int,
+        reply_to_message_id: Optional[int],
+        token_address: Optional[str],
+        chain: Optional[str],
+        photo_url: Optional[str],
+        on_complete: Optional[Callable[[dict], None]],
+    ) -> dict:
+        semaphore, chat_locks, _, _ = self._loop_outbound_limits()
+        chat_lock = chat_locks.setdefault(chat_id, asyncio.Lock())
+        # Take the chat lock first so a throttled chat's backlog waits without
+        # holding queue slots that other chats need.
+        async with chat_lock, semaphore:
+            message_ids = {}
+            if photo_url:
+                message_ids = await self.send_photo(
+                    photo_url, message, chat_id, token_address, chain
+                )
+                if not message_ids:
+                    print(
+                        f"↪️ [{(chain or '').upper()}] 图片发送失败，降级为文本: "
+                        f"{token_address}"
+                    )
+            if not message_ids:
+                message_ids = await self.send_message(
+                    message, chat_id, reply_to_message_id, token_address, chain
+                )
+        if on_complete is not None:
+            try:
+                # Callbacks persist to SQLite; keep them off the bot loop.
+                await asyncio.to_thread(on_complete, message_ids)
+            except Exception as e:
+                print(f"❌ 通知回调失败: chat_id={chat_id} | {token_address} | {e}")
+        return message_ids
+
+    def enqueue_notification(
+        self,
+        message: str,
+        chat_id: int,
+        reply_to_message_id: Optional[int] = None,
+        token_address: str = None,
+        chain: str = None,
+        photo_url: Optional[str] = None,
+        on_complete: Optional[Callable[[dict], None]] = None,
+    ) -> concurrent.futures.Future:
+        """Queue a message on the bot loop and return immediately.
+
+        photo_url sends a photo with the message as caption and falls back to
+        text on failure. on_complete(message_ids) runs in a worker thread once
+        the send finishes; message_ids is empty when delivery failed.
+        """
+        if not self.queue_available():
+            raise TelegramRuntimeError("Telegram worker is not running")
+        lock, outbound = self._outbound_state()
+        future = asyncio.run_coroutine_threadsafe(
+            self._deliver_notification(
+                message,
+                chat_id,
+                reply_to_message_id,
+                token_address,
+                chain,
+                photo_url,
+                on_complete,
+            ),
+            self.bot_loop,
+        )
+        with lock:
+            outbound.add(future)
+
+        def forget(done_future):
+            with lock:
+                outbound.discard(done_future)
+
+        future.add_done_callback(forget)
+        return future
+
+    def pending_deliveries(self) -> int:
+        lock, outbound = self._outbound_state()
+        with lock:
+            return len(outbound)
+
+    def drain_outbound(self, timeout: float = _OUTBOUND_DRAIN_TIMEOUT) -> int:
+        """Wait for queued sends; cancel what is left. Returns the cancel count."""
+        lock, outbound = self._outbound_state()
+        with lock:
+            pending = list(outbound)
+        if not pending:
+            return 0
+        _, not_done = concurrent.futures.wait(pending, timeout=timeout)
+        for future in not_done:
+            future.cancel()
+        if not_done:
+            print(f"⚠️ 丢弃 {len(not_done)} 条未完成的 Telegram 通知")
+        return len(not_done)
+
+    def _message_count_state(self):
+        # Instances built via __new__ (tests) skip __init__; create lazily.
+        if getattr(self, "_message_count_lock", None) is None:
+            self._message_count_lock = threading.Lock()
+            self._message_counts = {}
+        return self._message_count_lock, self._message_counts
+
+    def _count_sent(self, chat_id: int):
+        lock, counts = self._message_count_state()
+        with lock:
+            counts[chat_id] = counts.get(chat_id, 0) + 1
+
+    def flush_message_counts(self):
+        """Write buffered message counts to telegram_chats in one transaction."""
+        lock, counts = self._message_count_state()
+        with lock:
+            pending = dict(counts)
+            counts.clear()
+        if not pending:
+            return
+        try:
+            self.chat_storage.add_message_counts(pending)
+        except Exception as e:
+            print(f"❌ 写入消息计数失败: {e}")
+            with lock:
+                for chat_id, count in pending.items():
+                    counts[chat_id] = counts.get(chat_id, 0) + count
+
+    async def _flush_message_counts_periodically(self):
+        while True:
+            await asyncio.sleep(_MESSAGE_COUNT_FLUSH_INTERVAL)
+            await asyncio.to_thread(self.flush_message_counts)
+
     def _updater_running(self) -> bool:
         app = self.app
         if app is None:
@@ -739,6 +973,7 @@ class TelegramNotifier:
         def run_bot():
             self.bot_loop = asyncio.new_event_loop()
             asyncio.set_event_loop(self.bot_loop)
+            flush_task = None
 
             try:
                 self._setup_application()
@@ -755,6 +990,9 @@ class TelegramNotifier:
                     )
                 )
                 self._started_at = time.time()
+                flush_task = self.bot_loop.create_task(
+                    self._flush_message_counts_periodically()
+                )
                 self._ready_event.set()
                 print("✅ Telegram polling started")
                 self.bot_loop.run_forever()
@@ -766,6 +1004,15 @@ class TelegramNotifier:
 
                 traceback.print_exc()
             finally:
+                try:
+                    if flush_task is not None and not self.bot_loop.is_closed():
+                        flush_task.cancel()
+                        self.bot_loop.run_until_complete(
+                            asyncio.gather(flush_task, return_exceptions=True)
+                        )
+                except Exception:
+                    pass
+                self.flush_message_counts()
                 try:
                     if self.app and self.bot_loop and not self.bot_loop.is_closed():
                         if self._updater_running():
@@ -847,6 +1094,10 @@ class TelegramNotifier:
         if not loop and not thread:
             return
 
+        if self.queue_available():
+            self.drain_outbound()
+        else:
+            self.drain_outbound(timeout=0)
         try:
             if loop and not loop.is_closed():
                 loop.call_soon_threadsafe(loop.stop)
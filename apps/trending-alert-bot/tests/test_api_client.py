@@ -0,0 +1,178 @@
+import json
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+import api
+
+
+class StubResponse:
+    def __init__(self, payload):
+        self._payload = payload
+
+    def raise_for_status(self):
+        return None
+
+    def json(self):
+        return self._payload
+
+
+class StubSession:
+    def __init__(self, registry, payload=None, error=None, delay=0.0):
+        self.registry = registry
+        self.payload = payload if payload is not None else {"code": 0, "data": []}
+        self.error = error
+        self.delay = delay
+        self.calls = []
+        self.closed = False
+        registry.append(self)
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs))
+        if self.delay:
+            time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return StubResponse(self.payload)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class XXYYClientTests(unittest.TestCase):
+    def test_sequential_requests_reuse_one_session_per_host(self):
+        sessions = []
+        client = api.XXYYClient(transport=lambda: StubSession(sessions))
+
+        client.get("https://www.xxyy.io/a")
+        client.post("https://www.xxyy.io/b", json={"x": 1})
+        client.get("https://other.example/c")
+
+        self.assertEqual(len(sessions), 2)
+        self.assertEqual(
+            [call[0] for call in sessions[0].calls],
+            ["GET", "POST"],
+        )
+        self.assertEqual(sessions[0].calls[1][2]["timeout"], 30)
+        self.assertEqual(client.idle_sessions("www.xxyy.io"), 1)
+
+    def test_idle_session_past_timeout_is_closed_and_replaced(self):
+        sessions = []
+        clock = FakeClock()
+        client = api.XXYYClient(
+            idle_timeout=10,
+            transport=lambda: StubSession(sessions),
+            clock=clock,
+        )
+
+        client.get("https://www.xxyy.io/a")
+        clock.now = 11
+        client.get("https://www.xxyy.io/a")
+
+        self.assertEqual(len(sessions), 2)
+        self.assertTrue(sessions[0].closed)
+        self.assertFalse(sessions[1].closed)
+
+    def test_failed_request_discards_session(self):
+        sessions = []
+        client = api.XXYYClient(
+            transport=lambda: StubSession(sessions, error=RuntimeError("reset"))
+        )
+
+        with self.assertRaises(RuntimeError):
+            client.get("https://www.xxyy.io/a")
+
+        self.assertTrue(sessions[0].closed)
+        self.assertEqual(client.idle_sessions(), 0)
+
+    def test_pool_size_bounds_concurrent_sessions_per_host(self):
+        sessions = []
+        client = api.XXYYClient(
+            pool_size=2,
+            transport=lambda: StubSession(sessions, delay=0.05),
+        )
+
+        threads = [
+            threading.Thread(target=client.get, args=("https://www.xxyy.io/a",))
+            for _ in range(6)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(sessions), 2)
+        self.assertEqual(sum(len(session.calls) for session in sessions), 6)
+
+    def test_close_releases_idle_sessions(self):
+        sessions = []
+        client = api.XXYYClient(transport=lambda: StubSession(sessions))
+        client.get("https://www.xxyy.io/a")
+
+        client.close()
+        client.get("https://www.xxyy.io/a")
+
+        self.assertTrue(all(session.closed for session in sessions))
+        self.assertEqual(client.idle_sessions(), 0)
+
+    def test_fetch_functions_use_shared_client(self):
+        sessions = []
+        client = api.XXYYClient(
+            transport=lambda: StubSession(sessions, payload={"code": 0, "data": [1]})
+        )
+        previous = api.set_client(client)
+        try:
+            self.assertEqual(api.fetch_trending(chain="bsc")["data"], [1])
+            api.fetch_kol_holders("MINT", "PAIR", "bsc", authorization="auth")
+        finally:
+            api.set_client(previous)
+
+        self.assertEqual(len(sessions), 1)
+        trending_call, kol_call = sessions[0].calls
+        self.assertEqual(trending_call[0], "POST")
+        self.assertEqual(trending_call[2]["headers"]["x-chain"], "bsc")
+        self.assertEqual(kol_call[0], "GET")
+        self.assertEqual(kol_call[2]["params"], {"mint": "MINT", "pair": "PAIR"})
+        self.assertEqual(kol_call[2]["headers"]["authorization"], "auth")
+
+    def test_pool_settings_are_validated_in_config(self):
+        base_env = {
+            "BOT_CHECK_INTERVAL": "15",
+            "BOT_CHAIN": "sol",
+            "BOT_NOTIFY_COOLDOWN_HOURS": "24",
+            "BOT_MULTIPLIER_CONFIRMATIONS": "1",
+            "BOT_NOTIFICATION_TYPES": json.dumps(["trending"]),
+            "BOT_CHAIN_ALLOWLIST_JSON": json.dumps({"sol": {}}),
+            "BOT_DATA_DIR": "data/test",
+            "BOT_TELEGRAM_TOKEN": "123:test",
+        }
+        invalid_values = [
+            ("XXYY_HTTP_POOL_SIZE", "eight"),
+            ("XXYY_HTTP_POOL_SIZE", "0"),
+            ("XXYY_HTTP_IDLE_TIMEOUT_SECONDS", "soon"),
+            ("XXYY_HTTP_IDLE_TIMEOUT_SECONDS", "-1"),
+        ]
+        for name, value in invalid_values:
+            with self.subTest(name=name, value=value):
+                with mock.patch.dict(os.environ, {**base_env, name: value}, clear=True):
+                    sys.modules.pop("config", None)
+                    try:
+                        with self.assertRaisesRegex(RuntimeError, name):
+                            import config  # noqa: F401
+                    finally:
+                        sys.modules.pop("config", None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -21,6 +21,7 @@ RUNTIME_MODULE_NAMES = (
     "telegram_bot",
     "storage",
     "chat_storage",
+    "photo_cache",
     "db_storage",
     "narrative_service",
     "narrative_storage",
@@ -2,6 +2,8 @@ import json
 import os
 import sys
 import tempfile
+import threading
+import time
 import unittest
 from types import SimpleNamespace
 from unittest import mock
@@ -889,6 +891,123 @@ class NarrativeServiceTests(unittest.TestCase):
             self.assertEqual(second.score, first.score)
             self.assertEqual(provider.calls, 1)
 
+    def test_concurrent_misses_share_one_provider_call(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            load_narrative_modules(tmp)
+            import narrative_service
+            from narrative_provider import BaseNarrativeProvider
+            from narrative_types import EvidenceItem, NarrativeLLMResult
+
+            started = threading.Event()
+            release = threading.Event()
+
+            class BlockingProvider(BaseNarrativeProvider):
+                provider_name = "mock"
+                calls = 0
+
+                def analyze(self, narrative_input):
+                    self.calls += 1
+                    started.set()
+                    release.wait(5)
+                    return (
+                        NarrativeLLMResult(
+                            narrative_tags=["meme"],
+                            summary="Shared analysis.",
+                            confidence="medium",
+                        ),
+                        [EvidenceItem(url="https://x.com/example/status/1")],
+                    )
+
+            provider = BlockingProvider()
+            results = []
+
+            def analyze():
+                results.append(
+                    narrative_service.analyze_contract_narrative(
+                        self._contract(), "sol", []
+                    )
+                )
+
+            with mock.patch.object(
+                narrative_service, "_get_provider", return_value=provider
+            ):
+                threads = [threading.Thread(target=analyze) for _ in range(3)]
+                threads[0].start()
+                self.assertTrue(started.wait(5))
+                for thread in threads[1:]:
+                    thread.start()
+                # 等后两个调用也进入同一 flight 后再放行
+                deadline = time.monotonic() + 5
+                while (
+                    narrative_service._PROVIDER_FLIGHTS.stats()["calls"] < 3
+                    and time.monotonic() < deadline
+                ):
+                    time.sleep(0.01)
+                in_flight = narrative_service.narrative_cache_stats()["in_flight"]
+                release.set()
+                for thread in threads:
+                    thread.join(5)
+                cached = narrative_service.analyze_contract_narrative(
+                    self._contract(), "sol", []
+                )
+
+            self.assertEqual(provider.calls, 1)
+            self.assertEqual(in_flight, 1)
+            self.assertEqual(len(results), 3)
+            self.assertTrue(all(result is results[0] for result in results))
+            self.assertIs(cached, results[0])
+            self.assertEqual(narrative_service.narrative_cache_stats()["hits"], 1)
+
+    def test_flight_rechecks_cache_before_calling_provider(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            load_narrative_modules(tmp)
+            import narrative_service
+            from narrative_provider import BaseNarrativeProvider
+            from narrative_types import EvidenceItem, NarrativeLLMResult
+
+            class CountingProvider(BaseNarrativeProvider):
+                provider_name = "mock"
+                calls = 0
+
+                def analyze(self, narrative_input):
+                    self.calls += 1
+                    return (
+                        NarrativeLLMResult(
+                            narrative_tags=["meme"],
+                            summary="Cached by the previous flight.",
+                            confidence="medium",
+                        ),
+                        [EvidenceItem(url="https://x.com/example/status/1")],
+                    )
+
+            provider = CountingProvider()
+            with mock.patch.object(
+                narrative_service, "_get_provider", return_value=provider
+            ):
+                first = narrative_service.analyze_contract_narrative(
+                    self._contract(), "sol", []
+                )
+                real_load = narrative_service.load_cached_analysis
+                lookups = []
+
+                def load_after_race(*args):
+                    # 第一次查缓存发生在上一个 flight 写入之前
+                    lookups.append(args)
+                    return None if len(lookups) == 1 else real_load(*args)
+
+                with mock.patch.object(
+                    narrative_service,
+                    "load_cached_analysis",
+                    side_effect=load_after_race,
+                ):
+                    second = narrative_service.analyze_contract_narrative(
+                        self._contract(), "sol", []
+                    )
+
+            self.assertEqual(provider.calls, 1)
+            self.assertEqual(len(lookups), 2)
+            self.assertEqual(second.summary, first.summary)
+
     def test_generator_evidence_is_materialized_and_cached(self):
         with tempfile.TemporaryDirectory() as tmp:
             load_narrative_modules(tmp)
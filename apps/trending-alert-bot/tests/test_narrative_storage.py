@@ -129,6 +129,48 @@ class NarrativeStorageTests(unittest.TestCase):
                 },
             )
 
+    def test_decoded_analysis_is_served_from_memory_until_expiry(self):
+        with mock.patch.dict(os.environ, {}, clear=True):
+            with tempfile.TemporaryDirectory() as tmp:
+                (
+                    _,
+                    narrative_storage,
+                    NarrativeAnalysis,
+                    _,
+                ) = load_narrative_storage_modules(tmp)
+                analysis = NarrativeAnalysis(
+                    provider="mock",
+                    score=72,
+                    confidence="medium",
+                    tags=["meme"],
+                    summary="Cached narrative.",
+                )
+                narrative_storage.save_analysis("sol", "TOKEN1", analysis, ttl_hours=1)
+                # 丢弃写入时的缓存，第一次读取从 SQLite 解码并回填
+                narrative_storage._ANALYSIS_CACHE.clear()
+                loaded = narrative_storage.load_cached_analysis("sol", "TOKEN1", "mock")
+
+                with mock.patch.object(
+                    narrative_storage, "connect", side_effect=AssertionError("sqlite")
+                ):
+                    again = narrative_storage.load_cached_analysis(
+                        "sol", "TOKEN1", "mock"
+                    )
+                stats = narrative_storage.cache_stats()
+                entry_expires_at = narrative_storage._ANALYSIS_CACHE._entries[
+                    ("sol", "TOKEN1", "mock")
+                ][0]
+                remaining = (
+                    entry_expires_at - narrative_storage._ANALYSIS_CACHE._clock()
+                )
+
+            self.assertEqual(loaded, analysis)
+            self.assertIs(again, loaded)
+            self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+            # 内存条目的有效期来自 SQLite 中的 expires_at
+            self.assertGreater(remaining, 3500)
+            self.assertLessEqual(remaining, 3600)
+
     def test_load_cached_analysis_returns_none_for_missing_row(self):
         with mock.patch.dict(os.environ, {}, clear=True):
             with tempfile.TemporaryDirectory() as tmp:
@@ -0,0 +1,119 @@
+import asyncio
+import unittest
+
+from rate_limiter import TelegramRateLimiter, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += seconds
+
+
+def make_limiter(clock, **kwargs):
+    return TelegramRateLimiter(clock=clock, sleep=clock.sleep, **kwargs)
+
+
+class TokenBucketTests(unittest.TestCase):
+    def test_refills_at_rate_up_to_capacity(self):
+        clock = FakeClock()
+        bucket = TokenBucket(2, 2, clock)
+        bucket.take()
+        bucket.take()
+
+        self.assertAlmostEqual(bucket.delay(), 0.5)
+        clock.now = 10
+        self.assertEqual(bucket.delay(), 0)
+        bucket.take()
+        bucket.take()
+        self.assertGreater(bucket.delay(), 0)
+
+    def test_block_empties_bucket_for_server_wait(self):
+        clock = FakeClock()
+        bucket = TokenBucket(10, 10, clock)
+
+        bucket.block(3)
+
+        self.assertEqual(bucket.delay(), 3)
+        clock.now = 3
+        self.assertEqual(bucket.delay(), 0)
+
+
+class TelegramRateLimiterTests(unittest.TestCase):
+    def test_same_chat_is_paced_and_other_chats_are_not(self):
+        clock = FakeClock()
+        limiter = make_limiter(clock)
+
+        async def run():
+            await limiter.acquire(1)
+            await limiter.acquire(2)
+            self.assertEqual(clock.now, 0)
+            await limiter.acquire(1)
+            self.assertAlmostEqual(clock.now, 1.0)
+
+        asyncio.run(run())
+
+    def test_global_rate_caps_broadcast(self):
+        clock = FakeClock()
+        limiter = make_limiter(clock, global_rate=30)
+
+        async def run():
+            for chat_id in range(1, 61):
+                await limiter.acquire(chat_id)
+
+        asyncio.run(run())
+
+        self.assertAlmostEqual(clock.now, 1.0)
+
+    def test_groups_are_limited_per_minute_after_burst(self):
+        clock = FakeClock()
+        limiter = make_limiter(clock, chat_rate=100, group_burst=5)
+
+        async def run():
+            for _ in range(5):
+                await limiter.acquire(-100)
+            self.assertLess(clock.now, 0.1)
+            await limiter.acquire(-100)
+
+        asyncio.run(run())
+
+        self.assertAlmostEqual(clock.now, 3.0, places=1)
+
+    def test_retry_after_delays_only_that_chat(self):
+        clock = FakeClock()
+        limiter = make_limiter(clock)
+
+        async def run():
+            await limiter.acquire(1)
+            limiter.retry_after(1, 5)
+            await limiter.acquire(2)
+            self.assertEqual(clock.now, 0)
+            await limiter.acquire(1)
+            self.assertAlmostEqual(clock.now, 5.0)
+
+        asyncio.run(run())
+
+    def test_waiters_for_one_chat_are_served_in_order(self):
+        clock = FakeClock()
+        limiter = make_limiter(clock)
+        order = []
+
+        async def send(label):
+            await limiter.acquire(1)
+            order.append(label)
+
+        async def run():
+            await asyncio.gather(*(send(label) for label in "abcd"))
+
+        asyncio.run(run())
+
+        self.assertEqual(order, list("abcd"))
+
+
+if __name__ == "__main__":
+    unittest.main()
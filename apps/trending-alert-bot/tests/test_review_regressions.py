@@ -1,7 +1,9 @@
 import datetime as dt
 import asyncio
+import contextlib
 import json
 import os
+import sqlite3
 import sys
 import tempfile
 import threading
@@ -30,6 +32,7 @@ def load_runtime_modules(data_dir: str):
     for name in [
         "config",
         "chat_storage",
+        "photo_cache",
         "db_storage",
         "storage",
         "telegram_bot",
@@ -71,6 +74,19 @@ def sample_contract(**overrides):
     return contract
 
 
+@contextlib.contextmanager
+def running_event_loop():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        yield loop
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
+
+
 class ReviewRegressionTests(unittest.TestCase):
     def test_narrative_config_defaults_disabled(self):
         with tempfile.TemporaryDirectory() as tmp:
@@ -83,6 +99,46 @@ class ReviewRegressionTests(unittest.TestCase):
             self.assertEqual(config.NARRATIVE_TIMEOUT_SECONDS, 20)
             self.assertEqual(config.XAI_API_KEY, "")
 
+    def test_invalid_numeric_settings_raise_runtime_error_naming_variable(self):
+        invalid_values = [
+            ("BOT_SCAN_CONCURRENCY", "four"),
+            ("BOT_SCAN_CONCURRENCY", "0"),
+            ("BOT_PENDING_CHECK_INTERVAL", "-1"),
+            ("BOT_SCAN_MAX_BACKOFF_SECONDS", "5m"),
+            ("BOT_KOL_CACHE_TTL_SECONDS", "soon"),
+            ("BOT_KOL_CACHE_MAX_ENTRIES", "0"),
+            ("BOT_CONTRACT_CACHE_SIZE", "1.5"),
+            ("BOT_REPORT_CACHE_TTL_SECONDS", "-1"),
+            ("BOT_REPORT_SNAPSHOT_MAX_AGE_SECONDS", "two"),
+            ("BOT_PHOTO_FILE_ID_CACHE_SIZE", "many"),
+            ("NARRATIVE_MEMORY_CACHE_SIZE", "-5"),
+            ("NARRATIVE_WAIT_SECONDS", "later"),
+            ("BOT_CHAIN_CHECK_INTERVALS_JSON", json.dumps({"sol": "fast"})),
+            ("BOT_CHAIN_CHECK_INTERVALS_JSON", json.dumps({"sol": 0})),
+            ("BOT_CHAIN_CHECK_INTERVALS_JSON", "{sol: 10}"),
+        ]
+        for name, value in invalid_values:
+            with self.subTest(name=name, value=value):
+                with tempfile.TemporaryDirectory() as tmp:
+                    with mock.patch.dict(os.environ, {name: value}):
+                        with self.assertRaisesRegex(RuntimeError, name):
+                            load_runtime_modules(tmp)
+                sys.modules.pop("config", None)
+
+    def test_empty_numeric_setting_uses_default(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with mock.patch.dict(
+                os.environ,
+                {
+                    "BOT_SCAN_CONCURRENCY": "",
+                    "BOT_CHAIN_CHECK_INTERVALS_JSON": json.dumps({"sol": "10"}),
+                },
+            ):
+                config, _, _, _, _ = load_runtime_modules(tmp)
+
+            self.assertEqual(config.SCAN_CONCURRENCY, 4)
+            self.assertEqual(config.CHAIN_CHECK_INTERVALS, {"sol": 10})
+
     def test_dry_run_multiplier_does_not_mark_notified(self):
         with tempfile.TemporaryDirectory() as tmp:
             _, _, monitor_flow, _, ContractStorage = load_runtime_modules(tmp)
@@ -285,6 +341,32 @@ class ReviewRegressionTests(unittest.TestCase):
             self.assertIn("[SOL] ⚡️ 异动通知", msg)
             self.assertNotIn("🧠 叙事", msg)
 
+    def test_disabled_narratives_skip_narrative_executor(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, _, monitor_flow, _, ContractStorage = load_runtime_modules(tmp)
+            storage = ContractStorage(chain="sol", chat_id=111)
+            contract = sample_contract(tokenAddress="TOKEN1", priceUSD="1.0")
+
+            monitor_flow.ENABLE_TELEGRAM = False
+            monitor_flow.DRY_RUN = True
+            with (
+                mock.patch.object(monitor_flow, "NARRATIVE_ENABLED", False),
+                mock.patch.object(monitor_flow, "NARRATIVE_WAIT_SECONDS", 0),
+                mock.patch.object(
+                    monitor_flow._NARRATIVE_EXECUTOR, "submit"
+                ) as submit_mock,
+                mock.patch.object(
+                    monitor_flow, "format_initial_notification", return_value="msg"
+                ) as format_mock,
+            ):
+                sent = monitor_flow._send_candidate_notification(
+                    storage, 111, "sol", contract, [], [], False
+                )
+
+            self.assertEqual(sent, 1)
+            submit_mock.assert_not_called()
+            self.assertIsNone(format_mock.call_args.kwargs["narrative"])
+
     def test_candidate_notification_uses_narrative_when_available(self):
         with tempfile.TemporaryDirectory() as tmp:
             _, _, monitor_flow, _, ContractStorage = load_runtime_modules(tmp)
@@ -302,6 +384,7 @@ class ReviewRegressionTests(unittest.TestCase):
             monitor_flow.ENABLE_TELEGRAM = False
             monitor_flow.DRY_RUN = True
             with (
+                mock.patch.object(monitor_flow, "NARRATIVE_ENABLED", True),
                 mock.patch.object(
                     monitor_flow,
                     "analyze_contract_narrative",
@@ -325,6 +408,49 @@ class ReviewRegressionTests(unittest.TestCase):
             narrative_mock.assert_called_once()
             self.assertEqual(format_mock.call_args.kwargs["narrative"]["score"], 66)
 
+    def test_candidate_notification_persists_send_result_inside_batch(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config, _, monitor_flow, _, ContractStorage = load_runtime_modules(tmp)
+            storage = ContractStorage(chain="sol", chat_id=111)
+
+            def send_sync(*args, **kwargs):
+                # 发送前缓冲写入已落盘
+                with sqlite3.connect(config.SQLITE_DB_FILE) as observer:
+                    self.assertIsNotNone(
+                        observer.execute(
+                            "SELECT 1 FROM contracts WHERE token_address = 'TOKEN1'"
+                        ).fetchone()
+                    )
+                return {"111": 555}
+
+            monitor_flow.ENABLE_TELEGRAM = True
+            monitor_flow.DRY_RUN = False
+            with (
+                mock.patch.object(
+                    monitor_flow, "analyze_contract_narrative", return_value=None
+                ),
+                mock.patch.object(
+                    monitor_flow.notifier, "send_sync", side_effect=send_sync
+                ),
+                storage.batch(),
+            ):
+                monitor_flow._send_candidate_notification(
+                    storage,
+                    111,
+                    "sol",
+                    sample_contract(tokenAddress="TOKEN1", imageUrl=""),
+                    [],
+                    [],
+                    False,
+                )
+                with sqlite3.connect(config.SQLITE_DB_FILE) as observer:
+                    self.assertEqual(
+                        observer.execute(
+                            "SELECT message_id FROM contract_message_ids"
+                        ).fetchone()[0],
+                        555,
+                    )
+
     def test_candidate_notification_continues_when_narrative_analysis_returns_none(
         self,
     ):
@@ -336,6 +462,7 @@ class ReviewRegressionTests(unittest.TestCase):
             monitor_flow.ENABLE_TELEGRAM = False
             monitor_flow.DRY_RUN = True
             with (
+                mock.patch.object(monitor_flow, "NARRATIVE_ENABLED", True),
                 mock.patch.object(
                     monitor_flow, "analyze_contract_narrative", return_value=None
                 ) as narrative_mock,
@@ -370,6 +497,7 @@ class ReviewRegressionTests(unittest.TestCase):
             monitor_flow.ENABLE_TELEGRAM = False
             monitor_flow.DRY_RUN = True
             with (
+                mock.patch.object(monitor_flow, "NARRATIVE_ENABLED", True),
                 mock.patch.object(
                     monitor_flow,
                     "fetch_trending",
@@ -395,6 +523,111 @@ class ReviewRegressionTests(unittest.TestCase):
 
             narrative_mock.assert_called_once_with(contract, "sol", [])
 
+    def test_scan_once_prefetches_trend_and_anomaly_narratives_in_parallel(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, _, monitor_flow, _, _ = load_runtime_modules(tmp)
+            trend = sample_contract(tokenAddress="TREND", priceUSD="1.0")
+            anomaly = sample_contract(tokenAddress="ANOMALY", priceUSD="1.0")
+            # 两个分析都开始后才能继续，串行执行会超时并退化为无叙事
+            both_started = threading.Barrier(2, timeout=5)
+
+            def analyze(contract, chain, kol_holders):
+                both_started.wait()
+                analysis = mock.Mock()
+                analysis.to_display_dict.return_value = {
+                    "score": 50,
+                    "token": contract["tokenAddress"],
+                }
+                return analysis
+
+            monitor_flow.ENABLE_TELEGRAM = False
+            monitor_flow.DRY_RUN = True
+            with (
+                mock.patch.object(monitor_flow, "NARRATIVE_ENABLED", True),
+                mock.patch.object(
+                    monitor_flow,
+                    "fetch_trending",
+                    return_value={"data": [trend, anomaly]},
+                ),
+                mock.patch.object(
+                    monitor_flow,
+                    "_pick_trend_and_anomaly_contract",
+                    return_value=((trend, [], []), (anomaly, [], [])),
+                ),
+                mock.patch.object(
+                    monitor_flow, "analyze_contract_narrative", side_effect=analyze
+                ) as narrative_mock,
+                mock.patch.object(
+                    monitor_flow, "format_initial_notification", return_value="msg"
+                ) as format_mock,
+            ):
+                monitor_flow.scan_once("sol", [{"chat_id": 111}, {"chat_id": 222}], {})
+
+            self.assertEqual(narrative_mock.call_count, 2)
+            self.assertEqual(
+                sorted(
+                    call.kwargs["narrative"]["token"]
+                    for call in format_mock.call_args_list
+                ),
+                ["ANOMALY", "ANOMALY", "TREND", "TREND"],
+            )
+
+    def test_late_narrative_is_posted_as_reply_after_basic_alert(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, _, monitor_flow, _, ContractStorage = load_runtime_modules(tmp)
+            storage = ContractStorage(chain="sol", chat_id=111)
+            contract = sample_contract(tokenAddress="TOKEN1", imageUrl="")
+            release = threading.Event()
+            replied = threading.Event()
+            fake_analysis = mock.Mock()
+            fake_analysis.to_display_dict.return_value = {
+                "tags": ["meme"],
+                "score": 66,
+                "summary": "late",
+                "confidence": "medium",
+                "risk_flags": [],
+            }
+
+            def analyze(*args):
+                release.wait(5)
+                return fake_analysis
+
+            def send_sync(message, **kwargs):
+                if kwargs.get("reply_to_message_id"):
+                    replied.set()
+                return {111: 555}
+
+            monitor_flow.ENABLE_TELEGRAM = True
+            monitor_flow.DRY_RUN = False
+            with (
+                mock.patch.object(monitor_flow, "NARRATIVE_ENABLED", True),
+                mock.patch.object(monitor_flow, "NARRATIVE_WAIT_SECONDS", 0.01),
+                mock.patch.object(
+                    monitor_flow, "analyze_contract_narrative", side_effect=analyze
+                ),
+                mock.patch.object(
+                    monitor_flow.notifier, "queue_available", return_value=False
+                ),
+                mock.patch.object(
+                    monitor_flow.notifier, "send_sync", side_effect=send_sync
+                ) as send_mock,
+            ):
+                sent = monitor_flow._send_candidate_notification(
+                    storage, 111, "sol", contract, [], [], False
+                )
+                self.assertEqual(sent, 1)
+                self.assertEqual(send_mock.call_count, 1)
+                self.assertNotIn("🧠 叙事", send_mock.call_args.args[0])
+
+                release.set()
+                self.assertTrue(replied.wait(5))
+
+            reply = send_mock.call_args
+            self.assertEqual(reply.kwargs["reply_to_message_id"], 555)
+            self.assertEqual(reply.kwargs["chat_id"], 111)
+            self.assertIn("🧠 叙事: meme", reply.args[0])
+            self.assertIn("TOKEN1", reply.args[0])
+
     def test_candidate_notification_continues_when_narrative_display_fails(self):
         with tempfile.TemporaryDirectory() as tmp:
             _, _, monitor_flow, _, ContractStorage = load_runtime_modules(tmp)
@@ -406,6 +639,7 @@ class ReviewRegressionTests(unittest.TestCase):
             monitor_flow.ENABLE_TELEGRAM = False
             monitor_flow.DRY_RUN = True
             with (
+                mock.patch.object(monitor_flow, "NARRATIVE_ENABLED", True),
                 mock.patch.object(
                     monitor_flow,
                     "analyze_contract_narrative",
@@ -607,26 +841,24 @@ class ReviewRegressionTests(unittest.TestCase):
     def test_candidate_skips_kols_without_trade_activity(self):
         with tempfile.TemporaryDirectory() as tmp:
             _, _, monitor_flow, _, _ = load_runtime_modules(tmp)
-            inactive_contract = sample_contract(tokenAddress="INACTIVE")
-            active_contract = sample_contract(tokenAddress="ACTIVE")
+            created_now = str(int(time.time() * 1000))
+            inactive_contract = sample_contract(
+                tokenAddress="INACTIVE", createTime=created_now
+            )
+            active_contract = sample_contract(
+                tokenAddress="ACTIVE", createTime=created_now
+            )
             kol_lists = {
                 "INACTIVE": [{"buyCount": 0, "sellCount": 0, "holdPercent": 1}],
                 "ACTIVE": [{"buyCount": 1, "sellCount": 0, "holdPercent": 0}],
             }
 
-            with (
-                mock.patch.object(
-                    monitor_flow,
-                    "is_anomaly_contract",
-                    return_value=False,
-                ),
-                mock.patch.object(
-                    monitor_flow,
-                    "fetch_kol_list",
-                    side_effect=lambda contract, chain, context="": kol_lists[
-                        contract["tokenAddress"]
-                    ],
-                ),
+            with mock.patch.object(
+                monitor_flow,
+                "_probe_kol_list",
+                side_effect=lambda contract, chain: kol_lists[
+                    contract["tokenAddress"]
+                ],
             ):
                 trend_contract, anomaly_contract = (
                     monitor_flow._pick_trend_and_anomaly_contract(
@@ -635,10 +867,105 @@ class ReviewRegressionTests(unittest.TestCase):
                     )
                 )
 
-            self.assertEqual(trend_contract[0]["tokenAddress"], "ACTIVE")
+            self.assertEqual(trend_contract[0].token_address, "ACTIVE")
+            self.assertIs(trend_contract[0].raw, active_contract)
             self.assertEqual(trend_contract[1], [])
             self.assertIsNone(anomaly_contract)
 
+    def test_candidate_probe_keeps_list_order_when_probing_in_parallel(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, _, monitor_flow, _, _ = load_runtime_modules(tmp)
+            contracts = [
+                sample_contract(tokenAddress=f"TOKEN{index}") for index in range(8)
+            ]
+            # 仅 TOKEN0 为当天创建的趋势合约，其余为异动
+            contracts[0]["createTime"] = str(int(time.time() * 1000))
+            active_kols = [{"buyCount": 1, "sellCount": 0, "holdPercent": 0}]
+            probed = []
+            probed_lock = threading.Lock()
+
+            def fetch(contract, chain):
+                token = contract["tokenAddress"]
+                with probed_lock:
+                    probed.append(token)
+                # 首个候选最慢返回，仍应按榜单顺序胜出
+                time.sleep(0.05 if token == "TOKEN0" else 0.0)
+                return active_kols if token in {"TOKEN0", "TOKEN1"} else []
+
+            with mock.patch.object(monitor_flow, "_probe_kol_list", side_effect=fetch):
+                started = time.perf_counter()
+                trend_contract, anomaly_contract = (
+                    monitor_flow._pick_trend_and_anomaly_contract(
+                        contracts,
+                        "sol",
+                        probe_window=2,
+                    )
+                )
+                elapsed = time.perf_counter() - started
+
+            self.assertEqual(trend_contract[0].token_address, "TOKEN0")
+            self.assertEqual(anomaly_contract[0].token_address, "TOKEN1")
+            self.assertEqual(sorted(probed), ["TOKEN0", "TOKEN1"])
+            self.assertLess(elapsed, 0.1)
+
+    def test_kol_list_is_cached_per_token_and_pair(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, _, monitor_flow, _, _ = load_runtime_modules(tmp)
+            contract = sample_contract()
+            other_pair = sample_contract(pairAddress="PAIR2")
+            kols = [{"buyCount": 1, "sellCount": 0, "holdPercent": 1}]
+
+            with mock.patch.object(
+                monitor_flow,
+                "fetch_kol_holders",
+                return_value={"data": kols},
+            ) as fetch_holders:
+                first = monitor_flow.fetch_kol_list(contract, "sol")
+                first.clear()
+                second = monitor_flow.fetch_kol_list(contract, "sol")
+                monitor_flow.load_kol_status(other_pair, "sol")
+
+            self.assertEqual(second, kols)
+            self.assertEqual(fetch_holders.call_count, 2)
+            self.assertEqual(monitor_flow._KOL_CACHE.stats()["hits"], 1)
+
+    def test_kol_fetch_failure_is_not_cached(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, _, monitor_flow, _, _ = load_runtime_modules(tmp)
+            contract = sample_contract()
+            kols = [{"buyCount": 1, "sellCount": 0, "holdPercent": 1}]
+
+            with mock.patch.object(
+                monitor_flow,
+                "fetch_kol_holders",
+                side_effect=[RuntimeError("timeout"), {"data": kols}],
+            ):
+                self.assertEqual(monitor_flow.fetch_kol_list(contract, "sol"), [])
+                self.assertEqual(monitor_flow.fetch_kol_list(contract, "sol"), kols)
+
+    def test_failed_candidate_probe_is_not_memoized(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, _, monitor_flow, _, _ = load_runtime_modules(tmp)
+            contract = sample_contract(createTime=str(int(time.time() * 1000)))
+            inactive_kols = [{"buyCount": 0, "sellCount": 0, "holdPercent": 1}]
+            probe_memo = {}
+
+            with mock.patch.object(
+                monitor_flow,
+                "fetch_kol_holders",
+                side_effect=[RuntimeError("timeout"), {"data": inactive_kols}],
+            ):
+                monitor_flow._pick_trend_and_anomaly_contract(
+                    [contract], "sol", probe_memo=probe_memo
+                )
+                self.assertEqual(probe_memo, {})
+
+                monitor_flow._pick_trend_and_anomaly_contract(
+                    [contract], "sol", probe_memo=probe_memo
+                )
+
+            self.assertEqual(probe_memo, {contract["tokenAddress"]: False})
+
     def test_base_filters_ignore_audit_holder_percentages(self):
         with tempfile.TemporaryDirectory() as tmp:
             _, _, monitor_flow, _, _ = load_runtime_modules(tmp)
@@ -690,13 +1017,584 @@ class ReviewRegressionTests(unittest.TestCase):
             import monitor
 
             with mock.patch.object(
-                monitor, "scan_once", side_effect=[RuntimeError("bsc down"), True]
+                monitor,
+                "scan_once_async",
+                side_effect=[RuntimeError("bsc down"), True],
             ) as scan_mock:
                 found = monitor.scan_chains_once(["bsc", "sol"], [], {}, None)
 
             self.assertTrue(found)
             self.assertEqual(scan_mock.call_count, 2)
 
+    def test_scan_chains_once_reports_results_to_scheduler(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, _, monitor_flow, _, _ = load_runtime_modules(tmp)
+            import monitor
+            from scan_scheduler import ScanScheduler
+
+            scheduler = ScanScheduler(
+                ["bsc", "sol"], 15, fast_interval=5, max_backoff=60, clock=lambda: 1000.0
+            )
+            storages = {}
+            storage = monitor_flow.ensure_chat_storage(storages, 1, "sol")
+            storage.add_contract("TOKEN1", 1.0, sample_contract())
+            storage.update_pending_multiplier("TOKEN1", 2, 1)
+            monitor_flow.ensure_chat_storage(storages, 1, "bsc")
+
+            async def scan(chain, *args):
+                if chain == "bsc":
+                    raise RuntimeError("bsc down")
+                return False
+
+            with mock.patch.object(monitor, "scan_once_async", side_effect=scan):
+                monitor.scan_chains_once(
+                    ["bsc", "sol"], [{"chat_id": 1}], storages, None, scheduler
+                )
+                monitor.scan_chains_once(
+                    ["bsc"], [{"chat_id": 1}], storages, None, scheduler
+                )
+
+            self.assertEqual(scheduler.next_due("sol"), 1005.0)
+            self.assertEqual(scheduler.next_due("bsc"), 1030.0)
+
+    def test_scan_chains_once_fetches_chains_concurrently(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, _, monitor_flow, _, _ = load_runtime_modules(tmp)
+            import monitor
+
+            active_fetches = 0
+            max_active_fetches = 0
+            active_lock = threading.Lock()
+
+            def fetch(chain):
+                nonlocal active_fetches, max_active_fetches
+                with active_lock:
+                    active_fetches += 1
+                    max_active_fetches = max(max_active_fetches, active_fetches)
+                time.sleep(0.05)
+                with active_lock:
+                    active_fetches -= 1
+                return {"data": []}
+
+            with mock.patch.object(monitor_flow, "fetch_trending", side_effect=fetch):
+                found = monitor.scan_chains_once(["bsc", "sol"], [], {}, None)
+
+            self.assertFalse(found)
+            self.assertEqual(max_active_fetches, 2)
+
+    def test_scan_once_processes_chats_concurrently_within_cap(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, _, monitor_flow, _, _ = load_runtime_modules(tmp)
+            active_chats = [{"chat_id": chat_id} for chat_id in range(1, 7)]
+            active_processing = 0
+            max_active_processing = 0
+            processed = []
+            active_lock = threading.Lock()
+
+            def process(storage, chat_id, *args):
+                nonlocal active_processing, max_active_processing
+                with active_lock:
+                    active_processing += 1
+                    max_active_processing = max(
+                        max_active_processing, active_processing
+                    )
+                time.sleep(0.03)
+                with active_lock:
+                    active_processing -= 1
+                    processed.append(chat_id)
+
+            with (
+                mock.patch.object(
+                    monitor_flow, "fetch_trending", return_value={"data": []}
+                ),
+                mock.patch.object(monitor_flow, "SCAN_CONCURRENCY", 2),
+                mock.patch.object(
+                    monitor_flow, "_process_chat_contracts", side_effect=process
+                ),
+            ):
+                monitor_flow.scan_once("sol", active_chats, {})
+
+            self.assertEqual(sorted(processed), [1, 2, 3, 4, 5, 6])
+            self.assertEqual(max_active_processing, 2)
+
+    def test_scan_once_parses_contracts_once_for_all_chats(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, _, monitor_flow, _, _ = load_runtime_modules(tmp)
+            contracts = [
+                sample_contract(tokenAddress=f"TOKEN{index}") for index in range(5)
+            ]
+            storages = {}
+            for chat_id in (1, 2, 3):
+                storage = monitor_flow.ensure_chat_storage(storages, chat_id, "sol")
+                storage.add_contract("TOKEN0", 1.0, contracts[0])
+            checked = []
+
+            with (
+                mock.patch.object(
+                    monitor_flow, "fetch_trending", return_value={"data": contracts}
+                ),
+                mock.patch.object(
+                    monitor_flow,
+                    "_pick_trend_and_anomaly_contract",
+                    return_value=(None, None),
+                ),
+                mock.patch.object(
+                    monitor_flow,
+                    "should_filter_contract",
+                    wraps=monitor_flow.should_filter_contract,
+                ) as filter_mock,
+                mock.patch.object(
+                    monitor_flow,
+                    "check_multipliers",
+                    side_effect=lambda contract, storage, *args, **kwargs: checked.append(
+                        (storage.chat_id, kwargs["scan_contract"].token_address)
+                    ),
+                ),
+            ):
+                monitor_flow.scan_once(
+                    "sol",
+                    [{"chat_id": chat_id} for chat_id in (1, 2, 3)],
+                    storages,
+                )
+
+            self.assertEqual(filter_mock.call_count, len(contracts))
+            self.assertEqual(
+                sorted(checked),
+                [(1, "TOKEN0"), (2, "TOKEN0"), (3, "TOKEN0")],
+            )
+
+    def test_trending_page_is_parsed_into_typed_records_once(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, _, monitor_flow, _, _ = load_runtime_modules(tmp)
+            fresh = sample_contract(
+                tokenAddress="FRESH", createTime=str(int(time.time() * 1000))
+            )
+            contracts = [
+                fresh,
+                sample_contract(tokenAddress="OLD"),
+                sample_contract(
+                    tokenAddress="BROKEN",
+                    priceUSD="n/a",
+                    createTime="bad",
+                    launchFrom=None,
+                    security={"honeyPot": {"value": True}},
+                ),
+            ]
+
+            with mock.patch.object(
+                monitor_flow,
+                "beijing_today_start",
+                wraps=monitor_flow.beijing_today_start,
+            ) as today_mock:
+                records = monitor_flow.parse_trending_contracts(contracts)
+
+            self.assertEqual(today_mock.call_count, 1)
+            fresh_record, old_record, broken_record = records
+            self.assertIs(fresh_record.raw, fresh)
+            self.assertEqual(fresh_record.price, 2.0)
+            self.assertEqual(fresh_record.market_cap, 2000.0)
+            self.assertEqual(fresh_record.launch_from, "pump")
+            self.assertEqual(fresh_record.dex_name, "Raydium")
+            self.assertFalse(fresh_record.is_anomaly)
+            self.assertTrue(old_record.is_anomaly)
+            self.assertEqual(broken_record.price, 0.0)
+            self.assertIsNone(broken_record.create_time)
+            self.assertTrue(broken_record.is_anomaly)
+            self.assertTrue(broken_record.is_honeypot)
+            self.assertEqual(broken_record.launch_from, "")
+            self.assertIs(monitor_flow.parse_trending_contracts(records)[0], fresh_record)
+            self.assertFalse(hasattr(fresh_record, "__dict__"))
+
+    def test_unchanged_trending_tokens_skip_multiplier_checks_and_probes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, _, monitor_flow, _, _ = load_runtime_modules(tmp)
+            contracts = [
+                sample_contract(tokenAddress="STABLE"),
+                sample_contract(tokenAddress="PENDING"),
+                sample_contract(tokenAddress="MOVING"),
+            ]
+            storages = {}
+            storage = monitor_flow.ensure_chat_storage(storages, 1, "sol")
+            for contract in contracts:
+                storage.add_contract(contract["tokenAddress"], 2.0, contract)
+            storage.update_pending_multiplier("PENDING", 2, 1)
+            checked = []
+            probed = []
+
+            def scan(page):
+                with (
+                    mock.patch.object(
+                        monitor_flow, "fetch_trending", return_value={"data": page}
+                    ),
+                    mock.patch.object(
+                        monitor_flow,
+                        "_probe_kol_list",
+                        side_effect=lambda contract, chain: probed.append(
+                            contract["tokenAddress"]
+                        )
+                        or [],
+                    ),
+                    mock.patch.object(
+                        monitor_flow,
+                        "check_multipliers",
+                        side_effect=lambda contract, *args, **kwargs: checked.append(
+                            contract["tokenAddress"]
+                        ),
+                    ),
+                ):
+                    monitor_flow.scan_once("sol", [{"chat_id": 1}], storages)
+
+            scan(contracts)
+            self.assertEqual(sorted(checked), ["MOVING", "PENDING", "STABLE"])
+            self.assertEqual(sorted(probed), ["MOVING", "PENDING", "STABLE"])
+
+            checked.clear()
+            probed.clear()
+            scan(contracts[:2] + [sample_contract(tokenAddress="MOVING", priceUSD="3.0")])
+
+            self.assertEqual(sorted(checked), ["MOVING", "PENDING"])
+            self.assertEqual(probed, ["MOVING"])
+
+    def test_queued_notifications_return_before_delivery_and_keep_chat_order(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            load_runtime_modules(tmp)
+            import telegram_bot
+
+            notifier = telegram_bot.TelegramNotifier.__new__(
+                telegram_bot.TelegramNotifier
+            )
+            notifier.enabled = True
+            release = threading.Event()
+            sent = {}
+            active = {}
+            max_active = {}
+            completed = []
+
+            async def send_message(message, chat_id, reply_to, token, chain):
+                active[chat_id] = active.get(chat_id, 0) + 1
+                max_active[chat_id] = max(max_active.get(chat_id, 0), active[chat_id])
+                await asyncio.to_thread(release.wait, 5)
+                active[chat_id] -= 1
+                sent.setdefault(chat_id, []).append(message)
+                return {chat_id: len(sent[chat_id])}
+
+            notifier.send_message = send_message
+            with running_event_loop() as loop:
+                notifier.bot_loop = loop
+                futures = [
+                    notifier.enqueue_notification(
+                        f"msg{index}",
+                        chat_id,
+                        token_address="TOKEN1",
+                        on_complete=lambda ids, chat_id=chat_id: completed.append(
+                            (chat_id, ids)
+                        ),
+                    )
+                    for index, chat_id in enumerate((111, 111, 222))
+                ]
+
+                self.assertEqual(notifier.pending_deliveries(), 3)
+                deadline = time.monotonic() + 2
+                while time.monotonic() < deadline and len(active) < 2:
+                    time.sleep(0.01)
+                # 不同群组并发发送，同一群组排队
+                self.assertEqual(active, {111: 1, 222: 1})
+                release.set()
+                self.assertEqual(notifier.drain_outbound(timeout=5), 0)
+
+            self.assertEqual([future.result() for future in futures][2], {222: 1})
+            self.assertEqual(notifier.pending_deliveries(), 0)
+            self.assertCountEqual(
+                completed, [(111, {111: 1}), (111, {111: 2}), (222, {222: 1})]
+            )
+            self.assertEqual(sent[111], ["msg0", "msg1"])
+            self.assertEqual(max_active, {111: 1, 222: 1})
+
+    def test_throttled_chat_backlog_does_not_block_other_chats(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            load_runtime_modules(tmp)
+            import telegram_bot
+
+            notifier = telegram_bot.TelegramNotifier.__new__(
+                telegram_bot.TelegramNotifier
+            )
+            notifier.enabled = True
+            release = threading.Event()
+
+            async def send_message(message, chat_id, reply_to, token, chain):
+                if chat_id == 111:
+                    # 模拟被限速的群组：每条消息都要等待令牌
+                    await asyncio.to_thread(release.wait, 5)
+                return {chat_id: 1}
+
+            notifier.send_message = send_message
+            with running_event_loop() as loop:
+                notifier.bot_loop = loop
+                backlog = [
+                    notifier.enqueue_notification(f"msg{index}", 111)
+                    for index in range(telegram_bot._OUTBOUND_CONCURRENCY + 2)
+                ]
+                other = notifier.enqueue_notification("other", 222)
+                try:
+                    self.assertEqual(other.result(timeout=1), {222: 1})
+                    self.assertFalse(any(future.done() for future in backlog))
+                finally:
+                    release.set()
+                    self.assertEqual(notifier.drain_outbound(timeout=5), 0)
+
+    def test_broadcast_sends_chats_in_parallel_and_resends_after_retry_after(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            load_runtime_modules(tmp)
+            import telegram_bot
+            from rate_limiter import TelegramRateLimiter
+
+            notifier = telegram_bot.TelegramNotifier.__new__(
+                telegram_bot.TelegramNotifier
+            )
+            notifier.enabled = True
+            notifier._build_inline_keyboard = lambda token, chain: None
+            notifier.chat_storage = mock.Mock()
+            notifier.chat_storage.get_active_chats.return_value = [
+                {"chat_id": 111},
+                {"chat_id": -222},
+            ]
+            active = 0
+            max_active = 0
+            attempts = {}
+
+            async def send_message(chat_id, **kwargs):
+                nonlocal active, max_active
+                attempts[chat_id] = attempts.get(chat_id, 0) + 1
+                if chat_id == 111 and attempts[chat_id] == 1:
+                    raise telegram_bot.RetryAfter(0)
+                active += 1
+                max_active = max(max_active, active)
+                await asyncio.sleep(0.02)
+                active -= 1
+                return SimpleNamespace(message_id=attempts[chat_id])
+
+            notifier.app = SimpleNamespace(
+                bot=SimpleNamespace(send_message=send_message)
+            )
+            with mock.patch.object(
+                telegram_bot,
+                "TelegramRateLimiter",
+                lambda: TelegramRateLimiter(chat_rate=1000, group_rate_per_minute=6000),
+            ):
+                message_ids = asyncio.run(notifier.send_message("hello"))
+
+            self.assertEqual(message_ids, {111: 2, -222: 1})
+            self.assertEqual(attempts, {111: 2, -222: 1})
+            self.assertEqual(max_active, 2)
+
+    def test_photo_broadcast_uploads_url_once_and_reuses_file_id(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            load_runtime_modules(tmp)
+            import photo_cache
+            import telegram_bot
+
+            notifier = telegram_bot.TelegramNotifier.__new__(
+                telegram_bot.TelegramNotifier
+            )
+            notifier.enabled = True
+            notifier._build_inline_keyboard = lambda token, chain: None
+            notifier.chat_storage = mock.Mock()
+            notifier.chat_storage.get_active_chats.return_value = [
+                {"chat_id": 111},
+                {"chat_id": 222},
+                {"chat_id": 333},
+            ]
+            photos = []
+
+            async def send_photo(chat_id, photo, **kwargs):
+                photos.append((chat_id, photo))
+                if photo == "STALE_ID":
+                    raise telegram_bot.BadRequest("Wrong file identifier")
+                await asyncio.sleep(0.01)
+                return SimpleNamespace(
+                    message_id=chat_id,
+                    photo=[
+                        SimpleNamespace(file_id="SMALL_ID"),
+                        SimpleNamespace(file_id="FILE_ID"),
+                    ],
+                )
+
+            notifier.app = SimpleNamespace(bot=SimpleNamespace(send_photo=send_photo))
+            url = "https://img.example/token.png"
+            message_ids = asyncio.run(notifier.send_photo(url, "caption"))
+
+            self.assertEqual(message_ids, {111: 111, 222: 222, 333: 333})
+            self.assertEqual(
+                sorted(photo for _, photo in photos), [*["FILE_ID"] * 2, url]
+            )
+            self.assertEqual(photo_cache.get_photo_file_id(url), "FILE_ID")
+
+            # Telegram 拒绝缓存的 file_id 时改用 URL 重新上传并更新缓存
+            photo_cache.save_photo_file_id(url, "STALE_ID")
+            photos.clear()
+            message_ids = asyncio.run(notifier.send_photo(url, "caption", 111))
+
+            self.assertEqual(message_ids, {111: 111})
+            self.assertEqual(photos, [(111, "STALE_ID"), (111, url)])
+            self.assertEqual(photo_cache.get_photo_file_id(url), "FILE_ID")
+
+    def test_message_counts_are_buffered_and_flushed_in_one_batch(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            load_runtime_modules(tmp)
+            import telegram_bot
+
+            notifier = telegram_bot.TelegramNotifier.__new__(
+                telegram_bot.TelegramNotifier
+            )
+            notifier.enabled = True
+            notifier._build_inline_keyboard = lambda token, chain: None
+            notifier.chat_storage = mock.Mock()
+            notifier.chat_storage.get_active_chats.return_value = [
+                {"chat_id": 111},
+                {"chat_id": 222},
+            ]
+
+            async def send_message(chat_id, **kwargs):
+                return SimpleNamespace(message_id=chat_id)
+
+            notifier.app = SimpleNamespace(
+                bot=SimpleNamespace(send_message=send_message)
+            )
+
+            async def send_all():
+                await notifier.send_message("broadcast")
+                await notifier.send_message("direct", 222)
+
+            asyncio.run(send_all())
+
+            notifier.chat_storage.increment_message_count.assert_not_called()
+            notifier.chat_storage.add_message_counts.assert_not_called()
+
+            # 写入失败时计数保留，下次刷新重试
+            notifier.chat_storage.add_message_counts.side_effect = [
+                RuntimeError("database is locked"),
+                None,
+            ]
+            notifier.flush_message_counts()
+            notifier.flush_message_counts()
+            notifier.flush_message_counts()
+
+            self.assertEqual(
+                notifier.chat_storage.add_message_counts.call_args_list,
+                [mock.call({111: 1, 222: 2}), mock.call({111: 1, 222: 2})],
+            )
+
+    def test_queued_photo_falls_back_to_text(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            load_runtime_modules(tmp)
+            import telegram_bot
+
+            notifier = telegram_bot.TelegramNotifier.__new__(
+                telegram_bot.TelegramNotifier
+            )
+            notifier.enabled = True
+            notifier.send_photo = mock.AsyncMock(return_value={})
+            notifier.send_message = mock.AsyncMock(return_value={111: 9})
+            with running_event_loop() as loop:
+                notifier.bot_loop = loop
+                future = notifier.enqueue_notification(
+                    "msg", 111, photo_url="https://img", token_address="TOKEN1"
+                )
+                self.assertEqual(future.result(timeout=5), {111: 9})
+
+            notifier.send_photo.assert_awaited_once()
+            notifier.send_message.assert_awaited_once_with(
+                "msg", 111, None, "TOKEN1", None
+            )
+
+    def test_queued_candidate_notification_persists_ids_and_blocks_resend(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, _, monitor_flow, _, ContractStorage = load_runtime_modules(tmp)
+            storage = ContractStorage(chain="sol", chat_id=111)
+            contract = sample_contract(tokenAddress="TOKEN1", imageUrl="")
+            release = threading.Event()
+
+            async def send_message(message, chat_id, reply_to, token, chain):
+                await asyncio.to_thread(release.wait, 5)
+                return {chat_id: 555}
+
+            monitor_flow.ENABLE_TELEGRAM = True
+            monitor_flow.DRY_RUN = False
+            notifier = monitor_flow.notifier
+            with (
+                running_event_loop() as loop,
+                mock.patch.object(notifier, "enabled", True),
+                mock.patch.object(notifier, "bot_loop", loop),
+                mock.patch.object(notifier, "send_message", side_effect=send_message),
+                mock.patch.object(
+                    monitor_flow, "analyze_contract_narrative", return_value=None
+                ),
+                mock.patch.object(
+                    monitor_flow, "format_initial_notification", return_value="msg"
+                ) as format_mock,
+            ):
+                with storage.batch():
+                    sent = monitor_flow._send_candidate_notification(
+                        storage, 111, "sol", contract, [], [], False
+                    )
+                    resent = monitor_flow._send_candidate_notification(
+                        storage, 111, "sol", contract, [], [], False
+                    )
+
+                self.assertEqual((sent, resent), (1, 0))
+                self.assertEqual(format_mock.call_count, 1)
+                self.assertEqual(storage.get_telegram_message_id("TOKEN1", 111), None)
+                release.set()
+                notifier.drain_outbound(timeout=5)
+
+            self.assertEqual(storage.get_telegram_message_id("TOKEN1", 111), 555)
+            self.assertIsNotNone(storage.get_last_notify_time("TOKEN1"))
+
+    def test_queued_multiplier_notification_rechecks_state_after_delivery(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, _, monitor_flow, _, ContractStorage = load_runtime_modules(tmp)
+            storage = ContractStorage(chain="sol", chat_id=111)
+            storage.add_contract("TOKEN1", 1.0, sample_contract(priceUSD="1.0"))
+            storage.update_telegram_message_id("TOKEN1", 111, 222)
+            release = threading.Event()
+            replies = []
+
+            async def send_message(message, chat_id, reply_to, token, chain):
+                replies.append(reply_to)
+                await asyncio.to_thread(release.wait, 5)
+                return {chat_id: 777}
+
+            monitor_flow.ENABLE_TELEGRAM = True
+            monitor_flow.DRY_RUN = False
+            monitor_flow.MULTIPLIER_CONFIRMATIONS = 1
+            notifier = monitor_flow.notifier
+            contract = sample_contract(priceUSD="2.0")
+            with (
+                running_event_loop() as loop,
+                mock.patch.object(notifier, "enabled", True),
+                mock.patch.object(notifier, "bot_loop", loop),
+                mock.patch.object(notifier, "send_message", side_effect=send_message),
+                mock.patch.object(
+                    monitor_flow, "load_kol_status", return_value=([], [])
+                ),
+            ):
+                monitor_flow.check_multipliers(contract, storage, "sol", chat_id=111)
+                stale_snapshot = storage.get_contract("TOKEN1")
+                monitor_flow.check_multipliers(contract, storage, "sol", chat_id=111)
+                release.set()
+                notifier.drain_outbound(timeout=5)
+                monitor_flow.check_multipliers(
+                    contract,
+                    storage,
+                    "sol",
+                    chat_id=111,
+                    stored_contract=stale_snapshot,
+                )
+                notifier.drain_outbound(timeout=5)
+
+            self.assertEqual(replies, [222])
+            self.assertEqual(storage.get_notified_multipliers("TOKEN1"), [2.0])
+
     def test_telegram_startup_failure_reaches_main_thread(self):
         with tempfile.TemporaryDirectory() as tmp:
             load_runtime_modules(tmp)
@@ -1016,23 +1914,8 @@ class ReviewRegressionTests(unittest.TestCase):
                     load_runtime_modules(tmp)
                     import monitor
 
-                    chat_storage = mock.Mock()
-                    chat_storage.get_active_chats.return_value = [{"chat_id": 111}]
                     with (
-                        mock.patch.object(
-                            monitor, "ChatStorage", return_value=chat_storage
-                        ),
-                        mock.patch.object(monitor, "_startup_telegram"),
-                        mock.patch.object(monitor, "_bootstrap_storages"),
                         mock.patch.object(monitor, "ENABLE_TELEGRAM", False),
-                        mock.patch.object(monitor, "DRY_RUN", False),
-                        mock.patch.object(monitor, "SILENT_INIT", False),
-                        mock.patch.object(
-                            monitor, "load_last_summary_marker", return_value=""
-                        ),
-                        mock.patch.object(
-                            monitor, "_initial_report_marker", return_value=""
-                        ),
                         mock.patch.object(
                             monitor, "due_summary_report_hour", return_value=4
                         ),
@@ -1044,18 +1927,64 @@ class ReviewRegressionTests(unittest.TestCase):
                         mock.patch.object(
                             monitor, "save_last_summary_marker"
                         ) as save_mock,
-                        mock.patch.object(
-                            monitor,
-                            "scan_chains_once",
-                            side_effect=KeyboardInterrupt,
-                        ),
                     ):
-                        monitor.monitor_trending()
+                        marker = asyncio.run(monitor._run_maintenance({}, ""))
 
                     if delivery_succeeded:
                         save_mock.assert_called_once_with(4)
+                        self.assertEqual(marker, monitor.summary_report_marker(4))
                     else:
                         save_mock.assert_not_called()
+                        self.assertEqual(marker, "")
+
+    def test_slow_chain_does_not_delay_other_chain_scans(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            load_runtime_modules(tmp)
+            import monitor
+            from scan_scheduler import ScanScheduler
+
+            chat_storage = mock.Mock()
+            chat_storage.get_active_chats.return_value = [{"chat_id": 1}]
+            scheduler = ScanScheduler(["bsc", "sol"], 0.02)
+            sol_scans = []
+
+            async def scan(chain, *args):
+                if chain == "bsc":
+                    await asyncio.sleep(30)
+                    return False
+                sol_scans.append(time.monotonic())
+                if len(sol_scans) >= 3:
+                    sol_done.set()
+                return False
+
+            async def run():
+                tasks = [
+                    asyncio.create_task(
+                        monitor._chain_scan_loop(chain, {}, scheduler)
+                    )
+                    for chain in ("bsc", "sol")
+                ]
+                try:
+                    await asyncio.wait_for(sol_done.wait(), timeout=2)
+                    self.assertFalse(tasks[0].done())
+                finally:
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+
+            sol_done = asyncio.Event()
+            with (
+                mock.patch.object(monitor, "ChatStorage", return_value=chat_storage),
+                mock.patch.object(monitor, "scan_once_async", side_effect=scan),
+                mock.patch.object(
+                    monitor, "chain_has_pending_multipliers", return_value=False
+                ),
+            ):
+                started = time.monotonic()
+                asyncio.run(run())
+
+            self.assertEqual(len(sol_scans), 3)
+            self.assertLess(sol_scans[-1] - started, 1)
 
     def test_join_event_does_not_create_first_subscription(self):
         with tempfile.TemporaryDirectory() as tmp:
@@ -1371,6 +2300,62 @@ class ReviewRegressionTests(unittest.TestCase):
             self.assertEqual(result, "report")
             self.assertEqual(max_active_loads, 2)
 
+    def test_manual_report_reads_daily_stats_and_caches_text(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, _, monitor_flow, _, _ = load_runtime_modules(tmp)
+            from storage import ContractStorage
+
+            storage = ContractStorage(chain="sol", chat_id=111)
+            for token, multiplier in [("OFF_PAGE", 2.0), ("FLAT", None), ("FADED", 3.0)]:
+                storage.add_contract(token, 1.0, {"symbol": token})
+                storage.update_telegram_message_id(token, 111, 1)
+                if multiplier:
+                    storage.update_notified_multiplier(token, multiplier)
+            latest = {
+                "FLAT": {"tokenAddress": "FLAT", "priceUSD": 1.35},
+                "FADED": {"tokenAddress": "FADED", "priceUSD": 1.1},
+            }
+
+            stats = monitor_flow._build_chain_stats(storage, "sol", latest)["sol"]
+
+            self.assertEqual(stats["trend_count"], 3)
+            self.assertEqual(stats["total_multiplier_contracts"], 2)
+            self.assertEqual(stats["multiplier_distribution"]["2x"], 2)
+            self.assertEqual(
+                stats["gain_distribution"], {"20%": 2, "30%": 2, "50%": 1, "80%": 1}
+            )
+            self.assertEqual(
+                [item["contract"]["tokenAddress"] for item in stats["top_contracts"]],
+                ["FADED", "OFF_PAGE"],
+            )
+
+            with mock.patch.object(
+                monitor_flow, "_load_latest_contract_map", return_value=latest
+            ) as load_latest:
+                first = monitor_flow.get_summary_report_for_chat(111, {"sol:111": storage})
+                second = monitor_flow.get_summary_report_for_chat(111, {"sol:111": storage})
+
+            self.assertEqual(first, second)
+            load_latest.assert_called_once_with("sol")
+
+    def test_report_reuses_fresh_scan_snapshot_and_fetches_stale_chains(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, _, monitor_flow, _, _ = load_runtime_modules(tmp)
+            monitor_flow._TRENDING_SNAPSHOTS.update(
+                "sol", [{"tokenAddress": "SCANNED", "priceUSD": "2"}]
+            )
+
+            with mock.patch.object(
+                monitor_flow,
+                "fetch_trending",
+                return_value={"data": [{"tokenAddress": "FETCHED"}]},
+            ) as fetch:
+                latest_maps = monitor_flow._load_latest_contract_maps(["sol", "base"])
+
+            self.assertEqual(list(latest_maps["sol"]), ["SCANNED"])
+            self.assertEqual(list(latest_maps["base"]), ["FETCHED"])
+            fetch.assert_called_once_with(chain="base")
+
     def test_direct_send_migrates_group_and_retries_once(self):
         with tempfile.TemporaryDirectory() as tmp:
             load_runtime_modules(tmp)
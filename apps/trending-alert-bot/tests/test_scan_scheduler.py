@@ -0,0 +1,86 @@
+import unittest
+
+from scan_scheduler import ScanScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class ScanSchedulerTests(unittest.TestCase):
+    def test_cadence_does_not_drift_with_scan_duration(self):
+        clock = FakeClock()
+        scheduler = ScanScheduler(["sol"], 15, clock=clock)
+
+        self.assertEqual(scheduler.seconds_until("sol"), 0.0)
+        clock.now += 4  # 扫描耗时
+        scheduler.record_success("sol")
+
+        self.assertEqual(scheduler.next_due("sol"), 1015.0)
+        self.assertEqual(scheduler.seconds_until("sol"), 11.0)
+
+    def test_overrunning_scan_skips_missed_ticks(self):
+        clock = FakeClock()
+        scheduler = ScanScheduler(["sol"], 15, clock=clock)
+
+        clock.now += 40
+        scheduler.record_success("sol")
+
+        self.assertEqual(scheduler.next_due("sol"), 1045.0)
+
+    def test_per_chain_intervals(self):
+        clock = FakeClock()
+        scheduler = ScanScheduler(
+            ["sol", "bsc"], 15, chain_intervals={"bsc": 30}, clock=clock
+        )
+        scheduler.record_success("sol")
+        scheduler.record_success("bsc")
+
+        clock.now += 15
+        self.assertEqual(scheduler.seconds_until("sol"), 0.0)
+        self.assertEqual(scheduler.seconds_until("bsc"), 15.0)
+        scheduler.record_success("sol")
+        clock.now += 15
+        self.assertEqual(scheduler.seconds_until("bsc"), 0.0)
+        scheduler.record_success("sol")
+        self.assertEqual(scheduler.seconds_until("sol"), 15.0)
+
+    def test_failures_back_off_per_chain_up_to_cap(self):
+        clock = FakeClock()
+        scheduler = ScanScheduler(["sol", "bsc"], 10, max_backoff=35, clock=clock)
+
+        delays = [scheduler.record_failure("bsc") for _ in range(4)]
+        scheduler.record_success("sol")
+
+        self.assertEqual(delays, [10, 20, 35, 35])
+        self.assertEqual(scheduler.next_due("sol"), 1010.0)
+
+        scheduler.record_success("bsc")
+        self.assertEqual(scheduler.record_failure("bsc"), 10)
+
+    def test_pending_confirmations_use_fast_interval_until_resolved(self):
+        clock = FakeClock()
+        scheduler = ScanScheduler(["sol"], 15, fast_interval=5, clock=clock)
+
+        scheduler.record_success("sol", has_pending=True)
+        self.assertEqual(scheduler.next_due("sol"), 1005.0)
+
+        clock.now += 5
+        scheduler.record_success("sol", has_pending=False)
+        self.assertEqual(scheduler.next_due("sol"), 1020.0)
+
+    def test_fast_interval_never_slows_down_a_chain(self):
+        clock = FakeClock()
+        scheduler = ScanScheduler(["sol"], 3, fast_interval=5, clock=clock)
+
+        scheduler.record_success("sol", has_pending=True)
+
+        self.assertEqual(scheduler.next_due("sol"), 1003.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
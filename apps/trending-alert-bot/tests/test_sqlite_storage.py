@@ -1,3 +1,4 @@
+import datetime as dt
 import json
 import os
 import sqlite3
@@ -24,7 +25,7 @@ def load_storage_modules(data_dir: str):
         }
     )
 
-    for name in ["config", "db_storage", "chat_storage", "storage"]:
+    for name in ["config", "db_storage", "chat_storage", "storage", "photo_cache"]:
         if name in sys.modules:
             del sys.modules[name]
 
@@ -58,6 +59,56 @@ class SqliteStorageTests(unittest.TestCase):
             self.assertEqual(reloaded.get_chat(111)["message_count"], 1)
             self.assertEqual(reloaded.get_chat(111)["notification_mode"], "anomaly")
 
+    def test_chat_registry_is_shared_and_reads_without_sqlite(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, chat_storage, _ = load_storage_modules(tmp)
+            writer = chat_storage.ChatStorage()
+            writer.add_chat(111, {"type": "group", "title": "One"})
+            writer.add_chat(222, {"type": "group", "title": "Two"})
+            before = writer.snapshot()
+
+            with patch.object(
+                chat_storage,
+                "connect",
+                side_effect=AssertionError("chat reads must not hit SQLite"),
+            ):
+                reader = chat_storage.ChatStorage()
+                self.assertIs(reader.snapshot(), before)
+                self.assertEqual(
+                    [chat["chat_id"] for chat in reader.get_active_chats()],
+                    [111, 222],
+                )
+                self.assertEqual(reader.get_notification_mode(222), "all")
+                self.assertEqual(reader.get_chat(111)["title"], "One")
+
+            writer.set_notification_mode(222, "anomaly")
+            writer.remove_chat(111)
+            after = reader.snapshot()
+
+            self.assertGreater(after.version, before.version)
+            self.assertEqual(after.active_chat_ids, (222,))
+            self.assertEqual(after.notification_mode(222), "anomaly")
+            # 旧快照不受后续写入影响，且不可修改
+            self.assertEqual(before.active_chat_ids, (111, 222))
+            self.assertEqual(before.notification_mode(222), "all")
+            with self.assertRaises(TypeError):
+                before.chats[111]["active"] = False
+
+    def test_chat_storage_adds_message_counts_in_one_batch(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, chat_storage, _ = load_storage_modules(tmp)
+            storage = chat_storage.ChatStorage()
+            storage.add_chat(111, {"type": "group", "title": "One"})
+            storage.add_chat(222, {"type": "group", "title": "Two"})
+
+            storage.add_message_counts({111: 3, 222: 1, 999: 4})
+
+            self.assertEqual(storage.get_chat(111)["message_count"], 3)
+            reloaded = chat_storage.ChatStorage()
+            self.assertEqual(reloaded.get_chat(111)["message_count"], 3)
+            self.assertEqual(reloaded.get_chat(222)["message_count"], 1)
+            self.assertIsNone(reloaded.get_chat(999))
+
     def test_chat_storage_migrates_subscription_to_supergroup(self):
         with tempfile.TemporaryDirectory() as tmp:
             _, chat_storage, ContractStorage = load_storage_modules(tmp)
@@ -104,6 +155,10 @@ class SqliteStorageTests(unittest.TestCase):
                 migrated_contracts.get_pending_multiplier("TOKEN1"),
                 {"multiplier_int": 3, "count": 1},
             )
+            self.assertEqual(
+                migrated_contracts.get_today_trend_stats()["multiplier_2x"], 1
+            )
+            self.assertEqual(contracts.get_today_trend_stats()["trend_count"], 0)
             self.assertEqual(
                 db_storage.get_runtime_state("last_summary_report_marker:-100222"),
                 "marker",
@@ -113,6 +168,38 @@ class SqliteStorageTests(unittest.TestCase):
                 "retry",
             )
 
+    def test_chat_migration_does_not_double_count_shared_contracts(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, chat_storage, ContractStorage = load_storage_modules(tmp)
+
+            storage = chat_storage.ChatStorage()
+            for chat_id in (-100, -200):
+                storage.add_chat(chat_id, {"type": "group", "title": str(chat_id)})
+                contracts = ContractStorage(chain="sol", chat_id=chat_id)
+                contracts.add_contract(
+                    "TOKEN1",
+                    1.0,
+                    {"name": "One", "symbol": "ONE", "marketCapUSD": 1000},
+                )
+                contracts.update_telegram_message_id("TOKEN1", chat_id, 333)
+                contracts.update_notified_multiplier("TOKEN1", 3.0)
+
+            self.assertTrue(storage.migrate_chat(-100, -200))
+
+            migrated = ContractStorage(chain="sol", chat_id=-200)
+            stats = migrated.get_today_trend_stats()
+            self.assertEqual(stats["trend_count"], 1)
+            self.assertEqual(stats["multiplier_2x"], 1)
+            self.assertEqual(
+                stats["trend_count"], len(migrated.get_today_trend_contracts())
+            )
+            self.assertEqual(
+                ContractStorage(chain="sol", chat_id=-100).get_today_trend_stats()[
+                    "trend_count"
+                ],
+                0,
+            )
+
     def test_sqlite_connections_use_wal_and_bounded_busy_timeout(self):
         with tempfile.TemporaryDirectory() as tmp:
             load_storage_modules(tmp)
@@ -126,6 +213,103 @@ class SqliteStorageTests(unittest.TestCase):
                     conn.execute("PRAGMA busy_timeout").fetchone()[0], 5000
                 )
 
+    def test_sqlite_connections_are_pooled_per_thread(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            load_storage_modules(tmp)
+            import threading
+
+            import db_storage
+
+            main_conn = db_storage.connect()
+            other = []
+            worker = threading.Thread(target=lambda: other.append(db_storage.connect()))
+            worker.start()
+            worker.join()
+
+            self.assertIs(db_storage.connect(), main_conn)
+            self.assertIsNot(other[0], main_conn)
+            with main_conn:
+                self.assertEqual(
+                    main_conn.execute("PRAGMA foreign_keys").fetchone()[0], 1
+                )
+
+            db_storage.close_connections()
+            self.assertTrue(main_conn.closed)
+            self.assertIsNot(db_storage.connect(), main_conn)
+
+    def test_connections_of_exited_threads_are_closed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            load_storage_modules(tmp)
+            import gc
+            import threading
+
+            import db_storage
+
+            opened = []
+            for _ in range(5):
+                worker = threading.Thread(
+                    target=lambda: opened.append(db_storage.connect())
+                )
+                worker.start()
+                worker.join()
+            gc.collect()
+
+            self.assertTrue(all(conn.closed for conn in opened))
+            self.assertFalse(
+                any(conn in db_storage._ALL_CONNECTIONS for conn in opened)
+            )
+
+    def test_nested_connection_leases_share_outer_transaction(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            load_storage_modules(tmp)
+            import db_storage
+
+            db_storage.ensure_schema()
+            with self.assertRaises(RuntimeError):
+                with db_storage.connect() as outer:
+                    with db_storage.connect() as inner:
+                        inner.execute(
+                            "INSERT INTO runtime_state (key, value) VALUES ('a', '1')"
+                        )
+                    self.assertTrue(outer.in_transaction)
+                    raise RuntimeError("abort")
+
+            self.assertEqual(db_storage.get_runtime_state("a"), "")
+
+            with db_storage.connect() as outer:
+                with db_storage.connect() as inner:
+                    inner.execute(
+                        "INSERT INTO runtime_state (key, value) VALUES ('b', '2')"
+                    )
+            self.assertFalse(outer.in_transaction)
+            self.assertEqual(db_storage.get_runtime_state("b"), "2")
+
+    def test_schema_is_checked_once_per_database_path(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, chat_storage, ContractStorage = load_storage_modules(tmp)
+            import db_storage
+
+            db_storage.ensure_schema_ready()
+            with patch.object(
+                db_storage,
+                "_migrate_schema",
+                wraps=db_storage._migrate_schema,
+            ) as migrate:
+                ContractStorage(chain="sol", chat_id=111)
+                chat_storage.ChatStorage()
+                db_storage.set_runtime_state("key", "value")
+                self.assertEqual(db_storage.get_runtime_state("key"), "value")
+                self.assertEqual(migrate.call_count, 0)
+
+                other_db = os.path.join(tmp, "other", "bot.sqlite")
+                with patch.object(db_storage, "SQLITE_DB_FILE", other_db):
+                    db_storage.get_runtime_state("key")
+                    db_storage.get_runtime_state("key")
+                self.assertEqual(migrate.call_count, 1)
+
+                db_storage.ensure_schema()
+                self.assertEqual(migrate.call_count, 2)
+
     def test_schema_recheck_after_lock_preserves_competing_migrator_rows(self):
         with tempfile.TemporaryDirectory() as tmp:
             load_storage_modules(tmp)
@@ -333,6 +517,427 @@ class SqliteStorageTests(unittest.TestCase):
                     1,
                 )
 
+    def test_today_trend_contracts_hydrate_in_fixed_query_count(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, _, ContractStorage = load_storage_modules(tmp)
+            import db_storage
+
+            storage = ContractStorage(chain="sol", chat_id=111)
+            other_chat = ContractStorage(chain="sol", chat_id=222)
+            for index in range(20):
+                token = f"TOKEN{index}"
+                storage.add_contract(token, 1.0, {"symbol": f"T{index}"})
+                storage.update_telegram_message_id(token, 111, 1000 + index)
+                storage.update_notified_multiplier(token, 3.0)
+                storage.update_notified_multiplier(token, 2.0)
+                if index % 2:
+                    storage.update_pending_multiplier(token, 4, 1)
+            other_chat.add_contract("TOKEN0", 1.0, {"symbol": "OTHER"})
+            other_chat.update_telegram_message_id("TOKEN0", 222, 1)
+            other_chat.update_notified_multiplier("TOKEN0", 9.0)
+
+            statements = []
+            conn = db_storage.connect()
+            conn.set_trace_callback(statements.append)
+            try:
+                contracts = storage.get_today_trend_contracts()
+            finally:
+                conn.set_trace_callback(None)
+
+            self.assertEqual(len(contracts), 20)
+            self.assertLessEqual(
+                len([sql for sql in statements if "SELECT" in sql]),
+                4,
+            )
+            for item in contracts:
+                self.assertEqual(
+                    item["data"],
+                    storage.get_contract(item["token_address"]),
+                )
+
+    def test_push_time_range_queries_for_today_and_cleanup(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, _, ContractStorage = load_storage_modules(tmp)
+            import db_storage
+            from timezone_utils import beijing_now
+
+            storage = ContractStorage(chain="sol", chat_id=111)
+            now = beijing_now()
+            push_times = {
+                "TODAY": now.strftime("%Y-%m-%d %H:%M:%S"),
+                "TODAY_PLACEHOLDER": now.strftime("%Y-%m-%d %H:%M:%S"),
+                "LAST_WEEK": (now - dt.timedelta(days=8)).strftime("%Y-%m-%d %H:%M:%S"),
+                "UNKNOWN": "",
+            }
+            for token, push_time in push_times.items():
+                storage.add_contract(token, 1.0, {"symbol": token})
+                storage.update_telegram_message_id(
+                    token, 111, -1 if token == "TODAY_PLACEHOLDER" else 1
+                )
+            with db_storage.connect() as conn:
+                conn.executemany(
+                    "UPDATE contracts SET push_time = ? WHERE token_address = ?",
+                    [(push_time, token) for token, push_time in push_times.items()],
+                )
+
+            self.assertEqual(
+                [item["token_address"] for item in storage.get_today_trend_contracts()],
+                ["TODAY"],
+            )
+            self.assertEqual(storage.cleanup_old_data(days_to_keep=7), 1)
+            self.assertIsNone(storage.get_contract("LAST_WEEK"))
+            self.assertIsNotNone(storage.get_contract("UNKNOWN"))
+
+            with db_storage.connect() as conn:
+                plan = " ".join(
+                    row[-1]
+                    for row in conn.execute(
+                        "EXPLAIN QUERY PLAN DELETE FROM contracts "
+                        "WHERE chain = 'sol' AND chat_id = 111 "
+                        "AND push_time != '' AND push_time < '2000-01-01 00:00:00'"
+                    )
+                )
+            self.assertIn("idx_contracts_push_time", plan)
+
+    def test_v2_contract_schema_is_upgraded_in_place(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, _, ContractStorage = load_storage_modules(tmp)
+            import db_storage
+
+            storage = ContractStorage(chain="sol", chat_id=111)
+            storage.add_contract("KEEP", 1.0, {"symbol": "KEEP"})
+            storage.add_contract("BAD", 1.0, {"symbol": "BAD"})
+            storage.update_notified_multiplier("KEEP", 2.0)
+            with db_storage.connect() as conn:
+                conn.execute(
+                    "UPDATE contracts SET push_time = '2024/05/01' "
+                    "WHERE token_address = 'BAD'"
+                )
+                conn.execute("DROP INDEX idx_contracts_push_time")
+                conn.execute("PRAGMA user_version = 2")
+
+            db_storage.ensure_schema()
+
+            self.assertEqual(storage.get_notified_multipliers("KEEP"), [2.0])
+            self.assertEqual(storage.get_contract("BAD")["push_time"], "")
+            with db_storage.connect() as conn:
+                self.assertEqual(
+                    conn.execute("PRAGMA user_version").fetchone()[0],
+                    db_storage.CONTRACT_SCHEMA_VERSION,
+                )
+                self.assertIsNotNone(
+                    conn.execute(
+                        "SELECT 1 FROM sqlite_master "
+                        "WHERE type = 'index' AND name = 'idx_contracts_push_time'"
+                    ).fetchone()
+                )
+
+    def test_daily_trend_stats_track_writes_incrementally(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, _, ContractStorage = load_storage_modules(tmp)
+
+            storage = ContractStorage(chain="sol", chat_id=111)
+
+            def recomputed():
+                contracts = storage.get_today_trend_contracts()
+                tops = [
+                    int(max(item["data"]["notified_multipliers"]))
+                    for item in contracts
+                    if item["data"]["notified_multipliers"]
+                ]
+                return {
+                    "trend_count": len(contracts),
+                    "multiplier_contracts": len(tops),
+                    "multiplier_2x": sum(2 <= top < 5 for top in tops),
+                    "multiplier_5x": sum(5 <= top < 10 for top in tops),
+                    "multiplier_10x_plus": sum(top >= 10 for top in tops),
+                }
+
+            storage.add_contract("FIVE", 1.0, {"symbol": "FIVE"})
+            storage.update_telegram_message_id("FIVE", 111, 1)
+            storage.update_notified_multiplier("FIVE", 2.0)
+            storage.update_notified_multiplier("FIVE", 5.0)
+            storage.add_contract("TEN", 1.0, {"symbol": "TEN"})
+            storage.update_telegram_message_id("TEN", 111, 2)
+            storage.update_notified_multiplier("TEN", 12.0)
+            storage.add_contract("PLAIN", 1.0, {"symbol": "PLAIN"})
+            storage.update_telegram_message_id("PLAIN", 111, 3)
+            storage.add_contract("UNSENT", 1.0, {"symbol": "UNSENT"})
+            storage.update_telegram_message_id("UNSENT", 111, -1)
+            storage.update_notified_multiplier("UNSENT", 3.0)
+            self.assertEqual(storage.get_today_trend_stats(), recomputed())
+            self.assertEqual(storage.get_today_trend_stats()["trend_count"], 3)
+
+            with storage.batch():
+                storage.update_telegram_message_id("UNSENT", 111, 4)
+                storage.update_initial_price("FIVE", 2.0, 2000)
+            self.assertEqual(storage.get_today_trend_stats(), recomputed())
+            self.assertEqual(
+                [
+                    (item["token_address"], item["multiplier"])
+                    for item in storage.get_today_top_multiplier_contracts(2)
+                ],
+                [
+                    (item["token_address"], max(item["data"]["notified_multipliers"]))
+                    for item in sorted(
+                        (
+                            item
+                            for item in storage.get_today_trend_contracts()
+                            if item["data"]["notified_multipliers"]
+                        ),
+                        key=lambda item: max(item["data"]["notified_multipliers"]),
+                        reverse=True,
+                    )
+                ][:2],
+            )
+
+            storage.clear_all()
+            self.assertEqual(
+                storage.get_today_trend_stats(),
+                dict.fromkeys(recomputed(), 0),
+            )
+
+    def test_summary_aggregates_read_only_todays_rows_by_index(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, _, ContractStorage = load_storage_modules(tmp)
+            import db_storage
+            from timezone_utils import beijing_now
+
+            storage = ContractStorage(chain="sol", chat_id=111)
+            for index in range(30):
+                token = f"TOKEN{index}"
+                storage.add_contract(token, 2.0, {"symbol": token})
+                storage.update_telegram_message_id(token, 111, index + 1)
+                if index % 3:
+                    storage.update_notified_multiplier(token, float(index % 7 + 2))
+            old_push_time = (beijing_now() - dt.timedelta(days=3)).strftime(
+                "%Y-%m-%d %H:%M:%S"
+            )
+            with db_storage.connect() as conn:
+                conn.execute(
+                    "UPDATE contracts SET push_time = ? WHERE token_address = ?",
+                    (old_push_time, "TOKEN8"),
+                )
+
+            self.assertEqual(
+                storage.get_today_max_multipliers(["TOKEN0", "TOKEN1", "TOKEN8", "NONE"]),
+                {
+                    "TOKEN0": {"initial_price": 2.0, "max_multiplier": 0.0},
+                    "TOKEN1": {"initial_price": 2.0, "max_multiplier": 3.0},
+                },
+            )
+            top = storage.get_today_top_multiplier_contracts(3)
+            self.assertEqual([item["multiplier"] for item in top], [8.0, 8.0, 7.0])
+            self.assertEqual(top[0]["token_address"], "TOKEN13")
+
+            statements = []
+            conn = db_storage.connect()
+            conn.set_trace_callback(statements.append)
+            try:
+                storage.get_today_top_multiplier_contracts(3)
+                storage.get_today_max_multipliers(["TOKEN1"])
+            finally:
+                conn.set_trace_callback(None)
+            plans = [
+                [row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+                for sql in statements
+            ]
+            # 前 N 名只按 push_time 范围读取当日合约，不随历史数据增长
+            self.assertIn(
+                "idx_contracts_push_time (chain=? AND chat_id=? AND push_time>?)",
+                plans[0][0],
+            )
+            for plan in plans:
+                self.assertTrue(plan[0].startswith("SEARCH c USING INDEX"), plan)
+                self.assertFalse([step for step in plan if step.startswith("SCAN")])
+
+    def test_v3_contract_schema_backfills_daily_trend_stats(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, _, ContractStorage = load_storage_modules(tmp)
+            import db_storage
+
+            storage = ContractStorage(chain="sol", chat_id=111)
+            storage.add_contract("TOKEN", 1.0, {"symbol": "TOKEN"})
+            storage.update_telegram_message_id("TOKEN", 111, 1)
+            storage.update_notified_multiplier("TOKEN", 6.0)
+            expected = storage.get_today_trend_stats()
+            with db_storage.connect() as conn:
+                conn.execute("DROP TABLE daily_trend_stats")
+                conn.execute("PRAGMA user_version = 3")
+
+            db_storage.ensure_schema()
+
+            self.assertEqual(storage.get_today_trend_stats(), expected)
+            self.assertEqual(expected["multiplier_5x"], 1)
+
+    def test_contract_storage_batch_commits_buffered_writes_once(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config, _, ContractStorage = load_storage_modules(tmp)
+            import db_storage
+
+            storage = ContractStorage(chain="sol", chat_id=111)
+            for token in ("TOKEN1", "TOKEN2", "TOKEN3"):
+                storage.add_contract(token, 1.0, {"symbol": token})
+
+            statements = []
+            conn = db_storage.connect()
+            conn.set_trace_callback(statements.append)
+            try:
+                with storage.batch():
+                    storage.update_pending_multiplier("TOKEN1", 2, 1)
+                    storage.update_pending_multiplier("TOKEN2", 3, 1)
+                    storage.clear_pending_multiplier("TOKEN3")
+                    storage.update_last_notify_time("TOKEN2")
+                    storage.update_telegram_message_id("MISSING", 111, 1)
+                    with sqlite3.connect(config.SQLITE_DB_FILE) as observer:
+                        self.assertEqual(
+                            observer.execute(
+                                "SELECT COUNT(*) FROM contract_pending_multipliers"
+                            ).fetchone()[0],
+                            0,
+                        )
+            finally:
+                conn.set_trace_callback(None)
+
+            self.assertEqual(statements.count("COMMIT"), 1)
+            self.assertEqual(
+                storage.get_pending_multiplier("TOKEN2"),
+                {"multiplier_int": 3, "count": 1},
+            )
+            self.assertTrue(storage.get_last_notify_time("TOKEN2"))
+            self.assertIsNone(storage.get_telegram_message_id("MISSING", 111))
+
+    def test_contract_storage_batch_reads_its_own_writes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, _, ContractStorage = load_storage_modules(tmp)
+            storage = ContractStorage(chain="sol", chat_id=111)
+
+            with self.assertRaises(RuntimeError):
+                with storage.batch():
+                    self.assertTrue(storage.is_new_contract("TOKEN1"))
+                    storage.add_contract("TOKEN1", 1.0, {"symbol": "ONE"})
+                    self.assertFalse(storage.is_new_contract("TOKEN1"))
+                    storage.update_notified_multiplier("TOKEN1", 2.0)
+                    self.assertEqual(storage.get_notified_multipliers("TOKEN1"), [2.0])
+                    storage.update_initial_price("TOKEN1", 5.0, 500)
+                    raise RuntimeError("abort scan")
+
+            reloaded = ContractStorage(chain="sol", chat_id=111)
+            self.assertEqual(reloaded.get_contract("TOKEN1")["initial_price"], 5.0)
+            self.assertEqual(reloaded.get_notified_multipliers("TOKEN1"), [])
+
+    def test_contract_cache_serves_warm_reads_without_sqlite(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, _, ContractStorage = load_storage_modules(tmp)
+            import db_storage
+
+            writer = ContractStorage(chain="sol", chat_id=111, cache_size=0)
+            writer.add_contract("TOKEN1", 1.0, {"symbol": "ONE"})
+            writer.update_telegram_message_id("TOKEN1", 111, 333)
+            writer.update_pending_multiplier("TOKEN1", 2, 1)
+
+            storage = ContractStorage(chain="sol", chat_id=111)
+            self.assertEqual(storage.warm_cache(), 1)
+            statements = []
+            conn = db_storage.connect()
+            conn.set_trace_callback(statements.append)
+            try:
+                self.assertFalse(storage.is_new_contract("TOKEN1"))
+                self.assertTrue(storage.is_new_contract("UNKNOWN"))
+                self.assertEqual(storage.get_telegram_message_id("TOKEN1", 111), 333)
+                self.assertEqual(storage.get_max_notified_integer_multiplier("TOKEN1"), 0)
+                self.assertEqual(
+                    storage.get_pending_multiplier("TOKEN1"),
+                    {"multiplier_int": 2, "count": 1},
+                )
+                storage.get_contract("TOKEN1")["symbol"] = "MUTATED"
+            finally:
+                conn.set_trace_callback(None)
+
+            self.assertEqual(statements, [])
+            self.assertEqual(storage.get_contract("TOKEN1")["symbol"], "ONE")
+
+    def test_contract_cache_write_through_matches_sqlite(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, _, ContractStorage = load_storage_modules(tmp)
+            storage = ContractStorage(chain="sol", chat_id=111, verify_cache=True)
+            storage.warm_cache()
+
+            with storage.batch():
+                storage.add_contract("TOKEN1", 1.0, {"symbol": "ONE", "name": None})
+                storage.update_telegram_message_id("TOKEN1", 111, 333)
+                storage.update_notified_multiplier("TOKEN1", 3.0)
+                storage.update_notified_multiplier("TOKEN1", 2.0)
+                storage.update_pending_multiplier("TOKEN1", 4, 1)
+                storage.update_last_notify_time("TOKEN1")
+                storage.update_telegram_message_id("MISSING", 111, 1)
+            self.assertEqual(storage.get_notified_multipliers("TOKEN1"), [2.0, 3.0])
+            storage.clear_pending_multiplier("TOKEN1")
+            storage.update_initial_price("TOKEN1", 5.0, 500)
+            storage.add_contract("TOKEN1", 6.0, {"symbol": "ONE"})
+
+            cold = ContractStorage(chain="sol", chat_id=111, cache_size=0)
+            self.assertEqual(storage.get_contract("TOKEN1"), cold.get_contract("TOKEN1"))
+            self.assertIsNone(storage.get_contract("MISSING"))
+
+    def test_contract_cache_is_bounded_and_verify_detects_drift(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, _, ContractStorage = load_storage_modules(tmp)
+            import db_storage
+
+            storage = ContractStorage(chain="sol", chat_id=111, cache_size=2)
+            for token in ("TOKEN1", "TOKEN2", "TOKEN3"):
+                storage.add_contract(token, 1.0, {"symbol": token})
+            storage.warm_cache()
+            self.assertEqual(storage.cache_size, 2)
+            self.assertFalse(storage.is_new_contract("TOKEN1"))
+            self.assertEqual(storage.cache_size, 2)
+
+            storage.verify_cache = True
+            with db_storage.connect() as conn:
+                conn.execute(
+                    "UPDATE contracts SET symbol = 'DRIFT' WHERE token_address = 'TOKEN1'"
+                )
+            with self.assertRaises(AssertionError):
+                storage.get_contract("TOKEN1")
+
+    def test_load_many_reads_trending_page_with_set_based_queries(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, _, ContractStorage = load_storage_modules(tmp)
+            import db_storage
+
+            writer = ContractStorage(chain="sol", chat_id=111, cache_size=0)
+            for index in range(10):
+                token = f"TOKEN{index}"
+                writer.add_contract(token, 1.0, {"symbol": token})
+                writer.update_telegram_message_id(token, 111, index + 1)
+                writer.update_notified_multiplier(token, 2.0)
+            writer.update_pending_multiplier("TOKEN3", 4, 1)
+            tokens = [f"TOKEN{index}" for index in range(10)] + ["NEW1", "NEW2"]
+
+            for cache_size in (0, 100):
+                with self.subTest(cache_size=cache_size):
+                    storage = ContractStorage(
+                        chain="sol", chat_id=111, cache_size=cache_size
+                    )
+                    statements = []
+                    conn = db_storage.connect()
+                    conn.set_trace_callback(statements.append)
+                    try:
+                        loaded = storage.load_many(tokens)
+                        storage.load_many(tokens)
+                    finally:
+                        conn.set_trace_callback(None)
+
+                    self.assertEqual(sorted(loaded), tokens[:10])
+                    self.assertEqual(
+                        loaded["TOKEN3"], writer.get_contract("TOKEN3")
+                    )
+                    selects = [sql for sql in statements if "SELECT" in sql]
+                    self.assertEqual(len(selects), 8 if cache_size == 0 else 4)
+                    if cache_size:
+                        self.assertTrue(storage.is_new_contract("NEW1"))
+
     def test_contract_storage_clear_all_cascades_relation_tables_for_scope(self):
         with tempfile.TemporaryDirectory() as tmp:
             config, _, ContractStorage = load_storage_modules(tmp)
@@ -373,6 +978,36 @@ class SqliteStorageTests(unittest.TestCase):
                     0,
                 )
 
+    def test_photo_file_id_cache_evicts_least_recently_used(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with patch.dict(os.environ, {"BOT_PHOTO_FILE_ID_CACHE_SIZE": "2"}):
+                load_storage_modules(tmp)
+                import photo_cache
+
+            with patch.object(photo_cache.time, "time", side_effect=[1, 2, 3, 4]):
+                photo_cache.save_photo_file_id("https://img/a.png", "FILE_A")
+                photo_cache.save_photo_file_id("https://img/b.png", "FILE_B")
+                # 读取 a 刷新最近使用时间，淘汰的应是 b
+                self.assertEqual(
+                    photo_cache.get_photo_file_id("https://img/a.png"), "FILE_A"
+                )
+                photo_cache.save_photo_file_id("https://img/c.png", "FILE_C")
+
+            self.assertIsNone(photo_cache.get_photo_file_id("https://img/b.png"))
+            self.assertEqual(photo_cache.get_photo_file_id("https://img/c.png"), "FILE_C")
+            photo_cache.forget_photo_file_id("https://img/a.png")
+            self.assertIsNone(photo_cache.get_photo_file_id("https://img/a.png"))
+
+    def test_photo_file_id_cache_can_be_disabled(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with patch.dict(os.environ, {"BOT_PHOTO_FILE_ID_CACHE_SIZE": "0"}):
+                load_storage_modules(tmp)
+                import photo_cache
+
+            photo_cache.save_photo_file_id("https://img/a.png", "FILE_A")
+
+            self.assertIsNone(photo_cache.get_photo_file_id("https://img/a.png"))
+
 
 if __name__ == "__main__":
     unittest.main()
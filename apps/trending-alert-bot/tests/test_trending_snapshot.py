@@ -0,0 +1,88 @@
+import unittest
+
+from trending_snapshot import TrendingSnapshotStore
+
+
+def contract(token, price="1.0", honeypot=False):
+    return {
+        "tokenAddress": token,
+        "priceUSD": price,
+        "security": {"honeyPot": {"value": honeypot}},
+    }
+
+
+class TrendingSnapshotStoreTests(unittest.TestCase):
+    def test_first_update_reports_everything_as_added(self):
+        store = TrendingSnapshotStore(clock=lambda: 100.0)
+
+        diff = store.update("sol", [contract("A"), contract("B")])
+
+        self.assertTrue(diff.initial)
+        self.assertEqual(diff.added, ["A", "B"])
+        self.assertEqual(store.get("sol").fetched_at, 100.0)
+        self.assertEqual(len(store.get("sol").contracts), 2)
+
+    def test_diff_tracks_added_removed_and_changed_tokens(self):
+        store = TrendingSnapshotStore()
+        store.update("sol", [contract("A"), contract("B"), contract("C")])
+
+        diff = store.update(
+            "sol",
+            [contract("A"), contract("B", price="2.0"), contract("D")],
+        )
+
+        self.assertFalse(diff.initial)
+        self.assertEqual(diff.added, ["D"])
+        self.assertEqual(diff.removed, ["C"])
+        self.assertEqual(diff.changed, ["B"])
+        self.assertEqual(diff.unchanged, ["A"])
+        self.assertEqual(diff.touched, {"B", "D"})
+
+    def test_honeypot_flag_change_counts_as_changed(self):
+        store = TrendingSnapshotStore()
+        store.update("sol", [contract("A")])
+
+        diff = store.update("sol", [contract("A", honeypot=True)])
+
+        self.assertEqual(diff.changed, ["A"])
+
+    def test_probe_results_are_dropped_when_token_changes(self):
+        store = TrendingSnapshotStore()
+        store.update("sol", [contract("A"), contract("B"), contract("C")])
+        probes = store.probe_results("sol")
+        probes.update({"A": False, "B": False, "C": False})
+
+        store.update("sol", [contract("A"), contract("B", price="3")])
+
+        self.assertEqual(store.probe_results("sol"), {"A": False})
+
+    def test_recent_contracts_respect_max_age(self):
+        now = [100.0]
+        store = TrendingSnapshotStore(clock=lambda: now[0])
+        self.assertIsNone(store.recent_contracts("sol", 60))
+
+        store.update("sol", [contract("A")])
+        now[0] = 160.0
+
+        self.assertEqual(store.recent_contracts("sol", 60), [contract("A")])
+        self.assertIsNone(store.recent_contracts("sol", 0))
+        now[0] = 160.5
+        self.assertIsNone(store.recent_contracts("sol", 60))
+
+    def test_snapshot_can_be_restored_from_runtime_state(self):
+        state = {}
+        store = TrendingSnapshotStore(
+            state.get, lambda key, value: state.__setitem__(key, value)
+        )
+        store.update("sol", [contract("A"), contract("B")])
+
+        restored = TrendingSnapshotStore(state.get, lambda key, value: None)
+        diff = restored.update("sol", [contract("A"), contract("B", price="5")])
+
+        self.assertFalse(diff.initial)
+        self.assertEqual(diff.unchanged, ["A"])
+        self.assertEqual(diff.changed, ["B"])
+
+
+if __name__ == "__main__":
+    unittest.main()
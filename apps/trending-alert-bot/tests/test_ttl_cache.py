@@ -0,0 +1,125 @@
+import threading
+import time
+import unittest
+
+from ttl_cache import SingleFlight, TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TTLCacheTests(unittest.TestCase):
+    def test_entries_expire_after_ttl(self):
+        clock = FakeClock()
+        cache = TTLCache(10, clock=clock)
+        loads = []
+
+        def loader():
+            loads.append(clock.now)
+            return len(loads)
+
+        self.assertEqual(cache.get_or_load("k", loader), 1)
+        clock.now = 9
+        self.assertEqual(cache.get_or_load("k", loader), 1)
+        clock.now = 10
+        self.assertEqual(cache.get_or_load("k", loader), 2)
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 2)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TTLCache(60, max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_zero_ttl_disables_storage(self):
+        cache = TTLCache(0)
+        cache.get_or_load("k", lambda: 1)
+
+        self.assertEqual(len(cache), 0)
+
+    def test_loader_errors_are_not_cached(self):
+        cache = TTLCache(60)
+
+        with self.assertRaises(RuntimeError):
+            cache.get_or_load("k", lambda: (_ for _ in ()).throw(RuntimeError("x")))
+
+        self.assertEqual(cache.get_or_load("k", lambda: 2), 2)
+        self.assertEqual(cache.stats()["in_flight"], 0)
+
+    def test_concurrent_misses_share_one_load(self):
+        cache = TTLCache(60)
+        calls = []
+        results = []
+
+        def loader():
+            calls.append(1)
+            time.sleep(0.05)
+            return "value"
+
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(cache.get_or_load("k", loader))
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["value"] * 5)
+
+
+class SingleFlightTests(unittest.TestCase):
+    def test_concurrent_calls_share_one_run_without_caching(self):
+        flights = SingleFlight()
+        calls = []
+        results = []
+        release = threading.Event()
+
+        def fn():
+            calls.append(1)
+            release.wait(5)
+            return len(calls)
+
+        threads = [
+            threading.Thread(target=lambda: results.append(flights.do("k", fn)))
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + 5
+        while flights.stats()["calls"] < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(flights.stats()["in_flight"], 1)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [1, 1, 1])
+        self.assertEqual(flights.stats()["in_flight"], 0)
+        self.assertEqual(flights.do("k", fn), 2)
+
+    def test_errors_are_shared_and_not_retained(self):
+        flights = SingleFlight()
+
+        with self.assertRaises(RuntimeError):
+            flights.do("k", lambda: (_ for _ in ()).throw(RuntimeError("x")))
+
+        self.assertEqual(flights.do("k", lambda: 2), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+"""按链保存上一轮趋势榜快照，计算两轮之间的增量"""
+
+from dataclasses import dataclass, field
+import json
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# (priceUSD 原始值, 是否貔貅)；任一变化都可能改变倍数判断
+Fingerprint = Tuple[str, bool]
+
+
+def contract_fingerprint(contract: dict) -> Fingerprint:
+    security = contract.get("security")
+    honeypot = security.get("honeyPot") if isinstance(security, dict) else None
+    is_honeypot = bool(honeypot.get("value", False)) if isinstance(honeypot, dict) else False
+    return str(contract.get("priceUSD") or ""), is_honeypot
+
+
+@dataclass
+class TrendingSnapshot:
+    chain: str
+    fetched_at: float
+    fingerprints: Dict[str, Fingerprint]
+    contracts: List[dict] = field(default_factory=list)
+
+
+@dataclass
+class TrendingDiff:
+    chain: str
+    added: List[str]
+    removed: List[str]
+    changed: List[str]
+    unchanged: List[str]
+    # 首轮（无上一份快照）时所有 token 都视为新增
+    initial: bool = False
+
+    @property
+    def touched(self) -> set:
+        return set(self.added) | set(self.changed)
+
+    def summary(self) -> str:
+        return (
+            f"新增 {len(self.added)} | 移除 {len(self.removed)} | "
+            f"价格变化 {len(self.changed)} | 未变 {len(self.unchanged)}"
+        )
+
+
+class TrendingSnapshotStore:
+    """线程安全的按链快照存储。
+
+    state_loader / state_saver 非空时，快照指纹会持久化到 runtime_state，
+    进程重启后第一轮也能与上一份快照比较。
+    """
+
+    _STATE_KEY_PREFIX = "trending_snapshot:"
+
+    def __init__(
+        self,
+        state_loader: Optional[Callable[[str, str], str]] = None,
+        state_saver: Optional[Callable[[str, str], None]] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._state_loader = state_loader
+        self._state_saver = state_saver
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._snapshots: Dict[str, TrendingSnapshot] = {}
+        # chain -> {token: KOL 探测是否有交易}，token 指纹变化时失效
+        self._probe_results: Dict[str, Dict[str, bool]] = {}
+
+    def get(self, chain: str) -> Optional[TrendingSnapshot]:
+        with self._lock:
+            return self._snapshots.get(chain)
+
+    def recent_contracts(self, chain: str, max_age: float) -> Optional[List[dict]]:
+        """返回 max_age 秒内扫描得到的整页榜单；没有快照或已过期时返回 None。"""
+        if max_age <= 0:
+            return None
+        with self._lock:
+            snapshot = self._snapshots.get(chain)
+        if snapshot is None or self._clock() - snapshot.fetched_at > max_age:
+            return None
+        return snapshot.contracts
+
+    def probe_results(self, chain: str) -> Dict[str, bool]:
+        with self._lock:
+            return self._probe_results.setdefault(chain, {})
+
+    def update(self, chain: str, contracts: List[dict]) -> TrendingDiff:
+        fingerprints: Dict[str, Fingerprint] = {}
+        for contract in contracts:
+            token_address = contract.get("tokenAddress")
+            if token_address and token_address not in fingerprints:
+                fingerprints[token_address] = contract_fingerprint(contract)
+
+        with self._lock:
+            previous = self._snapshots.get(chain)
+            if previous is None:
+                previous = self._load_persisted(chain)
+            snapshot = TrendingSnapshot(
+                chain=chain,
+                fetched_at=self._clock(),
+                fingerprints=fingerprints,
+                contracts=list(contracts),
+            )
+            self._snapshots[chain] = snapshot
+
+            previous_fingerprints = previous.fingerprints if previous else {}
+            added, changed, unchanged = [], [], []
+            for token_address, fingerprint in fingerprints.items():
+                old = previous_fingerprints.get(token_address)
+                if old is None:
+                    added.append(token_address)
+                elif old != fingerprint:
+                    changed.append(token_address)
+                else:
+                    unchanged.append(token_address)
+            removed = [
+                token_address
+                for token_address in previous_fingerprints
+                if token_address not in fingerprints
+            ]
+
+            probe_results = self._probe_results.setdefault(chain, {})
+            for token_address in [*changed, *removed]:
+                probe_results.pop(token_address, None)
+
+        self._persist(snapshot)
+        return TrendingDiff(
+            chain=chain,
+            added=added,
+            removed=removed,
+            changed=changed,
+            unchanged=unchanged,
+            initial=previous is None,
+        )
+
+    def _load_persisted(self, chain: str) -> Optional[TrendingSnapshot]:
+        if self._state_loader is None:
+            return None
+        raw_state = self._state_loader(f"{self._STATE_KEY_PREFIX}{chain}", "")
+        if not raw_state:
+            return None
+        try:
+            state = json.loads(raw_state)
+            fingerprints = {
+                token_address: (str(price), bool(is_honeypot))
+                for token_address, (price, is_honeypot) in state["tokens"].items()
+            }
+            fetched_at = float(state.get("fetched_at", 0))
+        except (TypeError, ValueError, KeyError):
+            return None
+        return TrendingSnapshot(
+            chain=chain, fetched_at=fetched_at, fingerprints=fingerprints
+        )
+
+    def _persist(self, snapshot: TrendingSnapshot):
+        if self._state_saver is None:
+            return
+        self._state_saver(
+            f"{self._STATE_KEY_PREFIX}{snapshot.chain}",
+            json.dumps(
+                {
+                    "fetched_at": snapshot.fetched_at,
+                    "tokens": {
+                        token_address: list(fingerprint)
+                        for token_address, fingerprint in snapshot.fingerprints.items()
+                    },
+                },
+                separators=(",", ":"),
+            ),
+        )